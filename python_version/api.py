@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API HTTP/JSON do Sistema IGO
+
+Expõe produtos (listagem, busca, estoque), pedidos (criação, aprovação e
+rejeição) e os relatórios em JSON, com conexões keep-alive. Usa o mesmo
+banco que o sistema (IGO_BACKEND, IGO_FORMATO ou IGO_SERVIDOR); com
+IGO_API_TOKEN definido, exige "Authorization: Bearer <token>".
+
+Uso:
+    python api.py
+    python api.py --host 0.0.0.0 --porta 8080
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from controllers.api_controller import ApiController
+from main import abrir_banco
+
+def main():
+    """Função principal da API"""
+    parser = argparse.ArgumentParser(description="API HTTP/JSON do Sistema IGO")
+    parser.add_argument("--host", default="127.0.0.1", help="endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument("--porta", type=int, default=8080, help="porta de escuta (padrão: 8080)")
+    args = parser.parse_args()
+    
+    db = abrir_banco()
+    api = ApiController(db, token=os.environ.get("IGO_API_TOKEN"))
+    print(f"✅ API IGO em http://{args.host}:{args.porta} (Ctrl+C para encerrar)")
+    try:
+        asyncio.run(api.servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        print("\nEncerrando API...")
+    finally:
+        db.fechar()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do Sistema IGO - Camada de Dados e Relatórios
+
+Gera bases sintéticas (produtos, clientes, pedidos com vários itens e
+histórico de movimentações), mede as operações do Database e dos relatórios
+e grava os resultados em JSON para comparação entre commits.
+
+Uso:
+    python benchmark.py --tamanhos 1000,10000 --saida bench.json
+    python benchmark.py --tamanhos 1000 --comparar bench.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+from controllers.relatorio_controller import RelatorioController
+from models.database import Database
+from models.servicos import ServicoPedidos
+from models.sqlite_database import SQLiteDatabase
+
+BACKENDS = ["json", "colecoes", "binario", "assincrono", "sqlite"]
+
+def gerar_dados(n_produtos, semente=42):
+    """Gera uma base sintética proporcional ao número de produtos"""
+    rng = random.Random(semente)
+    inicio = datetime(2024, 1, 1)
+    data = {
+        "usuarios": [],
+        "produtos": [],
+        "fornecedores": [],
+        "clientes": [],
+        "funcionarios": [],
+        "pedidos": [],
+        "movimentacoes": []
+    }
+    
+    for i in range(1, n_produtos + 1):
+        alimento = rng.random() < 0.5
+        data["produtos"].append({
+            "id": i,
+            "nome": f"Produto {i}",
+            "categoria": "alimento" if alimento else "roupa",
+            "tamanho": "" if alimento else rng.choice(["PP", "P", "M", "G", "GG", "XG"]),
+            "marca": f"Marca {rng.randint(1, 50)}",
+            "validade": (inicio + timedelta(days=rng.randint(0, 720))).strftime("%Y-%m-%d") if alimento else "",
+            "quantidade": rng.randint(0, 200),
+            "preco": round(rng.uniform(1, 300), 2),
+            "data_cadastro": inicio.strftime("%Y-%m-%d %H:%M:%S")
+        })
+    
+    n_clientes = max(10, n_produtos // 10)
+    for i in range(1, n_clientes + 1):
+        data["clientes"].append({
+            "id": i,
+            "nome": f"Cliente {i}",
+            "cpf": f"{i:011d}",
+            "telefone": "",
+            "email": f"cliente{i}@igo.com",
+            "endereco": f"Rua {i}, Cidade {i % 27}",
+            "data_cadastro": inicio.strftime("%Y-%m-%d %H:%M:%S")
+        })
+    
+    for i in range(1, max(10, n_produtos // 100) + 1):
+        data["fornecedores"].append({
+            "id": i,
+            "nome": f"Fornecedor {i}",
+            "cnpj": f"{i:014d}",
+            "telefone": "",
+            "email": "",
+            "endereco": f"Rua {i}, UF{i % 27}",
+            "data_cadastro": inicio.strftime("%Y-%m-%d %H:%M:%S")
+        })
+    
+    for i in range(1, max(10, n_produtos // 2) + 1):
+        itens = []
+        for produto in rng.sample(data["produtos"], min(len(data["produtos"]), rng.randint(1, 10))):
+            quantidade = rng.randint(1, 5)
+            itens.append({
+                "produto_id": produto["id"],
+                "nome_produto": produto["nome"],
+                "quantidade": quantidade,
+                "preco_unitario": produto["preco"],
+                "subtotal": produto["preco"] * quantidade
+            })
+        data["pedidos"].append({
+            "id": i,
+            "cliente_id": rng.randint(1, n_clientes),
+            "cliente_nome": "",
+            "itens": itens,
+            "total": sum(item["subtotal"] for item in itens),
+            "status": rng.choice(["pendente", "aprovado", "rejeitado"]),
+            "data_pedido": (inicio + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "data_aprovacao": None,
+            "observacoes": ""
+        })
+    
+    for i in range(1, n_produtos * 3 + 1):
+        data["movimentacoes"].append({
+            "id": i,
+            "tipo": rng.choice(["entrada", "saida"]),
+            "produto_id": rng.randint(1, n_produtos),
+            "quantidade": rng.randint(1, 20),
+            "descricao": "Movimentação sintética",
+            "data_hora": (inicio + timedelta(seconds=i * 37)).strftime("%Y-%m-%d %H:%M:%S")
+        })
+    
+    return data
+
+def abrir_banco(backend, diretorio):
+    """Abre o banco do backend informado dentro do diretório de teste"""
+    if backend == "sqlite":
+        return SQLiteDatabase(os.path.join(diretorio, "igo_data.db"), os.path.join(diretorio, "igo_data.json"))
+    if backend == "assincrono":
+        return Database(os.path.join(diretorio, "igo_data.json"), durabilidade="assincrona")
+    arquivo = os.path.join(diretorio, Database.ARQUIVOS_PADRAO[backend])
+    return Database(arquivo, formato=backend)
+
+def medir(resultados, backend, tamanho, operacao, funcao, repeticoes=1):
+    """Executa a função e registra o tempo total e a vazão"""
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        funcao(i)
+    segundos = time.perf_counter() - inicio
+    
+    resultados.append({
+        "backend": backend,
+        "tamanho": tamanho,
+        "operacao": operacao,
+        "repeticoes": repeticoes,
+        "segundos": round(segundos, 6),
+        "ops_por_segundo": round(repeticoes / segundos, 1) if segundos else None
+    })
+    print(f"  {backend:<10} {tamanho:>8} {operacao:<32} {segundos:>10.4f}s")
+
+def aprovar_lote(db, pedidos):
+    """Aprova um lote de pedidos pelo serviço usado em PedidoController.aprovar_pedidos"""
+    servico = ServicoPedidos(db)
+    for pedido in pedidos:
+        servico.aprovar(pedido['id'])
+
+def executar(backend, tamanho, resultados, repeticoes):
+    """Executa todas as medições de um backend para um tamanho de base"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        data = gerar_dados(tamanho)
+        with open(os.path.join(diretorio, "igo_data.json"), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        
+        # Primeira abertura importa o JSON gerado para o formato do backend
+        db = abrir_banco(backend, diretorio)
+        db.fechar()
+        
+        bancos = []
+        def carregar(i):
+            bancos.append(abrir_banco(backend, diretorio))
+        medir(resultados, backend, tamanho, "load_data", carregar)
+        db = bancos[0]
+        
+        if backend != "sqlite":
+            medir(resultados, backend, tamanho, "save_data", lambda i: db.save_data())
+        
+        medir(resultados, backend, tamanho, "get_item", lambda i: db.get_item("produtos", i % tamanho + 1),
+              repeticoes)
+        medir(resultados, backend, tamanho, "get_items status=pendente",
+              lambda i: db.get_items("pedidos", {"status": "pendente"}), max(1, repeticoes // 100))
+        medir(resultados, backend, tamanho, "get_items cliente_id",
+              lambda i: db.get_items("pedidos", {"cliente_id": i % 10 + 1}), max(1, repeticoes // 10))
+        medir(resultados, backend, tamanho, "get_items status+cliente_id",
+              lambda i: db.get_items("pedidos", {"status": "pendente", "cliente_id": i % 10 + 1}),
+              max(1, repeticoes // 10))
+        medir(resultados, backend, tamanho, "add_item movimentacoes",
+              lambda i: db.add_item("movimentacoes", {"tipo": "entrada", "produto_id": 1, "quantidade": 1,
+                                                      "descricao": "bench",
+                                                      "data_hora": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}),
+              max(1, repeticoes // 10))
+        
+        pendentes = db.get_items("pedidos", {"status": "pendente"})[:100]
+        medir(resultados, backend, tamanho, f"aprovar_pedidos ({len(pendentes)})",
+              lambda i: aprovar_lote(db, pendentes))
+        
+        relatorios = RelatorioController(db)
+        for nome in ["relatorio_estoque", "relatorio_movimentacoes", "relatorio_produtos_solicitados",
+                     "relatorio_fornecedores", "relatorio_geral"]:
+            def gerar(i, metodo=getattr(relatorios, nome)):
+                with redirect_stdout(io.StringIO()):
+                    metodo()
+            medir(resultados, backend, tamanho, nome, gerar)
+        
+        db.fechar()
+
+def commit_atual():
+    """Retorna o hash do commit atual, se disponível"""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def comparar(resultados, arquivo_base):
+    """Compara os tempos atuais com os de uma execução anterior"""
+    with open(arquivo_base, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    
+    anteriores = {(r["backend"], r["tamanho"], r["operacao"]): r for r in base["resultados"]}
+    print(f"\nComparação com {arquivo_base} (commit {base.get('commit')}):")
+    for r in resultados:
+        anterior = anteriores.get((r["backend"], r["tamanho"], r["operacao"]))
+        if not anterior or not anterior["segundos"]:
+            continue
+        razao = r["segundos"] / anterior["segundos"]
+        marca = "⚠️ " if razao > 1.2 else "  "
+        print(f"{marca}{r['backend']:<10} {r['tamanho']:>8} {r['operacao']:<32} {razao:>6.2f}x")
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark da camada de dados do Sistema IGO")
+    parser.add_argument("--tamanhos", default="1000,10000",
+                        help="números de produtos separados por vírgula (ex.: 1000,100000,1000000)")
+    parser.add_argument("--backends", default="json,sqlite", help=f"backends a medir ({','.join(BACKENDS)})")
+    parser.add_argument("--repeticoes", type=int, default=1000, help="repetições das operações pontuais")
+    parser.add_argument("--saida", help="arquivo JSON para gravar os resultados")
+    parser.add_argument("--comparar", help="arquivo JSON de uma execução anterior")
+    args = parser.parse_args()
+    
+    resultados = []
+    for tamanho in [int(t) for t in args.tamanhos.split(",")]:
+        for backend in args.backends.split(","):
+            if backend not in BACKENDS:
+                parser.error(f"backend inválido: {backend}")
+            executar(backend, tamanho, resultados, args.repeticoes)
+    
+    saida = {
+        "commit": commit_atual(),
+        "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "resultados": resultados
+    }
+    
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(saida, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ Resultados gravados em {args.saida}")
+    
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Controlador da API HTTP/JSON - Sistema IGO
+"""
+
+import asyncio
+import hmac
+import json
+import re
+import threading
+from itertools import islice
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from controllers.relatorio_controller import RelatorioController
+from models.database import ConflitoVersaoError, RegistroDuplicadoError
+from models.servicos import (EstoqueInsuficienteError, PedidoNaoPendenteError, RegistroNaoEncontradoError,
+                             Servicos)
+
+# Limites de uma requisição (cabeçalhos e corpo)
+TAMANHO_MAXIMO_LINHA = 8192
+MAXIMO_CABECALHOS = 100
+TAMANHO_MAXIMO_CORPO = 1024 * 1024
+
+# Tamanho padrão e máximo das páginas de listagens e relatórios
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 1000
+
+MENSAGENS_STATUS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"
+}
+
+class ErroHTTP(Exception):
+    """Erro com status HTTP, devolvido ao cliente como {"erro": mensagem}"""
+    
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+class ApiController:
+    """API HTTP/JSON sobre o banco: produtos, estoque, pedidos e relatórios.
+    
+    O servidor é assíncrono (asyncio), com conexões persistentes
+    (keep-alive) e várias conexões atendidas ao mesmo tempo. Cada requisição
+    é tratada em uma thread (executor padrão do laço), para que gravações com
+    fsync ou chamadas ao servidor de dados não parem as demais conexões; as
+    operações sobre o banco passam por uma única trava e nunca se
+    intercalam. Com token definido, toda requisição deve enviar
+    "Authorization: Bearer <token>".
+    """
+    
+    ROTAS = [
+        ("GET", r"/produtos", "listar_produtos"),
+        ("POST", r"/produtos", "cadastrar_produto"),
+        ("GET", r"/produtos/busca", "buscar_produtos"),
+        ("GET", r"/produtos/baixo-estoque", "produtos_baixo_estoque"),
+        ("GET", r"/produtos/vencendo", "produtos_vencendo"),
+        ("GET", r"/produtos/(\d+)", "obter_produto"),
+        ("POST", r"/produtos/(\d+)/estoque", "atualizar_estoque"),
+        ("POST", r"/clientes", "cadastrar_cliente"),
+        ("GET", r"/pedidos", "listar_pedidos"),
+        ("POST", r"/pedidos", "criar_pedido"),
+        ("GET", r"/pedidos/(\d+)", "obter_pedido"),
+        ("POST", r"/pedidos/(\d+)/aprovar", "aprovar_pedido"),
+        ("POST", r"/pedidos/(\d+)/rejeitar", "rejeitar_pedido"),
+        ("GET", r"/relatorios", "listar_relatorios"),
+        ("GET", r"/relatorios/(\w+)", "obter_relatorio")
+    ]
+    
+    def __init__(self, database, token=None):
+        self.db = database
+        self.token = token
+        self.servicos = Servicos(database)
+        self.relatorios = RelatorioController(database)
+        self._trava = threading.Lock()
+        self._rotas = [(metodo, re.compile(padrao + "$"), nome) for metodo, padrao, nome in self.ROTAS]
+    
+    def tratar(self, metodo, alvo, cabecalhos, corpo):
+        """Executa uma requisição e retorna (status, resposta JSON já serializada)"""
+        try:
+            if self.token and not hmac.compare_digest(cabecalhos.get("authorization", ""),
+                                                      f"Bearer {self.token}"):
+                raise ErroHTTP(401, "Token de acesso inválido")
+            
+            url = urlsplit(alvo)
+            caminho = unquote(url.path).rstrip("/") or "/"
+            consulta = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+            
+            metodos_do_caminho = False
+            for metodo_rota, padrao, nome in self._rotas:
+                encontrado = padrao.match(caminho)
+                if not encontrado:
+                    continue
+                metodos_do_caminho = True
+                if metodo_rota != metodo:
+                    continue
+                
+                argumentos = [int(grupo) if grupo.isdigit() else grupo for grupo in encontrado.groups()]
+                if metodo == "POST":
+                    argumentos.append(self._ler_corpo(corpo))
+                # Os registros retornados podem ser os do banco: serializados sob a trava
+                with self._trava:
+                    status, resposta = getattr(self, nome)(consulta, *argumentos)
+                    return status, self._serializar(resposta)
+            
+            if metodos_do_caminho:
+                raise ErroHTTP(405, "Método não permitido")
+            raise ErroHTTP(404, "Recurso não encontrado")
+        except ErroHTTP as e:
+            return e.status, self._serializar({"erro": str(e)})
+        except RegistroNaoEncontradoError as e:
+            return 404, self._serializar({"erro": str(e)})
+        except (RegistroDuplicadoError, ConflitoVersaoError, EstoqueInsuficienteError, PedidoNaoPendenteError) as e:
+            return 409, self._serializar({"erro": str(e)})
+        except ValueError as e:
+            return 400, self._serializar({"erro": str(e)})
+        except Exception as e:
+            return 500, self._serializar({"erro": f"Erro interno: {e}"})
+    
+    def _serializar(self, resposta):
+        """Converte a resposta em JSON (UTF-8)"""
+        return json.dumps(resposta, ensure_ascii=False, default=str).encode('utf-8')
+    
+    def _ler_corpo(self, corpo):
+        """Decodifica o corpo JSON de uma requisição POST"""
+        if not corpo:
+            return {}
+        try:
+            dados = json.loads(corpo)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise ErroHTTP(400, "Corpo da requisição não é um JSON válido")
+        if not isinstance(dados, dict):
+            raise ErroHTTP(400, "O corpo da requisição deve ser um objeto JSON")
+        return dados
+    
+    def _inteiro(self, valor, nome, padrao=None, minimo=0, maximo=None):
+        """Converte um parâmetro em inteiro dentro dos limites"""
+        if valor is None or valor == "":
+            if padrao is None:
+                raise ErroHTTP(400, f"Parâmetro obrigatório: {nome}")
+            return padrao
+        try:
+            numero = int(valor)
+        except (TypeError, ValueError):
+            raise ErroHTTP(400, f"{nome} deve ser um número inteiro")
+        if numero < minimo or (maximo is not None and numero > maximo):
+            raise ErroHTTP(400, f"{nome} fora do intervalo permitido")
+        return numero
+    
+    def _paginacao(self, consulta):
+        """Offset e limite de uma listagem"""
+        return (self._inteiro(consulta.get("offset"), "offset", 0),
+                self._inteiro(consulta.get("limite"), "limite", LIMITE_PADRAO, 1, LIMITE_MAXIMO))
+    
+    def _obter(self, collection, item_id, descricao):
+        """Busca um registro ou responde 404"""
+        item = self.db.get_item(collection, item_id)
+        if not item:
+            raise ErroHTTP(404, f"{descricao} não encontrado")
+        return item
+    
+    def listar_produtos(self, consulta):
+        """GET /produtos?categoria=&offset=&limite="""
+        offset, limite = self._paginacao(consulta)
+        filtros = {"categoria": consulta["categoria"]} if consulta.get("categoria") else None
+        itens, total = self.db.get_pagina("produtos", offset, limite, filtros)
+        return 200, {"itens": itens, "total": total, "offset": offset, "limite": limite}
+    
+    def buscar_produtos(self, consulta):
+        """GET /produtos/busca?q=&limite= (nome ou marca, sem acentos)"""
+        termo = consulta.get("q", "").strip()
+        if not termo:
+            raise ErroHTTP(400, "Parâmetro obrigatório: q")
+        limite = self._inteiro(consulta.get("limite"), "limite", LIMITE_PADRAO, 1, LIMITE_MAXIMO)
+        return 200, {"itens": self.db.buscar_texto("produtos", termo, limite)}
+    
+    def produtos_baixo_estoque(self, consulta):
+        """GET /produtos/baixo-estoque?limite= (sem limite: ponto de reposição de cada produto)"""
+        limite = consulta.get("limite")
+        limite = None if limite is None else self._inteiro(limite, "limite")
+        return 200, {"itens": self.db.get_produtos_baixo_estoque(limite)}
+    
+    def produtos_vencendo(self, consulta):
+        """GET /produtos/vencendo?dias="""
+        dias = self._inteiro(consulta.get("dias"), "dias", 30)
+        return 200, {"itens": self.db.get_produtos_vencendo(dias)}
+    
+    def obter_produto(self, consulta, produto_id):
+        """GET /produtos/<id>"""
+        return 200, self._obter("produtos", produto_id, "Produto")
+    
+    def atualizar_estoque(self, consulta, produto_id, dados):
+        """POST /produtos/<id>/estoque {"tipo": "entrada"|"saida", "quantidade": n}"""
+        return 200, self.servicos.estoque.movimentar(produto_id, dados.get("tipo"), dados.get("quantidade"))
+    
+    def cadastrar_produto(self, consulta, dados):
+        """POST /produtos (campos do cadastro; validade em DD/MM/AAAA ou AAAA-MM-DD)"""
+        return 201, self.servicos.cadastros.cadastrar("produtos", dados)
+    
+    def cadastrar_cliente(self, consulta, dados):
+        """POST /clientes {"nome", "cpf", "telefone", "email", "endereco"}"""
+        return 201, self.servicos.cadastros.cadastrar("clientes", dados)
+    
+    def listar_pedidos(self, consulta):
+        """GET /pedidos?status=&cliente_id=&offset=&limite="""
+        offset, limite = self._paginacao(consulta)
+        filtros = {}
+        if consulta.get("status"):
+            filtros["status"] = consulta["status"]
+        if consulta.get("cliente_id"):
+            filtros["cliente_id"] = self._inteiro(consulta["cliente_id"], "cliente_id")
+        itens, total = self.db.get_pagina("pedidos", offset, limite, filtros or None)
+        return 200, {"itens": itens, "total": total, "offset": offset, "limite": limite}
+    
+    def obter_pedido(self, consulta, pedido_id):
+        """GET /pedidos/<id>"""
+        return 200, self._obter("pedidos", pedido_id, "Pedido")
+    
+    def criar_pedido(self, consulta, dados):
+        """POST /pedidos {"cliente_id", "itens": [{"produto_id", "quantidade"}], "observacoes"}"""
+        cliente_id = self._inteiro(dados.get("cliente_id"), "cliente_id", minimo=1)
+        if not isinstance(dados.get("itens"), list):
+            raise ErroHTTP(400, "itens deve ser uma lista")
+        itens = []
+        for item in dados["itens"]:
+            if not isinstance(item, dict):
+                raise ErroHTTP(400, "Item de pedido inválido")
+            itens.append((self._inteiro(item.get("produto_id"), "produto_id", minimo=1), item.get("quantidade")))
+        return 201, self.servicos.pedidos.criar(cliente_id, itens, str(dados.get("observacoes") or ""))
+    
+    def aprovar_pedido(self, consulta, pedido_id, dados):
+        """POST /pedidos/<id>/aprovar (aprovação e baixa de estoque em uma transação)"""
+        return 200, self.servicos.pedidos.aprovar(pedido_id)
+    
+    def rejeitar_pedido(self, consulta, pedido_id, dados):
+        """POST /pedidos/<id>/rejeitar {"motivo"}"""
+        return 200, self.servicos.pedidos.rejeitar(pedido_id, str(dados.get("motivo") or "").strip())
+    
+    def listar_relatorios(self, consulta):
+        """GET /relatorios"""
+        return 200, {"relatorios": list(RelatorioController.RELATORIOS)}
+    
+    def obter_relatorio(self, consulta, nome):
+        """GET /relatorios/<nome>?offset=&limite= (produtos_solicitados aceita ?dias=)"""
+        if nome not in RelatorioController.RELATORIOS:
+            raise ErroHTTP(404, f"Relatório inexistente: {nome}")
+        offset, limite = self._paginacao(consulta)
+        
+        metodo = getattr(self.relatorios, RelatorioController.RELATORIOS[nome])
+        if nome == "produtos_solicitados" and consulta.get("dias"):
+            linhas = metodo(self._inteiro(consulta["dias"], "dias", minimo=1))
+        else:
+            linhas = metodo()
+        pagina = list(islice(linhas, offset, offset + limite + 1))
+        return 200, {
+            "relatorio": nome,
+            "linhas": pagina[:limite],
+            "offset": offset,
+            "limite": limite,
+            "mais": len(pagina) > limite
+        }
+    
+    async def atender(self, reader, writer):
+        """Atende uma conexão, requisição a requisição, enquanto houver keep-alive"""
+        try:
+            while True:
+                requisicao = await self._ler_requisicao(reader)
+                if requisicao is None:
+                    break
+                if isinstance(requisicao, ErroHTTP):
+                    self._responder(writer, requisicao.status, self._serializar({"erro": str(requisicao)}), False)
+                    await writer.drain()
+                    break
+                
+                metodo, alvo, versao, cabecalhos, corpo = requisicao
+                conexao = cabecalhos.get("connection", "").lower()
+                manter = conexao != "close" if versao == "HTTP/1.1" else conexao == "keep-alive"
+                status, resposta = await asyncio.get_running_loop().run_in_executor(
+                    None, self.tratar, metodo, alvo, cabecalhos, corpo)
+                self._responder(writer, status, resposta, manter)
+                await writer.drain()
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _ler_requisicao(self, reader):
+        """Lê linha de requisição, cabeçalhos e corpo; None se a conexão terminou"""
+        try:
+            linha = await reader.readline()
+            if not linha:
+                return None
+            partes = linha.decode('latin-1').split()
+            if len(partes) != 3:
+                return ErroHTTP(400, "Requisição inválida")
+            metodo, alvo, versao = partes
+            
+            cabecalhos = {}
+            while True:
+                linha = await reader.readline()
+                if linha in (b"\r\n", b"\n", b""):
+                    break
+                if len(cabecalhos) >= MAXIMO_CABECALHOS:
+                    return ErroHTTP(400, "Cabeçalhos em excesso")
+                nome, separador, valor = linha.decode('latin-1').partition(":")
+                if not separador:
+                    return ErroHTTP(400, "Cabeçalho inválido")
+                cabecalhos[nome.strip().lower()] = valor.strip()
+        except (asyncio.LimitOverrunError, ValueError):
+            return ErroHTTP(400, "Linha da requisição muito longa")
+        
+        try:
+            tamanho = int(cabecalhos.get("content-length", 0))
+        except ValueError:
+            return ErroHTTP(400, "Content-Length inválido")
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            return ErroHTTP(413, "Corpo da requisição muito grande")
+        corpo = await reader.readexactly(tamanho) if tamanho > 0 else b""
+        return metodo.upper(), alvo, versao.upper(), cabecalhos, corpo
+    
+    def _responder(self, writer, status, corpo, manter):
+        """Grava a resposta JSON com Content-Length (necessário ao keep-alive)"""
+        cabecalho = (
+            f"HTTP/1.1 {status} {MENSAGENS_STATUS.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(corpo)}\r\n"
+            f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n"
+        )
+        writer.write(cabecalho.encode('latin-1') + corpo)
+    
+    async def servir(self, host="127.0.0.1", porta=8080, ao_iniciar=None):
+        """Atende conexões até ser cancelado"""
+        servidor = await asyncio.start_server(self.atender, host, porta, limit=TAMANHO_MAXIMO_LINHA)
+        if ao_iniciar:
+            ao_iniciar(servidor)
+        async with servidor:
+            await servidor.serve_forever()
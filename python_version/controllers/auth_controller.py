@@ -52,11 +52,10 @@ class AuthController:
     
     def verificar_credenciais(self, username, senha):
         """Verifica se as credenciais estão corretas"""
-        usuarios = self.db.get_items("usuarios")
-        
-        for usuario in usuarios:
-            if usuario['username'] == username and usuario['senha'] == senha:
-                return usuario
+        # username é um campo único, localizado pelo índice
+        usuario = self.db.buscar_unico("usuarios", "username", username)
+        if usuario and usuario['senha'] == senha:
+            return usuario
         
         return None
     
@@ -66,14 +65,7 @@ class AuthController:
         print("        RECUPERAÇÃO DE SENHA")
         print("=" * 40)
         
-        usuarios = self.db.get_items("usuarios")
-        usuario = None
-        
-        for u in usuarios:
-            if u['username'] == username:
-                usuario = u
-                break
-        
+        usuario = self.db.buscar_unico("usuarios", "username", username)
         if not usuario:
             print("❌ Usuário não encontrado!")
             return
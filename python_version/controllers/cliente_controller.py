@@ -4,13 +4,18 @@
 Controlador de Clientes - Sistema IGO
 """
 
-from datetime import datetime
+from models.database import versao_atual
+from models.servicos import ServicoCadastros
+from views.edicao_view import EdicaoView
+from views.paginador_view import PaginadorView
 
 class ClienteController:
     """Controlador responsável pela gestão de clientes"""
     
     def __init__(self, database):
         self.db = database
+        self.cadastros = ServicoCadastros(database)
+        self.edicao = EdicaoView(database)
     
     def menu_clientes(self):
         """Menu de gestão de clientes"""
@@ -57,42 +62,44 @@ class ClienteController:
         if not cpf:
             print("❌ CPF não pode estar vazio!")
             return
+        if self.db.buscar_unico("clientes", "cpf", cpf):
+            print("❌ CPF já cadastrado!")
+            return
         
         telefone = input("Telefone: ").strip()
         email = input("Email: ").strip()
         endereco = input("Endereço: ").strip()
         
-        cliente = {
-            "nome": nome,
-            "cpf": cpf,
-            "telefone": telefone,
-            "email": email,
-            "endereco": endereco,
-            "data_cadastro": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        try:
+            novo_cliente = self.cadastros.cadastrar("clientes", {
+                "nome": nome,
+                "cpf": cpf,
+                "telefone": telefone,
+                "email": email,
+                "endereco": endereco
+            })
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
         
-        novo_cliente = self.db.add_item("clientes", cliente)
         print(f"\n✅ Cliente '{novo_cliente['nome']}' cadastrado com sucesso!")
     
     def listar_clientes(self):
-        """Lista todos os clientes"""
-        clientes = self.db.get_items("clientes")
+        """Lista todos os clientes, uma página por vez"""
+        def exibir_pagina(clientes):
+            print("\n" + "=" * 70)
+            print("                            LISTA DE CLIENTES")
+            print("=" * 70)
+            print(f"{'ID':<4} {'Nome':<25} {'CPF':<15} {'Telefone':<15} {'Email':<20}")
+            print("-" * 70)
+            
+            for cliente in clientes:
+                print(f"{cliente['id']:<4} {cliente['nome']:<25} {cliente['cpf']:<15} {cliente['telefone']:<15} {cliente['email']:<20}")
+            
+            print("=" * 70)
         
-        if not clientes:
+        if not PaginadorView(self.db).paginar("clientes", exibir_pagina):
             print("\n📭 Nenhum cliente cadastrado!")
-            return
-        
-        print("\n" + "=" * 70)
-        print("                            LISTA DE CLIENTES")
-        print("=" * 70)
-        print(f"{'ID':<4} {'Nome':<25} {'CPF':<15} {'Telefone':<15} {'Email':<20}")
-        print("-" * 70)
-        
-        for cliente in clientes:
-            print(f"{cliente['id']:<4} {cliente['nome']:<25} {cliente['cpf']:<15} {cliente['telefone']:<15} {cliente['email']:<20}")
-        
-        print("=" * 70)
-        print(f"Total de clientes: {len(clientes)}")
     
     def buscar_cliente(self):
         """Busca cliente por nome ou CPF"""
@@ -101,13 +108,7 @@ class ClienteController:
             print("❌ Termo de busca não pode estar vazio!")
             return
         
-        clientes = self.db.get_items("clientes")
-        encontrados = []
-        
-        for cliente in clientes:
-            if (termo.lower() in cliente['nome'].lower() or 
-                termo in cliente['cpf']):
-                encontrados.append(cliente)
+        encontrados = self.db.buscar_texto("clientes", termo)
         
         if not encontrados:
             print("❌ Nenhum cliente encontrado!")
@@ -144,26 +145,29 @@ class ClienteController:
         print(f"\nEditando cliente: {cliente['nome']}")
         self.exibir_cliente_detalhado(cliente)
         
+        versao = versao_atual(cliente)
+        alteracoes = {}
+        
         print("\nDeixe em branco para manter o valor atual:")
         
         nome = input(f"Nome [{cliente['nome']}]: ").strip()
         if nome:
-            cliente['nome'] = nome
+            alteracoes['nome'] = nome
         
         telefone = input(f"Telefone [{cliente['telefone']}]: ").strip()
         if telefone:
-            cliente['telefone'] = telefone
+            alteracoes['telefone'] = telefone
         
         email = input(f"Email [{cliente['email']}]: ").strip()
         if email:
-            cliente['email'] = email
+            alteracoes['email'] = email
         
         endereco = input(f"Endereço [{cliente['endereco']}]: ").strip()
         if endereco:
-            cliente['endereco'] = endereco
+            alteracoes['endereco'] = endereco
         
-        self.db.update_item("clientes", cliente['id'], cliente)
-        print("✅ Cliente atualizado com sucesso!")
+        if self.edicao.gravar("clientes", cliente['id'], alteracoes, versao, "cliente"):
+            print("✅ Cliente atualizado com sucesso!")
     
     def excluir_cliente(self):
         """Exclui um cliente"""
@@ -4,13 +4,17 @@
 Controlador de Fornecedores - Sistema IGO
 """
 
-from datetime import datetime
+from models.database import versao_atual
+from models.servicos import ServicoCadastros
+from views.edicao_view import EdicaoView
 
 class FornecedorController:
     """Controlador responsável pela gestão de fornecedores"""
     
     def __init__(self, database):
         self.db = database
+        self.cadastros = ServicoCadastros(database)
+        self.edicao = EdicaoView(database)
     
     def menu_fornecedores(self):
         """Menu de gestão de fornecedores"""
@@ -57,21 +61,26 @@ class FornecedorController:
         if not cnpj:
             print("❌ CNPJ não pode estar vazio!")
             return
+        if self.db.buscar_unico("fornecedores", "cnpj", cnpj):
+            print("❌ CNPJ já cadastrado!")
+            return
         
         telefone = input("Telefone: ").strip()
         email = input("Email: ").strip()
         endereco = input("Endereço: ").strip()
         
-        fornecedor = {
-            "nome": nome,
-            "cnpj": cnpj,
-            "telefone": telefone,
-            "email": email,
-            "endereco": endereco,
-            "data_cadastro": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        try:
+            novo_fornecedor = self.cadastros.cadastrar("fornecedores", {
+                "nome": nome,
+                "cnpj": cnpj,
+                "telefone": telefone,
+                "email": email,
+                "endereco": endereco
+            })
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
         
-        novo_fornecedor = self.db.add_item("fornecedores", fornecedor)
         print(f"\n✅ Fornecedor '{novo_fornecedor['nome']}' cadastrado com sucesso!")
     
     def listar_fornecedores(self):
@@ -101,13 +110,7 @@ class FornecedorController:
             print("❌ Termo de busca não pode estar vazio!")
             return
         
-        fornecedores = self.db.get_items("fornecedores")
-        encontrados = []
-        
-        for fornecedor in fornecedores:
-            if (termo.lower() in fornecedor['nome'].lower() or 
-                termo in fornecedor['cnpj']):
-                encontrados.append(fornecedor)
+        encontrados = self.db.buscar_texto("fornecedores", termo)
         
         if not encontrados:
             print("❌ Nenhum fornecedor encontrado!")
@@ -144,26 +147,29 @@ class FornecedorController:
         print(f"\nEditando fornecedor: {fornecedor['nome']}")
         self.exibir_fornecedor_detalhado(fornecedor)
         
+        versao = versao_atual(fornecedor)
+        alteracoes = {}
+        
         print("\nDeixe em branco para manter o valor atual:")
         
         nome = input(f"Nome [{fornecedor['nome']}]: ").strip()
         if nome:
-            fornecedor['nome'] = nome
+            alteracoes['nome'] = nome
         
         telefone = input(f"Telefone [{fornecedor['telefone']}]: ").strip()
         if telefone:
-            fornecedor['telefone'] = telefone
+            alteracoes['telefone'] = telefone
         
         email = input(f"Email [{fornecedor['email']}]: ").strip()
         if email:
-            fornecedor['email'] = email
+            alteracoes['email'] = email
         
         endereco = input(f"Endereço [{fornecedor['endereco']}]: ").strip()
         if endereco:
-            fornecedor['endereco'] = endereco
+            alteracoes['endereco'] = endereco
         
-        self.db.update_item("fornecedores", fornecedor['id'], fornecedor)
-        print("✅ Fornecedor atualizado com sucesso!")
+        if self.edicao.gravar("fornecedores", fornecedor['id'], alteracoes, versao, "fornecedor"):
+            print("✅ Fornecedor atualizado com sucesso!")
     
     def excluir_fornecedor(self):
         """Exclui um fornecedor"""
@@ -4,13 +4,17 @@
 Controlador de Funcionários - Sistema IGO
 """
 
-from datetime import datetime
+from models.database import versao_atual
+from models.servicos import ServicoCadastros
+from views.edicao_view import EdicaoView
 
 class FuncionarioController:
     """Controlador responsável pela gestão de funcionários"""
     
     def __init__(self, database):
         self.db = database
+        self.cadastros = ServicoCadastros(database)
+        self.edicao = EdicaoView(database)
     
     def menu_funcionarios(self):
         """Menu de gestão de funcionários"""
@@ -57,6 +61,9 @@ class FuncionarioController:
         if not cpf:
             print("❌ CPF não pode estar vazio!")
             return
+        if self.db.buscar_unico("funcionarios", "cpf", cpf):
+            print("❌ CPF já cadastrado!")
+            return
         
         cargo = input("Cargo: ").strip()
         if not cargo:
@@ -67,17 +74,19 @@ class FuncionarioController:
         email = input("Email: ").strip()
         salario = input("Salário: R$ ").strip()
         
-        funcionario = {
-            "nome": nome,
-            "cpf": cpf,
-            "cargo": cargo,
-            "telefone": telefone,
-            "email": email,
-            "salario": salario,
-            "data_admissao": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        novo_funcionario = self.db.add_item("funcionarios", funcionario)
+        try:
+            novo_funcionario = self.cadastros.cadastrar("funcionarios", {
+                "nome": nome,
+                "cpf": cpf,
+                "cargo": cargo,
+                "telefone": telefone,
+                "email": email,
+                "salario": salario
+            })
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        
         print(f"\n✅ Funcionário '{novo_funcionario['nome']}' cadastrado com sucesso!")
     
     def listar_funcionarios(self):
@@ -107,13 +116,7 @@ class FuncionarioController:
             print("❌ Termo de busca não pode estar vazio!")
             return
         
-        funcionarios = self.db.get_items("funcionarios")
-        encontrados = []
-        
-        for funcionario in funcionarios:
-            if (termo.lower() in funcionario['nome'].lower() or 
-                termo in funcionario['cpf']):
-                encontrados.append(funcionario)
+        encontrados = self.db.buscar_texto("funcionarios", termo)
         
         if not encontrados:
             print("❌ Nenhum funcionário encontrado!")
@@ -151,30 +154,33 @@ class FuncionarioController:
         print(f"\nEditando funcionário: {funcionario['nome']}")
         self.exibir_funcionario_detalhado(funcionario)
         
+        versao = versao_atual(funcionario)
+        alteracoes = {}
+        
         print("\nDeixe em branco para manter o valor atual:")
         
         nome = input(f"Nome [{funcionario['nome']}]: ").strip()
         if nome:
-            funcionario['nome'] = nome
+            alteracoes['nome'] = nome
         
         cargo = input(f"Cargo [{funcionario['cargo']}]: ").strip()
         if cargo:
-            funcionario['cargo'] = cargo
+            alteracoes['cargo'] = cargo
         
         telefone = input(f"Telefone [{funcionario['telefone']}]: ").strip()
         if telefone:
-            funcionario['telefone'] = telefone
+            alteracoes['telefone'] = telefone
         
         email = input(f"Email [{funcionario['email']}]: ").strip()
         if email:
-            funcionario['email'] = email
+            alteracoes['email'] = email
         
         salario = input(f"Salário [{funcionario['salario']}]: ").strip()
         if salario:
-            funcionario['salario'] = salario
+            alteracoes['salario'] = salario
         
-        self.db.update_item("funcionarios", funcionario['id'], funcionario)
-        print("✅ Funcionário atualizado com sucesso!")
+        if self.edicao.gravar("funcionarios", funcionario['id'], alteracoes, versao, "funcionário"):
+            print("✅ Funcionário atualizado com sucesso!")
     
     def excluir_funcionario(self):
         """Exclui um funcionário"""
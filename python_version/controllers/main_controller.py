@@ -11,6 +11,8 @@ from controllers.cliente_controller import ClienteController
 from controllers.funcionario_controller import FuncionarioController
 from controllers.pedido_controller import PedidoController
 from controllers.relatorio_controller import RelatorioController
+from models.importacao import importar_arquivo
+from models.validacao import VALIDADORES
 
 class MainController:
     """Controlador principal que gerencia todos os menus e funcionalidades"""
@@ -238,6 +240,8 @@ class MainController:
             print("2 - Relatório de Movimentações")
             print("3 - Produtos Mais Solicitados")
             print("4 - Relatório de Fornecedores")
+            print("5 - Movimentações por Período")
+            print("6 - Exportar Relatório (CSV/JSONL)")
             print("0 - Voltar")
             
             opcao = input("\nEscolha uma opção: ").strip()
@@ -247,9 +251,13 @@ class MainController:
             elif opcao == "2":
                 self.relatorio_controller.relatorio_movimentacoes()
             elif opcao == "3":
-                self.relatorio_controller.relatorio_produtos_solicitados()
+                self.relatorio_controller.menu_produtos_solicitados()
             elif opcao == "4":
                 self.relatorio_controller.relatorio_fornecedores()
+            elif opcao == "5":
+                self.relatorio_controller.relatorio_movimentacoes_periodo()
+            elif opcao == "6":
+                self.relatorio_controller.menu_exportacao()
             elif opcao == "0":
                 break
             else:
@@ -263,6 +271,7 @@ class MainController:
         print("1 - Alterar Senha")
         print("2 - Backup do Sistema")
         print("3 - Restaurar Sistema")
+        print("4 - Importar Dados (CSV/JSONL)")
         print("0 - Voltar")
         
         opcao = input("\nEscolha uma opção: ").strip()
@@ -274,7 +283,36 @@ class MainController:
             print("🔧 Funcionalidade em desenvolvimento...")
         elif opcao == "3":
             print("🔧 Funcionalidade em desenvolvimento...")
+        elif opcao == "4":
+            self.importar_dados()
         elif opcao == "0":
             return
         else:
             print("❌ Opção inválida!")
+    
+    def importar_dados(self):
+        """Importa cadastros em lote de um arquivo CSV/JSONL"""
+        print("\nColeções:")
+        colecoes = sorted(VALIDADORES)
+        for i, collection in enumerate(colecoes, 1):
+            print(f"{i} - {collection.capitalize()}")
+        
+        opcao = input(f"Escolha a coleção (1-{len(colecoes)}): ").strip()
+        if not opcao.isdigit() or not 1 <= int(opcao) <= len(colecoes):
+            print("❌ Coleção inválida!")
+            return
+        
+        caminho = input("Caminho do arquivo (.csv ou .jsonl): ").strip()
+        if not caminho:
+            print("❌ Caminho não pode estar vazio!")
+            return
+        
+        try:
+            resumo = importar_arquivo(self.db, colecoes[int(opcao) - 1], caminho)
+        except (OSError, ValueError) as e:
+            print(f"❌ Erro na importação: {e}")
+            return
+        
+        print(f"✅ {resumo['importados']} registro(s) importado(s)!")
+        if resumo['rejeitados']:
+            print(f"⚠️  {resumo['rejeitados']} registro(s) rejeitado(s); detalhes em {resumo['arquivo_erros']}")
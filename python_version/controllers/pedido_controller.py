@@ -4,13 +4,15 @@
 Controlador de Pedidos - Sistema IGO
 """
 
-from datetime import datetime
+from models.servicos import ServicoPedidos
+from views.paginador_view import PaginadorView
 
 class PedidoController:
     """Controlador responsável pela gestão de pedidos"""
     
     def __init__(self, database):
         self.db = database
+        self.servico = ServicoPedidos(database)
     
     def criar_pedido(self):
         """Cria um novo pedido"""
@@ -86,15 +88,7 @@ class PedidoController:
             subtotal = preco_unitario * quantidade
             total += subtotal
             
-            item = {
-                "produto_id": produto['id'],
-                "nome_produto": produto['nome'],
-                "quantidade": quantidade,
-                "preco_unitario": preco_unitario,
-                "subtotal": subtotal
-            }
-            
-            itens.append(item)
+            itens.append((produto['id'], quantidade))
             print(f"✅ {produto['nome']} x{quantidade} = R$ {subtotal:.2f}")
         
         if not itens:
@@ -102,44 +96,35 @@ class PedidoController:
             return
         
         # Criar pedido
-        pedido = {
-            "cliente_id": cliente['id'],
-            "cliente_nome": cliente['nome'],
-            "itens": itens,
-            "total": total,
-            "status": "pendente",
-            "data_pedido": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "data_aprovacao": None,
-            "observacoes": input("Observações (opcional): ").strip()
-        }
+        try:
+            novo_pedido = self.servico.criar(cliente['id'], itens, input("Observações (opcional): ").strip())
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
         
-        novo_pedido = self.db.add_item("pedidos", pedido)
         print(f"\n✅ Pedido criado com sucesso!")
         print(f"ID do Pedido: {novo_pedido['id']}")
-        print(f"Total: R$ {total:.2f}")
+        print(f"Total: R$ {novo_pedido['total']:.2f}")
         print(f"Status: {novo_pedido['status']}")
     
     def listar_pedidos(self):
-        """Lista todos os pedidos"""
-        pedidos = self.db.get_items("pedidos")
+        """Lista todos os pedidos, uma página por vez"""
+        def exibir_pagina(pedidos):
+            print("\n" + "=" * 80)
+            print("                              LISTA DE PEDIDOS")
+            print("=" * 80)
+            print(f"{'ID':<4} {'Cliente':<25} {'Total':<10} {'Status':<12} {'Data':<20}")
+            print("-" * 80)
+            
+            for pedido in pedidos:
+                data = pedido['data_pedido'][:10]  # Apenas a data
+                total = f"R$ {pedido['total']:.2f}"
+                print(f"{pedido['id']:<4} {pedido['cliente_nome']:<25} {total:<10} {pedido['status']:<12} {data:<20}")
+            
+            print("=" * 80)
         
-        if not pedidos:
+        if not PaginadorView(self.db).paginar("pedidos", exibir_pagina):
             print("\n📭 Nenhum pedido encontrado!")
-            return
-        
-        print("\n" + "=" * 80)
-        print("                              LISTA DE PEDIDOS")
-        print("=" * 80)
-        print(f"{'ID':<4} {'Cliente':<25} {'Total':<10} {'Status':<12} {'Data':<20}")
-        print("-" * 80)
-        
-        for pedido in pedidos:
-            data = pedido['data_pedido'][:10]  # Apenas a data
-            total = f"R$ {pedido['total']:.2f}"
-            print(f"{pedido['id']:<4} {pedido['cliente_nome']:<25} {total:<10} {pedido['status']:<12} {data:<20}")
-        
-        print("=" * 80)
-        print(f"Total de pedidos: {len(pedidos)}")
     
     def listar_meus_pedidos(self):
         """Lista pedidos do cliente logado"""
@@ -203,33 +188,21 @@ class PedidoController:
             
             acao = input("Aprovar (a) ou Rejeitar (r)? ").strip().lower()
             
-            if acao == 'a':
-                # Aprovar pedido
-                self.db.update_item("pedidos", pedido['id'], {
-                    "status": "aprovado",
-                    "data_aprovacao": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                })
-                
-                # Atualizar estoque
-                for item in pedido['itens']:
-                    produto = self.db.get_item("produtos", item['produto_id'])
-                    if produto:
-                        nova_quantidade = produto['quantidade'] - item['quantidade']
-                        self.db.update_item("produtos", produto['id'], {"quantidade": nova_quantidade})
+            try:
+                if acao == 'a':
+                    # Aprovação e baixa de estoque são gravadas juntas
+                    self.servico.aprovar(pedido['id'])
+                    print("✅ Pedido aprovado e estoque atualizado!")
                 
-                print("✅ Pedido aprovado e estoque atualizado!")
+                elif acao == 'r':
+                    motivo = input("Motivo da rejeição: ").strip()
+                    self.servico.rejeitar(pedido['id'], motivo)
+                    print("❌ Pedido rejeitado!")
                 
-            elif acao == 'r':
-                # Rejeitar pedido
-                motivo = input("Motivo da rejeição: ").strip()
-                self.db.update_item("pedidos", pedido['id'], {
-                    "status": "rejeitado",
-                    "observacoes": f"Rejeitado: {motivo}"
-                })
-                print("❌ Pedido rejeitado!")
-            
-            else:
-                print("⚠️  Ação ignorada!")
+                else:
+                    print("⚠️  Ação ignorada!")
+            except ValueError as e:
+                print(f"❌ {e}")
     
     def historico_pedidos(self):
         """Exibe histórico de pedidos"""
@@ -246,22 +219,20 @@ class PedidoController:
         
         filtro = input("Escolha o filtro (1-4): ").strip()
         
-        if filtro == "1":
-            pedidos = self.db.get_items("pedidos")
-        elif filtro == "2":
-            pedidos = self.db.get_items("pedidos", {"status": "aprovado"})
-        elif filtro == "3":
-            pedidos = self.db.get_items("pedidos", {"status": "rejeitado"})
-        elif filtro == "4":
-            pedidos = self.db.get_items("pedidos", {"status": "pendente"})
-        else:
+        filtros = {
+            "1": None,
+            "2": {"status": "aprovado"},
+            "3": {"status": "rejeitado"},
+            "4": {"status": "pendente"}
+        }
+        if filtro not in filtros:
             print("❌ Filtro inválido!")
             return
         
-        if not pedidos:
-            print("📭 Nenhum pedido encontrado!")
-            return
+        def exibir_pagina(pedidos):
+            for pedido in pedidos:
+                self.exibir_pedido_detalhado(pedido)
         
-        print(f"\nEncontrados {len(pedidos)} pedido(s):")
-        for pedido in pedidos:
-            self.exibir_pedido_detalhado(pedido)
+        # Pedidos detalhados ocupam várias linhas: páginas menores
+        if not PaginadorView(self.db, tamanho_pagina=5).paginar("pedidos", exibir_pagina, filtros[filtro]):
+            print("📭 Nenhum pedido encontrado!")
@@ -4,13 +4,26 @@
 Controlador de Produtos - Sistema IGO
 """
 
-from datetime import datetime, timedelta
+from models.database import PONTO_REPOSICAO_PADRAO, versao_atual
+from models.servicos import ServicoCadastros
+from views.edicao_view import EdicaoView
+from views.paginador_view import PaginadorView
 
 class ProdutoController:
     """Controlador responsável pela gestão de produtos"""
     
     def __init__(self, database):
         self.db = database
+        self.cadastros = ServicoCadastros(database)
+        self.edicao = EdicaoView(database)
+        self.estoque = self.cadastros.estoque
+        database.inscrever(self._ao_mudar)
+    
+    def _ao_mudar(self, evento, collection, item):
+        """Avisa quando uma alteração leva um produto ao ponto de reposição"""
+        if evento == "estoque_baixo":
+            print(f"\n⚠️  '{item['nome']}' atingiu o ponto de reposição "
+                  f"(Qtd: {item['quantidade']} | Ponto: {item.get('ponto_reposicao', PONTO_REPOSICAO_PADRAO)})")
     
     def menu_produtos(self):
         """Menu de gestão de produtos"""
@@ -117,6 +130,19 @@ class ProdutoController:
                 print("❌ Quantidade deve ser um número!")
                 continue
         
+        # Ponto de reposição
+        while True:
+            try:
+                ponto_str = input(f"Ponto de reposição [{PONTO_REPOSICAO_PADRAO}]: ").strip()
+                ponto_reposicao = int(ponto_str) if ponto_str else PONTO_REPOSICAO_PADRAO
+                if ponto_reposicao < 0:
+                    print("❌ Ponto de reposição não pode ser negativo!")
+                    continue
+                break
+            except ValueError:
+                print("❌ Ponto de reposição deve ser um número!")
+                continue
+        
         # Preço
         while True:
             try:
@@ -129,48 +155,43 @@ class ProdutoController:
                 print("❌ Preço deve ser um número!")
                 continue
         
-        # Criar produto
-        produto = {
-            "nome": nome,
-            "categoria": categoria,
-            "tamanho": tamanho,
-            "marca": marca,
-            "validade": validade,
-            "quantidade": quantidade,
-            "preco": preco,
-            "data_cadastro": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        # Adicionar ao banco
-        novo_produto = self.db.add_item("produtos", produto)
+        # Criar produto (com a movimentação de entrada da quantidade inicial)
+        try:
+            novo_produto = self.cadastros.cadastrar("produtos", {
+                "nome": nome,
+                "categoria": categoria,
+                "tamanho": tamanho,
+                "marca": marca,
+                "validade": validade,
+                "quantidade": quantidade,
+                "ponto_reposicao": ponto_reposicao,
+                "preco": preco
+            })
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
         
         print(f"\n✅ Produto '{novo_produto['nome']}' cadastrado com sucesso!")
         print(f"ID: {novo_produto['id']}")
-        
-        # Registrar movimentação
-        self.registrar_movimentacao("entrada", novo_produto['id'], quantidade, "Cadastro inicial")
     
     def listar_produtos(self):
-        """Lista todos os produtos"""
-        produtos = self.db.get_items("produtos")
+        """Lista todos os produtos, uma página por vez"""
+        def exibir_pagina(produtos):
+            print("\n" + "=" * 80)
+            print("                              LISTA DE PRODUTOS")
+            print("=" * 80)
+            print(f"{'ID':<4} {'Nome':<25} {'Categoria':<10} {'Tamanho':<8} {'Marca':<15} {'Qtd':<4} {'Preço':<8}")
+            print("-" * 80)
+            
+            for produto in produtos:
+                tamanho = produto.get('tamanho', 'N/A')
+                preco = f"R$ {produto.get('preco', 0):.2f}"
+                print(f"{produto['id']:<4} {produto['nome']:<25} {produto['categoria']:<10} {tamanho:<8} {produto['marca']:<15} {produto['quantidade']:<4} {preco:<8}")
+            
+            print("=" * 80)
         
-        if not produtos:
+        if not PaginadorView(self.db).paginar("produtos", exibir_pagina):
             print("\n📭 Nenhum produto cadastrado!")
-            return
-        
-        print("\n" + "=" * 80)
-        print("                              LISTA DE PRODUTOS")
-        print("=" * 80)
-        print(f"{'ID':<4} {'Nome':<25} {'Categoria':<10} {'Tamanho':<8} {'Marca':<15} {'Qtd':<4} {'Preço':<8}")
-        print("-" * 80)
-        
-        for produto in produtos:
-            tamanho = produto.get('tamanho', 'N/A')
-            preco = f"R$ {produto.get('preco', 0):.2f}"
-            print(f"{produto['id']:<4} {produto['nome']:<25} {produto['categoria']:<10} {tamanho:<8} {produto['marca']:<15} {produto['quantidade']:<4} {preco:<8}")
-        
-        print("=" * 80)
-        print(f"Total de produtos: {len(produtos)}")
     
     def buscar_produto(self):
         """Busca produto por nome ou ID"""
@@ -183,19 +204,14 @@ class ProdutoController:
             print("❌ Termo de busca não pode estar vazio!")
             return
         
-        produtos = self.db.get_items("produtos")
-        encontrados = []
+        # Buscar por nome ou marca (sem acentos, ordenado por relevância)
+        encontrados = self.db.buscar_texto("produtos", termo)
         
-        for produto in produtos:
-            # Buscar por ID
-            if termo.isdigit() and produto['id'] == int(termo):
-                encontrados.append(produto)
-            # Buscar por nome
-            elif termo.lower() in produto['nome'].lower():
-                encontrados.append(produto)
-            # Buscar por marca
-            elif termo.lower() in produto['marca'].lower():
-                encontrados.append(produto)
+        # Buscar por ID
+        if termo.isdigit():
+            produto = self.db.get_item("produtos", int(termo))
+            if produto and produto not in encontrados:
+                encontrados.insert(0, produto)
         
         if not encontrados:
             print("❌ Nenhum produto encontrado!")
@@ -217,6 +233,7 @@ class ProdutoController:
         if produto['categoria'] == 'alimento':
             print(f"Validade: {produto.get('validade', 'N/A')}")
         print(f"Quantidade: {produto['quantidade']}")
+        print(f"Ponto de Reposição: {produto.get('ponto_reposicao', PONTO_REPOSICAO_PADRAO)}")
         print(f"Preço: R$ {produto.get('preco', 0):.2f}")
         print(f"Data de Cadastro: {produto.get('data_cadastro', 'N/A')}")
         print("-" * 50)
@@ -240,30 +257,40 @@ class ProdutoController:
         print(f"\nEditando produto: {produto['nome']}")
         self.exibir_produto_detalhado(produto)
         
+        versao = versao_atual(produto)
+        alteracoes = {}
+        
         # Campos editáveis
         print("\nDeixe em branco para manter o valor atual:")
         
         nome = input(f"Nome [{produto['nome']}]: ").strip()
         if nome:
-            produto['nome'] = nome
+            alteracoes['nome'] = nome
         
         marca = input(f"Marca [{produto['marca']}]: ").strip()
         if marca:
-            produto['marca'] = marca
+            alteracoes['marca'] = marca
         
         if produto['categoria'] == 'roupa':
             tamanho = input(f"Tamanho [{produto.get('tamanho', 'N/A')}]: ").strip()
             if tamanho:
-                produto['tamanho'] = tamanho.upper()
+                alteracoes['tamanho'] = tamanho.upper()
         
         if produto['categoria'] == 'alimento':
             validade = input(f"Validade [{produto.get('validade', 'N/A')}]: ").strip()
             if validade:
-                produto['validade'] = validade
+                alteracoes['validade'] = validade
+        
+        ponto = input(f"Ponto de reposição [{produto.get('ponto_reposicao', PONTO_REPOSICAO_PADRAO)}]: ").strip()
+        if ponto:
+            if ponto.isdigit():
+                alteracoes['ponto_reposicao'] = int(ponto)
+            else:
+                print("❌ Ponto de reposição deve ser um número! Valor atual mantido.")
         
         # Atualizar no banco
-        self.db.update_item("produtos", produto['id'], produto)
-        print("✅ Produto atualizado com sucesso!")
+        if self.edicao.gravar("produtos", produto['id'], alteracoes, versao, "produto"):
+            print("✅ Produto atualizado com sucesso!")
     
     def excluir_produto(self):
         """Exclui um produto"""
@@ -330,40 +357,34 @@ class ProdutoController:
                 print("❌ Quantidade deve ser um número!")
                 continue
         
-        # Calcular nova quantidade
-        if tipo == '1':  # Entrada
-            nova_quantidade = produto['quantidade'] + quantidade
-            tipo_mov = "entrada"
-            descricao = f"Entrada de {quantidade} unidades"
-        else:  # Saída
-            if produto['quantidade'] < quantidade:
-                print("❌ Quantidade insuficiente em estoque!")
-                return
-            nova_quantidade = produto['quantidade'] - quantidade
-            tipo_mov = "saida"
-            descricao = f"Saída de {quantidade} unidades"
-        
-        # Atualizar quantidade
-        self.db.update_item("produtos", produto['id'], {"quantidade": nova_quantidade})
-        
-        # Registrar movimentação
-        self.registrar_movimentacao(tipo_mov, produto['id'], quantidade, descricao)
+        try:
+            produto = self.estoque.movimentar(produto['id'], "entrada" if tipo == '1' else "saida", quantidade)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
         
-        print(f"✅ Estoque atualizado! Nova quantidade: {nova_quantidade}")
+        print(f"✅ Estoque atualizado! Nova quantidade: {produto['quantidade']}")
     
-    def produtos_baixo_estoque(self, limite=10):
-        """Lista produtos com estoque baixo"""
+    def produtos_baixo_estoque(self, limite=None):
+        """Lista produtos com estoque baixo (pelo ponto de reposição de cada um, ou por um limite único)"""
         produtos = self.db.get_produtos_baixo_estoque(limite)
         
         if not produtos:
-            print(f"\n✅ Todos os produtos estão com estoque acima de {limite} unidades!")
+            if limite is None:
+                print("\n✅ Todos os produtos estão com estoque acima do ponto de reposição!")
+            else:
+                print(f"\n✅ Todos os produtos estão com estoque acima de {limite} unidades!")
             return
         
-        print(f"\n⚠️  PRODUTOS COM ESTOQUE BAIXO (≤ {limite} unidades):")
+        if limite is None:
+            print("\n⚠️  PRODUTOS NO PONTO DE REPOSIÇÃO:")
+        else:
+            print(f"\n⚠️  PRODUTOS COM ESTOQUE BAIXO (≤ {limite} unidades):")
         print("=" * 60)
         
         for produto in produtos:
-            print(f"ID: {produto['id']} | {produto['nome']} | Qtd: {produto['quantidade']} | Categoria: {produto['categoria']}")
+            print(f"ID: {produto['id']} | {produto['nome']} | Qtd: {produto['quantidade']} | "
+                  f"Ponto: {produto.get('ponto_reposicao', PONTO_REPOSICAO_PADRAO)} | Categoria: {produto['categoria']}")
     
     def produtos_vencendo(self, dias=30):
         """Lista produtos próximos do vencimento"""
@@ -381,12 +402,4 @@ class ProdutoController:
     
     def registrar_movimentacao(self, tipo, produto_id, quantidade, descricao):
         """Registra uma movimentação de estoque"""
-        movimentacao = {
-            "tipo": tipo,
-            "produto_id": produto_id,
-            "quantidade": quantidade,
-            "descricao": descricao,
-            "data_hora": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        self.db.add_item("movimentacoes", movimentacao)
+        self.estoque.registrar_movimentacao(tipo, produto_id, quantidade, descricao)
@@ -5,12 +5,55 @@ Controlador de Relatórios - Sistema IGO
 """
 
 from datetime import datetime
+from models.database import PONTO_REPOSICAO_PADRAO
+from models.agregados import AgregadosRelatorio, HistoricoMovimentacoes, RankingProdutos
+from models.exportacao import exportar, exportar_colecao, formato_por_extensao
 
 class RelatorioController:
     """Controlador responsável pela geração de relatórios"""
     
+    # Coleções exportáveis pelo menu (usuarios fica de fora: contém as senhas)
+    COLECOES = ("produtos", "movimentacoes", "pedidos", "clientes", "fornecedores", "funcionarios")
+    
+    # Relatórios exportáveis (nome -> método que gera as linhas como dicionários)
+    RELATORIOS = {
+        "estoque": "linhas_estoque",
+        "movimentacoes": "linhas_movimentacoes",
+        "movimentacoes_diarias": "linhas_movimentacoes_diarias",
+        "produtos_solicitados": "linhas_produtos_solicitados",
+        "fornecedores": "linhas_fornecedores",
+        "geral": "linhas_geral"
+    }
+    
     def __init__(self, database):
         self.db = database
+        self._agregados = None
+        self._ranking = None
+        self._historico = None
+    
+    @property
+    def agregados(self):
+        """Agregados mantidos incrementalmente (construídos no primeiro relatório)"""
+        if self._agregados is None:
+            self._agregados = AgregadosRelatorio(self.db)
+        self.db.sincronizar()
+        return self._agregados
+    
+    @property
+    def ranking(self):
+        """Ranking de produtos solicitados (construído no primeiro relatório)"""
+        if self._ranking is None:
+            self._ranking = RankingProdutos(self.db)
+        self.db.sincronizar()
+        return self._ranking
+    
+    @property
+    def historico(self):
+        """Índice temporal das movimentações (construído no primeiro relatório)"""
+        if self._historico is None:
+            self._historico = HistoricoMovimentacoes(self.db)
+        self.db.sincronizar()
+        return self._historico
     
     def relatorio_estoque(self):
         """Gera relatório de estoque"""
@@ -18,16 +61,16 @@ class RelatorioController:
         print("                    RELATÓRIO DE ESTOQUE")
         print("=" * 60)
         
-        produtos = self.db.get_items("produtos")
-        if not produtos:
+        agregados = self.agregados
+        if not agregados.total("produtos"):
             print("📭 Nenhum produto cadastrado!")
             return
         
         # Estatísticas
-        total_produtos = len(produtos)
-        total_valor = sum(p.get('preco', 0) * p['quantidade'] for p in produtos)
-        produtos_roupa = len([p for p in produtos if p['categoria'] == 'roupa'])
-        produtos_alimento = len([p for p in produtos if p['categoria'] == 'alimento'])
+        total_produtos = agregados.total("produtos")
+        total_valor = agregados.valor_estoque
+        produtos_roupa = agregados.produtos_por_categoria.get('roupa', 0)
+        produtos_alimento = agregados.produtos_por_categoria.get('alimento', 0)
         
         print(f"Total de Produtos: {total_produtos}")
         print(f"Valor Total em Estoque: R$ {total_valor:.2f}")
@@ -39,14 +82,8 @@ class RelatorioController:
         print("PRODUTOS POR CATEGORIA:")
         print("-" * 60)
         
-        categorias = {}
-        for produto in produtos:
-            cat = produto['categoria']
-            if cat not in categorias:
-                categorias[cat] = []
-            categorias[cat].append(produto)
-        
-        for categoria, prods in categorias.items():
+        for categoria in list(agregados.produtos_por_categoria):
+            prods = self.db.get_items("produtos", {"categoria": categoria})
             print(f"\n{categoria.upper()}:")
             print(f"{'ID':<4} {'Nome':<25} {'Qtd':<4} {'Preço':<8} {'Valor Total':<12}")
             print("-" * 60)
@@ -64,18 +101,25 @@ class RelatorioController:
         print("                RELATÓRIO DE MOVIMENTAÇÕES")
         print("=" * 60)
         
-        movimentacoes = self.db.get_items("movimentacoes")
-        if not movimentacoes:
+        agregados = self.agregados
+        total = agregados.total("movimentacoes")
+        if not total:
             print("📭 Nenhuma movimentação registrada!")
             return
         
-        # Estatísticas
-        entradas = [m for m in movimentacoes if m['tipo'] == 'entrada']
-        saidas = [m for m in movimentacoes if m['tipo'] == 'saida']
+        por_tipo = agregados.movimentacoes_por_tipo
+        entradas = por_tipo.get('entrada', {}).get('registros', 0)
+        saidas = por_tipo.get('saida', {}).get('registros', 0)
+        
+        hoje = datetime.now().strftime("%Y-%m-%d")
+        totais_hoje = self.historico.totais_por_dia.get(hoje, {})
         
-        print(f"Total de Movimentações: {len(movimentacoes)}")
-        print(f"Entradas: {len(entradas)}")
-        print(f"Saídas: {len(saidas)}")
+        # Estatísticas
+        print(f"Total de Movimentações: {total}")
+        print(f"Entradas: {entradas} ({por_tipo.get('entrada', {}).get('quantidade', 0)} unidades)")
+        print(f"Saídas: {saidas} ({por_tipo.get('saida', {}).get('quantidade', 0)} unidades)")
+        print(f"Hoje: {totais_hoje.get('entrada', {}).get('registros', 0)} entradas, "
+              f"{totais_hoje.get('saida', {}).get('registros', 0)} saídas")
         
         # Últimas movimentações
         print("\n" + "-" * 60)
@@ -84,49 +128,111 @@ class RelatorioController:
         print(f"{'Data/Hora':<20} {'Tipo':<8} {'Produto ID':<12} {'Qtd':<4} {'Descrição':<30}")
         print("-" * 60)
         
-        # Ordenar por data (mais recentes primeiro)
-        movimentacoes_ordenadas = sorted(movimentacoes, key=lambda x: x['data_hora'], reverse=True)
+        # Últimas 20, já em ordem cronológica no índice
+        for mov in self.historico.ultimas(20):
+            self._exibir_movimentacao(mov)
+        
+        print("\n" + "=" * 60)
+    
+    def _exibir_movimentacao(self, mov):
+        """Exibe uma linha da tabela de movimentações"""
+        data = mov['data_hora'][:19]  # Formato mais legível
+        print(f"{data:<20} {mov['tipo']:<8} {mov['produto_id']:<12} {mov['quantidade']:<4} {mov['descricao']:<30}")
+    
+    def _ler_data(self, mensagem):
+        """Lê uma data DD/MM/AAAA e a converte para AAAA-MM-DD"""
+        data_str = input(mensagem).strip()
+        try:
+            return datetime.strptime(data_str, "%d/%m/%Y").strftime("%Y-%m-%d")
+        except ValueError:
+            print("❌ Formato de data inválido! Use DD/MM/AAAA")
+            return None
+    
+    def relatorio_movimentacoes_periodo(self):
+        """Gera relatório de movimentações entre duas datas, opcionalmente de um produto"""
+        inicio = self._ler_data("Data inicial (DD/MM/AAAA): ")
+        if not inicio:
+            return
+        fim = self._ler_data("Data final (DD/MM/AAAA): ")
+        if not fim:
+            return
         
-        for mov in movimentacoes_ordenadas[:20]:  # Últimas 20
-            data = mov['data_hora'][:19]  # Formato mais legível
-            print(f"{data:<20} {mov['tipo']:<8} {mov['produto_id']:<12} {mov['quantidade']:<4} {mov['descricao']:<30}")
+        produto_id = None
+        produto_str = input("ID do produto (Enter para todos): ").strip()
+        if produto_str:
+            try:
+                produto_id = int(produto_str)
+            except ValueError:
+                print("❌ ID deve ser um número!")
+                return
+        
+        print("\n" + "=" * 60)
+        print("            MOVIMENTAÇÕES POR PERÍODO")
+        print("=" * 60)
+        
+        movimentacoes = self.historico.entre(inicio, fim, produto_id)
+        if not movimentacoes:
+            print("📭 Nenhuma movimentação no período!")
+            return
+        
+        if produto_id is None:
+            # Totais diários pré-calculados
+            totais = self.historico.totais_periodo(inicio, fim)
+        else:
+            totais = {}
+            for mov in movimentacoes:
+                acumulado = totais.setdefault(mov['tipo'], {"registros": 0, "quantidade": 0})
+                acumulado["registros"] += 1
+                acumulado["quantidade"] += mov['quantidade']
+        
+        print(f"Movimentações: {len(movimentacoes)}")
+        print(f"Entradas: {totais.get('entrada', {}).get('registros', 0)} "
+              f"({totais.get('entrada', {}).get('quantidade', 0)} unidades)")
+        print(f"Saídas: {totais.get('saida', {}).get('registros', 0)} "
+              f"({totais.get('saida', {}).get('quantidade', 0)} unidades)")
+        
+        print("\n" + "-" * 60)
+        print(f"{'Data/Hora':<20} {'Tipo':<8} {'Produto ID':<12} {'Qtd':<4} {'Descrição':<30}")
+        print("-" * 60)
+        for mov in movimentacoes:
+            self._exibir_movimentacao(mov)
         
         print("\n" + "=" * 60)
     
-    def relatorio_produtos_solicitados(self):
+    def menu_produtos_solicitados(self):
+        """Escolhe o período e exibe os produtos mais solicitados"""
+        print("\nPeríodo:")
+        print("1 - Todo o histórico")
+        print("2 - Últimos 7 dias")
+        print("3 - Últimos 30 dias")
+        print("4 - Últimos 90 dias")
+        
+        periodos = {"1": None, "2": 7, "3": 30, "4": 90}
+        opcao = input("Escolha o período (1-4): ").strip()
+        if opcao not in periodos:
+            print("❌ Período inválido!")
+            return
+        
+        self.relatorio_produtos_solicitados(periodos[opcao])
+    
+    def relatorio_produtos_solicitados(self, dias=None):
         """Gera relatório dos produtos mais solicitados"""
         print("\n" + "=" * 60)
         print("              PRODUTOS MAIS SOLICITADOS")
+        if dias:
+            print(f"                 (últimos {dias} dias)")
         print("=" * 60)
         
-        pedidos = self.db.get_items("pedidos", {"status": "aprovado"})
-        if not pedidos:
+        # Top 10 a partir dos contadores mantidos pelo ranking
+        produtos_ordenados = self.ranking.top(10, dias)
+        if not produtos_ordenados:
             print("📭 Nenhum pedido aprovado encontrado!")
             return
         
-        # Contar produtos solicitados
-        contagem_produtos = {}
-        for pedido in pedidos:
-            for item in pedido['itens']:
-                produto_id = item['produto_id']
-                if produto_id not in contagem_produtos:
-                    contagem_produtos[produto_id] = {
-                        'nome': item['nome_produto'],
-                        'quantidade_total': 0,
-                        'pedidos': 0
-                    }
-                contagem_produtos[produto_id]['quantidade_total'] += item['quantidade']
-                contagem_produtos[produto_id]['pedidos'] += 1
-        
-        # Ordenar por quantidade
-        produtos_ordenados = sorted(contagem_produtos.items(), 
-                                  key=lambda x: x[1]['quantidade_total'], 
-                                  reverse=True)
-        
         print(f"{'Rank':<4} {'Produto':<25} {'Qtd Total':<12} {'Pedidos':<8}")
         print("-" * 60)
         
-        for i, (produto_id, dados) in enumerate(produtos_ordenados[:10], 1):  # Top 10
+        for i, (produto_id, dados) in enumerate(produtos_ordenados, 1):
             print(f"{i:<4} {dados['nome']:<25} {dados['quantidade_total']:<12} {dados['pedidos']:<8}")
         
         print("\n" + "=" * 60)
@@ -147,17 +253,7 @@ class RelatorioController:
         # Fornecedores por região (baseado no endereço)
         regioes = {}
         for fornecedor in fornecedores:
-            endereco = fornecedor['endereco']
-            if endereco:
-                # Extrair cidade/estado do endereço
-                partes = endereco.split(',')
-                if len(partes) >= 2:
-                    regiao = partes[-1].strip()
-                else:
-                    regiao = "Não informado"
-            else:
-                regiao = "Não informado"
-            
+            regiao = self._regiao(fornecedor)
             if regiao not in regioes:
                 regioes[regiao] = []
             regioes[regiao].append(fornecedor)
@@ -176,6 +272,13 @@ class RelatorioController:
         
         print("\n" + "=" * 60)
     
+    def _regiao(self, fornecedor):
+        """Cidade/estado de um fornecedor, extraído do endereço"""
+        partes = (fornecedor.get('endereco') or "").split(',')
+        if len(partes) >= 2:
+            return partes[-1].strip()
+        return "Não informado"
+    
     def relatorio_geral(self):
         """Gera relatório geral do sistema"""
         print("\n" + "=" * 60)
@@ -183,26 +286,21 @@ class RelatorioController:
         print("=" * 60)
         
         # Contadores
-        produtos = self.db.get_items("produtos")
-        fornecedores = self.db.get_items("fornecedores")
-        clientes = self.db.get_items("clientes")
-        funcionarios = self.db.get_items("funcionarios")
-        pedidos = self.db.get_items("pedidos")
-        usuarios = self.db.get_items("usuarios")
+        agregados = self.agregados
         
         print(f"📊 ESTATÍSTICAS GERAIS:")
-        print(f"   • Produtos: {len(produtos)}")
-        print(f"   • Fornecedores: {len(fornecedores)}")
-        print(f"   • Clientes: {len(clientes)}")
-        print(f"   • Funcionários: {len(funcionarios)}")
-        print(f"   • Pedidos: {len(pedidos)}")
-        print(f"   • Usuários: {len(usuarios)}")
+        print(f"   • Produtos: {agregados.total('produtos')}")
+        print(f"   • Fornecedores: {agregados.total('fornecedores')}")
+        print(f"   • Clientes: {agregados.total('clientes')}")
+        print(f"   • Funcionários: {agregados.total('funcionarios')}")
+        print(f"   • Pedidos: {agregados.total('pedidos')}")
+        print(f"   • Usuários: {agregados.total('usuarios')}")
         
         # Status dos pedidos
-        if pedidos:
-            pedidos_pendentes = len([p for p in pedidos if p['status'] == 'pendente'])
-            pedidos_aprovados = len([p for p in pedidos if p['status'] == 'aprovado'])
-            pedidos_rejeitados = len([p for p in pedidos if p['status'] == 'rejeitado'])
+        if agregados.total("pedidos"):
+            pedidos_pendentes = agregados.pedidos_por_status.get('pendente', 0)
+            pedidos_aprovados = agregados.pedidos_por_status.get('aprovado', 0)
+            pedidos_rejeitados = agregados.pedidos_por_status.get('rejeitado', 0)
             
             print(f"\n📋 STATUS DOS PEDIDOS:")
             print(f"   • Pendentes: {pedidos_pendentes}")
@@ -210,23 +308,124 @@ class RelatorioController:
             print(f"   • Rejeitados: {pedidos_rejeitados}")
         
         # Produtos por categoria
-        if produtos:
-            categorias = {}
-            for produto in produtos:
-                cat = produto['categoria']
-                if cat not in categorias:
-                    categorias[cat] = 0
-                categorias[cat] += 1
-            
+        if agregados.total("produtos"):
             print(f"\n🏷️  PRODUTOS POR CATEGORIA:")
-            for categoria, quantidade in categorias.items():
+            for categoria, quantidade in agregados.produtos_por_categoria.items():
                 print(f"   • {categoria.title()}: {quantidade}")
         
         # Valor total em estoque
-        if produtos:
-            valor_total = sum(p.get('preco', 0) * p['quantidade'] for p in produtos)
+        if agregados.total("produtos"):
+            valor_total = agregados.valor_estoque
             print(f"\n💰 VALOR TOTAL EM ESTOQUE: R$ {valor_total:.2f}")
         
         print("\n" + "=" * 60)
         print(f"Relatório gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M:%S')}")
         print("=" * 60)
+    
+    def linhas_estoque(self):
+        """Linhas do relatório de estoque (um produto por linha)"""
+        for produto in self.db.iterar_itens("produtos"):
+            yield {
+                "id": produto['id'],
+                "nome": produto['nome'],
+                "categoria": produto['categoria'],
+                "marca": produto.get('marca', ''),
+                "quantidade": produto['quantidade'],
+                "ponto_reposicao": produto.get('ponto_reposicao', PONTO_REPOSICAO_PADRAO),
+                "preco": produto.get('preco', 0),
+                "valor_total": produto.get('preco', 0) * produto['quantidade']
+            }
+    
+    def linhas_movimentacoes(self):
+        """Linhas do histórico de movimentações, em ordem de registro"""
+        for mov in self.db.iterar_itens("movimentacoes"):
+            yield {
+                "id": mov['id'],
+                "data_hora": mov['data_hora'],
+                "tipo": mov['tipo'],
+                "produto_id": mov['produto_id'],
+                "quantidade": mov['quantidade'],
+                "descricao": mov.get('descricao', '')
+            }
+    
+    def linhas_movimentacoes_diarias(self):
+        """Totais diários de entradas e saídas"""
+        for dia in list(self.historico.dias):
+            totais = self.historico.totais_por_dia.get(dia, {})
+            yield {
+                "dia": dia,
+                "entradas": totais.get('entrada', {}).get('registros', 0),
+                "unidades_entrada": totais.get('entrada', {}).get('quantidade', 0),
+                "saidas": totais.get('saida', {}).get('registros', 0),
+                "unidades_saida": totais.get('saida', {}).get('quantidade', 0)
+            }
+    
+    def linhas_produtos_solicitados(self, dias=None):
+        """Ranking completo dos produtos mais solicitados"""
+        ranking = self.ranking.top(len(self.ranking.totais), dias)
+        for i, (produto_id, dados) in enumerate(ranking, 1):
+            yield {
+                "rank": i,
+                "produto_id": produto_id,
+                "nome": dados['nome'],
+                "quantidade_total": dados['quantidade_total'],
+                "pedidos": dados['pedidos']
+            }
+    
+    def linhas_fornecedores(self):
+        """Fornecedores com a região extraída do endereço"""
+        for fornecedor in self.db.iterar_itens("fornecedores"):
+            yield {
+                "id": fornecedor['id'],
+                "nome": fornecedor['nome'],
+                "cnpj": fornecedor['cnpj'],
+                "telefone": fornecedor.get('telefone', ''),
+                "regiao": self._regiao(fornecedor)
+            }
+    
+    def linhas_geral(self):
+        """Indicadores do relatório geral (indicador, chave, valor)"""
+        agregados = self.agregados
+        for collection in ("produtos", "fornecedores", "clientes", "funcionarios", "pedidos", "usuarios"):
+            yield {"indicador": "total", "chave": collection, "valor": agregados.total(collection)}
+        for status, quantidade in agregados.pedidos_por_status.items():
+            yield {"indicador": "pedidos_por_status", "chave": status, "valor": quantidade}
+        for categoria, quantidade in agregados.produtos_por_categoria.items():
+            yield {"indicador": "produtos_por_categoria", "chave": categoria, "valor": quantidade}
+        yield {"indicador": "valor_estoque", "chave": "", "valor": round(agregados.valor_estoque, 2)}
+    
+    def exportar_relatorio(self, nome, destino, formato="jsonl"):
+        """Grava as linhas de um relatório em CSV/JSONL; retorna o número de linhas"""
+        if nome not in self.RELATORIOS:
+            raise ValueError(f"Relatório inexistente: {nome}")
+        return exportar(getattr(self, self.RELATORIOS[nome])(), destino, formato)
+    
+    def menu_exportacao(self):
+        """Exporta um relatório ou coleção para arquivo CSV/JSONL"""
+        opcoes = []
+        for titulo, tipo, nomes in (("Relatórios", "relatorio", self.RELATORIOS), ("Coleções", "colecao", self.COLECOES)):
+            print(f"\n{titulo}:")
+            for nome in nomes:
+                opcoes.append((tipo, nome))
+                print(f"{len(opcoes)} - {nome.replace('_', ' ').capitalize()}")
+        
+        opcao = input(f"Escolha o que exportar (1-{len(opcoes)}): ").strip()
+        if not opcao.isdigit() or not 1 <= int(opcao) <= len(opcoes):
+            print("❌ Opção inválida!")
+            return
+        tipo, nome = opcoes[int(opcao) - 1]
+        
+        caminho = input("Arquivo de destino (.csv ou .jsonl): ").strip()
+        if not caminho:
+            print("❌ Caminho não pode estar vazio!")
+            return
+        
+        try:
+            if tipo == "relatorio":
+                linhas = self.exportar_relatorio(nome, caminho, formato_por_extensao(caminho))
+            else:
+                linhas = exportar_colecao(self.db, nome, caminho, formato_por_extensao(caminho))
+        except (OSError, ValueError) as e:
+            print(f"❌ Erro na exportação: {e}")
+            return
+        print(f"✅ {linhas} linha(s) exportada(s) para {caminho}")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportação de Dados do Sistema IGO
+
+Exporta uma coleção ou um relatório para CSV ou JSONL, registro a registro
+(memória constante), para alimentar ferramentas de BI. Usa o mesmo banco
+que o sistema (IGO_BACKEND e IGO_FORMATO).
+
+Uso:
+    python exportar.py colecao movimentacoes movimentacoes.jsonl
+    python exportar.py colecao produtos produtos.csv --colunas id,nome,quantidade
+    python exportar.py relatorio estoque estoque.csv
+    python exportar.py relatorio movimentacoes_diarias - --formato csv
+"""
+
+import argparse
+import sys
+
+from controllers.relatorio_controller import RelatorioController
+from main import abrir_banco
+from models.exportacao import FORMATOS, exportar_colecao, formato_por_extensao
+
+def main():
+    """Função principal da exportação"""
+    parser = argparse.ArgumentParser(description="Exportação de dados do Sistema IGO")
+    parser.add_argument("tipo", choices=["colecao", "relatorio"], help="o que exportar")
+    parser.add_argument("nome", help=f"nome da coleção ou do relatório ({', '.join(RelatorioController.RELATORIOS)})")
+    parser.add_argument("destino", help="arquivo de saída ('-' para a saída padrão)")
+    parser.add_argument("--formato", choices=FORMATOS, help="formato (padrão: pela extensão, ou jsonl)")
+    parser.add_argument("--colunas", help="colunas do CSV de uma coleção, separadas por vírgula "
+                                          "(padrão: todos os campos da coleção)")
+    args = parser.parse_args()
+    
+    formato = args.formato or formato_por_extensao(args.destino)
+    destino = sys.stdout if args.destino == "-" else args.destino
+    
+    db = abrir_banco()
+    try:
+        if args.tipo == "colecao":
+            colunas = [coluna.strip() for coluna in args.colunas.split(",")] if args.colunas else None
+            registros = exportar_colecao(db, args.nome, destino, formato, colunas)
+        else:
+            registros = RelatorioController(db).exportar_relatorio(args.nome, destino, formato)
+    except (OSError, ValueError) as e:
+        print(f"❌ Erro na exportação: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.fechar()
+    
+    print(f"✅ {registros} registro(s) exportado(s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importação em Lote do Sistema IGO
+
+Importa produtos, clientes, fornecedores ou funcionários de arquivos CSV
+(com cabeçalho) ou JSONL, validando cada registro com as regras dos
+formulários de cadastro. Usa o mesmo banco que o sistema (IGO_BACKEND e
+IGO_FORMATO).
+
+Uso:
+    python importar.py produtos doacoes.csv
+    python importar.py clientes clientes.jsonl --erros rejeitados.jsonl --lote 1000
+"""
+
+import argparse
+import sys
+
+from main import abrir_banco
+from models.importacao import importar_arquivo
+from models.validacao import VALIDADORES
+
+def main():
+    """Função principal da importação"""
+    parser = argparse.ArgumentParser(description="Importação em lote do Sistema IGO")
+    parser.add_argument("colecao", choices=sorted(VALIDADORES), help="coleção de destino")
+    parser.add_argument("arquivo", help="arquivo .csv ou .jsonl")
+    parser.add_argument("--formato", choices=["csv", "jsonl"], help="formato (padrão: pela extensão)")
+    parser.add_argument("--erros", help="arquivo JSONL dos registros rejeitados (padrão: <arquivo>.erros.jsonl)")
+    parser.add_argument("--lote", type=int, default=500, help="registros por transação")
+    args = parser.parse_args()
+    
+    db = abrir_banco()
+    try:
+        resumo = importar_arquivo(db, args.colecao, args.arquivo, args.erros, args.lote, args.formato)
+    except (OSError, ValueError) as e:
+        print(f"❌ Erro na importação: {e}")
+        return 1
+    finally:
+        db.fechar()
+    
+    print(f"✅ {resumo['importados']} registro(s) importado(s) em {args.colecao}")
+    if resumo['rejeitados']:
+        print(f"⚠️  {resumo['rejeitados']} registro(s) rejeitado(s); detalhes em {resumo['arquivo_erros']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
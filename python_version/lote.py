@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Execução em Lote do Sistema IGO
+
+Executa operações de negócio (cadastros, movimentações de estoque, criação,
+aprovação e rejeição de pedidos) descritas em JSONL, sem os menus. Cada
+linha tem a operação e seus parâmetros:
+
+    {"operacao": "movimentar_estoque", "parametros": {"produto_id": 1, "tipo": "entrada", "quantidade": 10}}
+    {"operacao": "criar_pedido", "parametros": {"cliente_id": 1, "itens": [[1, 2], [3, 1]]}}
+    {"operacao": "aprovar_pedido", "parametros": {"pedido_id": 7}}
+
+O resultado de cada linha é escrito em JSONL na saída padrão. Usa o mesmo
+banco que o sistema (IGO_BACKEND, IGO_FORMATO ou IGO_SERVIDOR).
+
+Uso:
+    python lote.py operacoes.jsonl
+    python lote.py - --lote 1000 < operacoes.jsonl > resultados.jsonl
+"""
+
+import argparse
+import copy
+import json
+import sys
+from itertools import islice
+
+from main import abrir_banco
+from models.servicos import Servicos
+
+def executar_linhas(servicos, linhas):
+    """Executa as operações de cada linha; gera o resultado de cada uma"""
+    for numero, linha in enumerate(linhas, 1):
+        if not linha.strip():
+            continue
+        try:
+            pedido = json.loads(linha)
+            resultado = servicos.executar(pedido["operacao"], pedido.get("parametros", {}))
+            # Cópia: as operações seguintes do grupo podem alterar o registro
+            yield {"linha": numero, "ok": True, "resultado": copy.deepcopy(resultado)}
+        except (ValueError, KeyError, TypeError) as e:
+            yield {"linha": numero, "ok": False, "erro": f"{type(e).__name__}: {e}"}
+
+def main():
+    """Função principal da execução em lote"""
+    parser = argparse.ArgumentParser(description="Execução em lote do Sistema IGO")
+    parser.add_argument("arquivo", help="arquivo JSONL de operações ('-' para a entrada padrão)")
+    parser.add_argument("--lote", type=int, default=500, help="operações por transação")
+    args = parser.parse_args()
+    
+    db = abrir_banco()
+    servicos = Servicos(db)
+    entrada = sys.stdin if args.arquivo == "-" else open(args.arquivo, 'r', encoding='utf-8')
+    falhas = 0
+    try:
+        resultados = executar_linhas(servicos, entrada)
+        # Cada grupo de operações é gravado em uma única transação; as
+        # operações validam tudo antes de alterar o banco, então uma falha
+        # não deixa alterações parciais no grupo
+        while True:
+            with db.transaction():
+                grupo = list(islice(resultados, args.lote))
+            for resultado in grupo:
+                falhas += not resultado["ok"]
+                sys.stdout.write(json.dumps(resultado, ensure_ascii=False, default=str) + "\n")
+            if len(grupo) < args.lote:
+                break
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        db.fechar()
+    
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
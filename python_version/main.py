@@ -7,10 +7,36 @@ Versão Python com Arquitetura MVC
 
 from controllers.auth_controller import AuthController
 from controllers.main_controller import MainController
+from models.alertas import AgendadorVencimentos
 from models.database import Database
+from models.remoto import ClienteBanco
+from models.sqlite_database import SQLiteDatabase
 from views.menu_view import MenuView
 import os
 
+def abrir_banco(remoto=True):
+    """Abre o banco configurado pelas variáveis de ambiente.
+    
+    IGO_SERVIDOR=<socket> conecta ao servidor iniciado com servidor.py
+    (modo terminal); com remoto=False a variável é ignorada. IGO_BACKEND=sqlite
+    seleciona o backend SQLite; IGO_FORMATO=colecoes grava um arquivo por
+    coleção, carregado sob demanda, e IGO_FORMATO=binario usa o snapshot
+    binário compacto. IGO_DURABILIDADE=assincrona grava o journal em segundo
+    plano, em lotes (ver Database).
+    """
+    if remoto and os.environ.get("IGO_SERVIDOR"):
+        return ClienteBanco(os.environ["IGO_SERVIDOR"])
+    if os.environ.get("IGO_BACKEND", "json").lower() == "sqlite":
+        return SQLiteDatabase()
+    return Database(formato=os.environ.get("IGO_FORMATO", "json").lower(),
+                    durabilidade=os.environ.get("IGO_DURABILIDADE", "sincrona").lower())
+
+def alertar_vencimentos(produtos):
+    """Exibe os produtos que entraram na janela de vencimento"""
+    print(f"\n⚠️  ALERTA: {len(produtos)} produto(s) próximo(s) do vencimento:")
+    for produto in produtos:
+        print(f"   ID: {produto['id']} | {produto['nome']} | Validade: {produto['validade']}")
+
 def main():
     """Função principal do sistema"""
     print("=" * 50)
@@ -18,7 +44,16 @@ def main():
     print("=" * 50)
     
     # Inicializa o banco de dados
-    db = Database()
+    db = abrir_banco()
+    
+    # IGO_ALERTA_VENCIMENTO=<dias> ativa os alertas de vencimento em segundo
+    # plano (exceto no modo terminal: a conexão com o servidor não é
+    # compartilhada entre threads)
+    alertas = None
+    dias_alerta = os.environ.get("IGO_ALERTA_VENCIMENTO")
+    if dias_alerta and isinstance(db, (Database, SQLiteDatabase)):
+        alertas = AgendadorVencimentos(db, alertar_vencimentos, dias=int(dias_alerta))
+        alertas.iniciar()
     
     # Inicializa o controlador de autenticação
     auth_controller = AuthController(db)
@@ -30,24 +65,30 @@ def main():
     menu_view = MenuView()
     
     # Loop principal do sistema
-    while True:
-        try:
-            # Tela de login
-            user = auth_controller.login()
-            if user:
-                print(f"\nBem-vindo, {user['nome']}!")
-                
-                # Menu principal baseado no nível de acesso
-                main_controller.show_main_menu(user['nivel_acesso'])
-            else:
-                print("Login falhou. Tente novamente.")
-                
-        except KeyboardInterrupt:
-            print("\n\nSaindo do sistema...")
-            break
-        except Exception as e:
-            print(f"Erro: {e}")
-            continue
+    try:
+        while True:
+            try:
+                # Tela de login
+                user = auth_controller.login()
+                if user:
+                    print(f"\nBem-vindo, {user['nome']}!")
+                    
+                    # Menu principal baseado no nível de acesso
+                    main_controller.show_main_menu(user['nivel_acesso'])
+                else:
+                    print("Login falhou. Tente novamente.")
+            
+            except KeyboardInterrupt:
+                print("\n\nSaindo do sistema...")
+                break
+            except Exception as e:
+                print(f"Erro: {e}")
+                continue
+    finally:
+        if alertas is not None:
+            alertas.parar()
+        # Consolida o journal em um novo snapshot antes de sair
+        db.fechar()
 
 if __name__ == "__main__":
     main()
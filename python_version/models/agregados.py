@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agregados de Relatórios - Sistema IGO
+"""
+
+import bisect
+import heapq
+from datetime import datetime, timedelta
+
+class AgregadosRelatorio:
+    """Totais dos relatórios mantidos incrementalmente a partir das mutações do banco.
+    
+    A construção inicial percorre as coleções uma única vez; depois disso cada
+    inclusão, alteração ou exclusão atualiza os contadores em O(1), de modo
+    que os relatórios não precisam varrer produtos, pedidos e movimentações.
+    
+    A inscrição é feita antes da construção inicial, para não perder as
+    mutações feitas durante a leitura; como elas podem já estar incluídas
+    no que foi lido, reaplicar um evento não altera os agregados.
+    """
+    
+    def __init__(self, database):
+        self.db = database
+        database.inscrever(self._ao_mudar)
+        self.reconstruir()
+    
+    def reconstruir(self):
+        """Recalcula todos os agregados a partir dos dados atuais"""
+        self.contagens = {}
+        self.valor_estoque = 0.0
+        self.produtos_por_categoria = {}
+        self.pedidos_por_status = {}
+        self.movimentacoes_por_tipo = {}
+        # Contribuição de cada registro contado (None quando não compõe os
+        # totais), para desfazê-la em alterações e exclusões mesmo quando o
+        # dicionário já foi alterado in-place
+        self._contribuicoes = {}
+        
+        for collection in self.db.colecoes():
+            self.contagens[collection] = 0
+            for item in self.db.iterar_itens(collection):
+                self._adicionar(collection, item)
+    
+    def _ao_mudar(self, evento, collection, item):
+        """Callback de mutações do banco"""
+        if evento == "recarregar":
+            self.reconstruir()
+        elif evento in ("add", "update"):
+            self._adicionar(collection, item)
+        elif evento == "delete":
+            self._remover(collection, item['id'])
+    
+    def _contribuicao(self, collection, item):
+        """Extrai de um registro os valores que compõem os agregados"""
+        if collection == "produtos":
+            return (item.get('categoria'), item.get('preco', 0) * item.get('quantidade', 0))
+        if collection == "pedidos":
+            return item.get('status')
+        if collection == "movimentacoes":
+            return (item.get('tipo'), item.get('quantidade', 0))
+        return None
+    
+    def _adicionar(self, collection, item):
+        """Soma a contribuição de um registro aos agregados, no lugar da anterior"""
+        self._remover(collection, item['id'])
+        self.contagens[collection] = self.contagens.get(collection, 0) + 1
+        
+        contribuicao = self._contribuicao(collection, item)
+        self._contribuicoes[(collection, item['id'])] = contribuicao
+        if contribuicao is None:
+            return
+        
+        if collection == "produtos":
+            categoria, valor = contribuicao
+            self.valor_estoque += valor
+            self.produtos_por_categoria[categoria] = self.produtos_por_categoria.get(categoria, 0) + 1
+        elif collection == "pedidos":
+            self.pedidos_por_status[contribuicao] = self.pedidos_por_status.get(contribuicao, 0) + 1
+        elif collection == "movimentacoes":
+            tipo, quantidade = contribuicao
+            totais = self.movimentacoes_por_tipo.setdefault(tipo, {"registros": 0, "quantidade": 0})
+            totais["registros"] += 1
+            totais["quantidade"] += quantidade
+    
+    def _remover(self, collection, item_id):
+        """Subtrai dos agregados a contribuição registrada de um registro (se contado)"""
+        if (collection, item_id) not in self._contribuicoes:
+            return
+        self.contagens[collection] -= 1
+        
+        contribuicao = self._contribuicoes.pop((collection, item_id))
+        if contribuicao is None:
+            return
+        
+        if collection == "produtos":
+            categoria, valor = contribuicao
+            self.valor_estoque -= valor
+            self._decrementar(self.produtos_por_categoria, categoria)
+        elif collection == "pedidos":
+            self._decrementar(self.pedidos_por_status, contribuicao)
+        elif collection == "movimentacoes":
+            tipo, quantidade = contribuicao
+            totais = self.movimentacoes_por_tipo[tipo]
+            totais["registros"] -= 1
+            totais["quantidade"] -= quantidade
+            if not totais["registros"]:
+                del self.movimentacoes_por_tipo[tipo]
+    
+    def _decrementar(self, contador, chave):
+        """Decrementa um contador, removendo a chave quando chega a zero"""
+        contador[chave] -= 1
+        if not contador[chave]:
+            del contador[chave]
+    
+    def total(self, collection):
+        """Número de registros de uma coleção"""
+        return self.contagens.get(collection, 0)
+
+class RankingProdutos:
+    """Quantidade solicitada e número de pedidos por produto (pedidos aprovados).
+    
+    Os contadores são atualizados quando um pedido passa a (ou deixa de) estar
+    aprovado, com totais gerais e por dia de aprovação, e as consultas de top-K
+    usam um heap limitado em vez de ordenar todos os produtos.
+    """
+    
+    def __init__(self, database):
+        self.db = database
+        database.inscrever(self._ao_mudar)
+        self.reconstruir()
+    
+    def reconstruir(self):
+        """Recalcula os contadores a partir dos pedidos aprovados"""
+        self.totais = {}
+        self.por_dia = {}
+        self._contribuicoes = {}
+        
+        for pedido in self.db.get_items("pedidos", {"status": "aprovado"}):
+            self._adicionar(pedido)
+    
+    def _ao_mudar(self, evento, collection, item):
+        """Callback de mutações do banco"""
+        if evento == "recarregar":
+            self.reconstruir()
+        elif collection != "pedidos":
+            return
+        elif evento == "delete":
+            self._remover(item['id'])
+        else:
+            self._remover(item['id'])
+            if item.get('status') == "aprovado":
+                self._adicionar(item)
+    
+    def _adicionar(self, pedido):
+        """Soma os itens de um pedido aprovado aos contadores"""
+        dia = (pedido.get('data_aprovacao') or pedido.get('data_pedido') or "")[:10]
+        itens = [(item['produto_id'], item['nome_produto'], item['quantidade']) for item in pedido.get('itens', [])]
+        self._contribuicoes[pedido['id']] = (dia, itens)
+        
+        contadores_dia = self.por_dia.setdefault(dia, {})
+        for produto_id, nome, quantidade in itens:
+            for contadores in (self.totais, contadores_dia):
+                dados = contadores.setdefault(produto_id, {'nome': nome, 'quantidade_total': 0, 'pedidos': 0})
+                dados['quantidade_total'] += quantidade
+                dados['pedidos'] += 1
+    
+    def _remover(self, pedido_id):
+        """Desfaz a contribuição de um pedido que deixou de estar aprovado"""
+        contribuicao = self._contribuicoes.pop(pedido_id, None)
+        if contribuicao is None:
+            return
+        
+        dia, itens = contribuicao
+        for produto_id, nome, quantidade in itens:
+            for contadores in (self.totais, self.por_dia[dia]):
+                dados = contadores[produto_id]
+                dados['quantidade_total'] -= quantidade
+                dados['pedidos'] -= 1
+                if not dados['pedidos']:
+                    del contadores[produto_id]
+        if not self.por_dia[dia]:
+            del self.por_dia[dia]
+    
+    def top(self, k=10, dias=None):
+        """Retorna os k produtos mais solicitados como [(produto_id, dados)].
+        
+        Com dias informado, considera apenas os pedidos aprovados nos
+        últimos N dias (incluindo hoje).
+        """
+        if dias is None:
+            contadores = self.totais
+        else:
+            inicio = (datetime.now() - timedelta(days=dias - 1)).strftime("%Y-%m-%d")
+            contadores = {}
+            for dia, contadores_dia in self.por_dia.items():
+                if dia < inicio:
+                    continue
+                for produto_id, dados in contadores_dia.items():
+                    soma = contadores.setdefault(produto_id, {'nome': dados['nome'], 'quantidade_total': 0, 'pedidos': 0})
+                    soma['quantidade_total'] += dados['quantidade_total']
+                    soma['pedidos'] += dados['pedidos']
+        
+        return heapq.nlargest(k, contadores.items(), key=lambda x: x[1]['quantidade_total'])
+
+class HistoricoMovimentacoes:
+    """Movimentações ordenadas por data/hora, com totais diários por tipo.
+    
+    Mantém listas ordenadas de chaves (data_hora, id) — geral e por produto —
+    para que "últimas N", intervalos de datas e consultas por produto sejam
+    resolvidos com bisect em O(log n + k). Como o histórico é quase sempre
+    acrescentado no fim, a inserção normalmente é um append. Apenas as
+    chaves ficam em memória; os registros são buscados por ID no banco.
+    """
+    
+    def __init__(self, database):
+        self.db = database
+        database.inscrever(self._ao_mudar)
+        self.reconstruir()
+    
+    def reconstruir(self):
+        """Reindexa todo o histórico de movimentações"""
+        self._chaves = []
+        self._por_produto = {}
+        # Chave, produto, tipo e quantidade de cada movimentação indexada,
+        # para removê-la mesmo quando o dicionário foi alterado in-place
+        self._contribuicoes = {}
+        self.dias = []
+        self.totais_por_dia = {}
+        
+        for mov in self.db.iterar_itens("movimentacoes"):
+            self._adicionar(mov)
+    
+    def _ao_mudar(self, evento, collection, item):
+        """Callback de mutações do banco"""
+        if evento == "recarregar":
+            self.reconstruir()
+        elif collection != "movimentacoes":
+            return
+        elif evento == "delete":
+            self._remover(item['id'])
+        else:
+            self._remover(item['id'])
+            self._adicionar(item)
+    
+    def _inserir_ordenado(self, lista, chave):
+        """Insere mantendo a ordem (append quando a chave é a maior)"""
+        if not lista or chave >= lista[-1]:
+            lista.append(chave)
+        else:
+            bisect.insort(lista, chave)
+    
+    def _adicionar(self, mov):
+        """Indexa uma movimentação e soma seus totais diários"""
+        chave = (mov.get('data_hora') or "", mov['id'])
+        produto_id = mov.get('produto_id')
+        tipo = mov.get('tipo')
+        quantidade = mov.get('quantidade', 0)
+        
+        self._contribuicoes[mov['id']] = (chave, produto_id, tipo, quantidade)
+        self._inserir_ordenado(self._chaves, chave)
+        self._inserir_ordenado(self._por_produto.setdefault(produto_id, []), chave)
+        
+        dia = chave[0][:10]
+        if dia not in self.totais_por_dia:
+            self._inserir_ordenado(self.dias, dia)
+            self.totais_por_dia[dia] = {}
+        totais = self.totais_por_dia[dia].setdefault(tipo, {"registros": 0, "quantidade": 0})
+        totais["registros"] += 1
+        totais["quantidade"] += quantidade
+    
+    def _remover(self, mov_id):
+        """Remove uma movimentação do índice e desfaz seus totais diários"""
+        contribuicao = self._contribuicoes.pop(mov_id, None)
+        if contribuicao is None:
+            return
+        
+        chave, produto_id, tipo, quantidade = contribuicao
+        self._descartar(self._chaves, chave)
+        self._descartar(self._por_produto[produto_id], chave)
+        if not self._por_produto[produto_id]:
+            del self._por_produto[produto_id]
+        
+        dia = chave[0][:10]
+        totais_dia = self.totais_por_dia[dia]
+        totais = totais_dia[tipo]
+        totais["registros"] -= 1
+        totais["quantidade"] -= quantidade
+        if not totais["registros"]:
+            del totais_dia[tipo]
+        if not totais_dia:
+            del self.totais_por_dia[dia]
+            self._descartar(self.dias, dia)
+    
+    def _descartar(self, lista, chave):
+        """Remove uma chave de uma lista ordenada"""
+        posicao = bisect.bisect_left(lista, chave)
+        if posicao < len(lista) and lista[posicao] == chave:
+            del lista[posicao]
+    
+    def _lista(self, produto_id):
+        """Lista ordenada de chaves, geral ou de um produto"""
+        if produto_id is None:
+            return self._chaves
+        return self._por_produto.get(produto_id, [])
+    
+    def _registros(self, chaves):
+        """Busca no banco as movimentações das chaves, na mesma ordem"""
+        registros = (self.db.get_item("movimentacoes", chave[1]) for chave in chaves)
+        # Ignora as removidas por outro terminal ainda não sincronizadas
+        return [mov for mov in registros if mov is not None]
+    
+    def ultimas(self, n=20, produto_id=None):
+        """Retorna as N movimentações mais recentes (mais recentes primeiro)"""
+        chaves = self._lista(produto_id)
+        return self._registros(reversed(chaves[-n:])) if n > 0 else []
+    
+    def entre(self, inicio, fim, produto_id=None):
+        """Retorna as movimentações entre duas datas (AAAA-MM-DD, inclusive), em ordem cronológica"""
+        chaves = self._lista(produto_id)
+        # "\uffff" faz a data final abranger qualquer horário daquele dia
+        primeira = bisect.bisect_left(chaves, (inicio,))
+        ultima = bisect.bisect_right(chaves, (fim + "\uffff",))
+        return self._registros(chaves[primeira:ultima])
+    
+    def totais_periodo(self, inicio, fim):
+        """Soma os totais diários por tipo entre duas datas (inclusive)"""
+        primeira = bisect.bisect_left(self.dias, inicio)
+        ultima = bisect.bisect_right(self.dias, fim)
+        
+        soma = {}
+        for dia in self.dias[primeira:ultima]:
+            for tipo, totais in self.totais_por_dia[dia].items():
+                acumulado = soma.setdefault(tipo, {"registros": 0, "quantidade": 0})
+                acumulado["registros"] += totais["registros"]
+                acumulado["quantidade"] += totais["quantidade"]
+        return soma
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Alertas de Vencimento - Sistema IGO
+"""
+
+import threading
+from contextlib import nullcontext
+from datetime import datetime, time, timedelta
+
+class AgendadorVencimentos:
+    """Verifica em segundo plano os produtos próximos do vencimento.
+    
+    A cada verificação chama callback(produtos) apenas com os produtos que
+    entraram na janela de `dias` desde o alerta anterior. Com o backend em
+    memória, o índice de vencimento indica quando o próximo produto entra
+    na janela, e a thread dorme até lá (no máximo `intervalo` segundos).
+    As consultas ao índice são feitas sob o bloqueio do banco, já que a
+    thread principal o altera a cada inclusão ou alteração de produto.
+    """
+    
+    def __init__(self, database, callback, dias=30, intervalo=3600):
+        self.db = database
+        self.callback = callback
+        self.dias = dias
+        self.intervalo = intervalo
+        self._alertados = set()
+        self._parar = threading.Event()
+        self._thread = None
+    
+    def _bloqueio(self):
+        """Bloqueio do banco (backends sem bloqueio não são compartilhados entre threads)"""
+        return getattr(self.db, "bloqueio", None) or nullcontext()
+    
+    def verificar(self):
+        """Executa uma verificação e retorna os produtos alertados"""
+        novos = []
+        atuais = set()
+        with self._bloqueio():
+            vencendo = self.db.get_produtos_vencendo(self.dias)
+        for produto in vencendo:
+            chave = (produto['id'], produto.get('validade'))
+            atuais.add(chave)
+            if chave not in self._alertados:
+                novos.append(produto)
+        
+        self._alertados = atuais
+        if novos:
+            self.callback(novos)
+        return novos
+    
+    def _espera(self):
+        """Segundos até a próxima verificação"""
+        espera = self.intervalo
+        if hasattr(self.db, "indice_ordenado"):
+            limite = (datetime.now() + timedelta(days=self.dias)).date()
+            with self._bloqueio():
+                proximo = self.db.indice_ordenado("produtos", "vencimento").primeiro_acima(limite)
+            if proximo is not None:
+                # O produto entra na janela à meia-noite de (validade - dias)
+                entrada = datetime.combine(proximo - timedelta(days=self.dias), time.min)
+                espera = min(espera, max(1, (entrada - datetime.now()).total_seconds()))
+        return espera
+    
+    def _executar(self):
+        """Laço da thread de alertas"""
+        while not self._parar.is_set():
+            try:
+                self.verificar()
+            except Exception as e:
+                print(f"Erro ao verificar vencimentos: {e}")
+            self._parar.wait(self._espera())
+    
+    def iniciar(self):
+        """Inicia a thread de alertas (daemon)"""
+        if self._thread is not None:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="alertas-vencimento", daemon=True)
+        self._thread.start()
+    
+    def parar(self):
+        """Interrompe a thread de alertas"""
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join()
+        self._thread = None
@@ -4,128 +4,1000 @@
 Modelo de Banco de Dados - Sistema IGO
 """
 
+import copy
 import json
+import mmap
 import os
+import pickle
+import shutil
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from models.gravacao import GravadorJournal
+from models.indices import IndiceOrdenado, IndiceSecundario, IndiceTexto
+
+# Ponto de reposição dos produtos que não definem ponto_reposicao
+PONTO_REPOSICAO_PADRAO = 10
+
+# Cabeçalho do snapshot binário: assinatura + versão do formato
+MAGICO_BINARIO = b"IGO\x00"
+VERSAO_BINARIO = 1
+
+class RegistroDuplicadoError(ValueError):
+    """Inclusão ou alteração que repetiria um campo declarado como único"""
+    
+    def __init__(self, collection, campo, valor):
+        super().__init__(f"{campo} já cadastrado em {collection}: {valor}")
+        self.collection = collection
+        self.campo = campo
+        self.valor = valor
+
+class ConflitoVersaoError(ValueError):
+    """Alteração condicionada a uma versão que não é mais a atual do registro"""
+    
+    def __init__(self, collection, item_id, esperada, atual):
+        super().__init__(f"Registro {item_id} de {collection} foi alterado por outra operação "
+                         f"(versão atual {atual}, esperada {esperada})")
+        self.collection = collection
+        self.item_id = item_id
+        self.esperada = esperada
+        self.atual = atual
+
+def alterados(item, updates):
+    """Campos de updates cujo valor difere do atual do registro"""
+    return {campo: valor for campo, valor in updates.items() if item.get(campo) != valor}
+
+def versao_atual(item):
+    """Versão de um registro (0 para registros anteriores ao controle de versão)"""
+    return item.get('versao', 0)
+
+def chave_vencimento(produto):
+    """Data de validade de um alimento (None para os demais ou data inválida)"""
+    if produto.get('categoria') != 'alimento':
+        return None
+    try:
+        return datetime.strptime(produto.get('validade') or "", '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+def chave_quantidade(produto):
+    """Quantidade em estoque (None se ausente ou não numérica)"""
+    quantidade = produto.get('quantidade')
+    return quantidade if isinstance(quantidade, (int, float)) else None
+
+def chave_reposicao(produto):
+    """Quantidade acima do ponto de reposição (<= 0 indica estoque baixo)"""
+    quantidade = chave_quantidade(produto)
+    ponto = produto.get('ponto_reposicao', PONTO_REPOSICAO_PADRAO)
+    if quantidade is None or not isinstance(ponto, (int, float)):
+        return None
+    return quantidade - ponto
+
+def estrutura_inicial():
+    """Retorna a estrutura inicial do banco (coleções vazias e usuários padrão)"""
+    return {
+        "usuarios": [
+            {
+                "id": 1,
+                "username": "admin",
+                "senha": "admin123",
+                "nome": "Administrador",
+                "nivel_acesso": "administrador",
+                "email": "admin@igo.com"
+            },
+            {
+                "id": 2,
+                "username": "gerente",
+                "senha": "gerente123",
+                "nome": "Gerente",
+                "nivel_acesso": "gerente",
+                "email": "gerente@igo.com"
+            },
+            {
+                "id": 3,
+                "username": "vendedor",
+                "senha": "vendedor123",
+                "nome": "Vendedor",
+                "nivel_acesso": "vendedor",
+                "email": "vendedor@igo.com"
+            },
+            {
+                "id": 4,
+                "username": "cliente",
+                "senha": "cliente123",
+                "nome": "Cliente",
+                "nivel_acesso": "cliente",
+                "email": "cliente@igo.com"
+            }
+        ],
+        "produtos": [],
+        "fornecedores": [],
+        "clientes": [],
+        "funcionarios": [],
+        "pedidos": [],
+        "movimentacoes": []
+    }
+
+class ColecoesPreguicosas(dict):
+    """Dicionário de coleções que lê cada coleção do disco no primeiro acesso"""
+    
+    def __init__(self, nomes, carregar):
+        super().__init__()
+        self.nomes = set(nomes)
+        self._carregar = carregar
+        # Inclusões em coleções ainda não carregadas, em ordem de ID, e o
+        # último ID do arquivo de cada uma (ver Database._inserir)
+        self.pendentes = {}
+        self.ultimos_gravados = {}
+    
+    def __missing__(self, collection):
+        if collection not in self.nomes:
+            raise KeyError(collection)
+        return self._carregar(collection)
+    
+    def __contains__(self, collection):
+        return dict.__contains__(self, collection) or collection in self.nomes
+    
+    def carregada(self, collection):
+        """Indica se a coleção já está em memória"""
+        return dict.__contains__(self, collection)
 
 class Database:
-    """Classe responsável pelo gerenciamento dos dados do sistema"""
+    """Classe responsável pelo gerenciamento dos dados do sistema
+    
+    Formatos de armazenamento:
+        "json"     - snapshot único igo_data.json (padrão)
+        "colecoes" - diretório igo_data/ com um arquivo JSONL por coleção,
+                     carregado apenas no primeiro acesso à coleção (as
+                     inclusões são anexadas sem carregá-la)
+        "binario"  - snapshot único igo_data.bin (pickle com cabeçalho de
+                     versão), bem menor e mais rápido de ler que o JSON
+    
+    Durabilidade do journal:
+        "sincrona"   - cada operação (ou transação) é gravada com fsync
+                       antes de retornar (padrão)
+        "assincrona" - as linhas são gravadas em segundo plano, agrupadas
+                       a cada intervalo_gravacao segundos ou lote_gravacao
+                       linhas; uma queda perde no máximo esse intervalo
+    """
+    
+    # Índices secundários mantidos por padrão (coleção -> campos)
+    INDICES_PADRAO = {
+        "pedidos": ["status", "cliente_id"],
+        "movimentacoes": ["produto_id"],
+        "produtos": ["categoria"]
+    }
+    
+    # Índices ordenados (coleção -> nome -> função que calcula a chave)
+    INDICES_ORDENADOS = {
+        "produtos": {
+            "vencimento": chave_vencimento,
+            "quantidade": chave_quantidade,
+            "reposicao": chave_reposicao
+        }
+    }
+    
+    # Campos que não podem se repetir em uma coleção (valores vazios não
+    # são verificados); usam os mesmos índices de igualdade de get_items
+    INDICES_UNICOS = {
+        "clientes": ["cpf"],
+        "funcionarios": ["cpf"],
+        "fornecedores": ["cnpj"],
+        "usuarios": ["username"]
+    }
+    
+    # Campos da busca textual de cada coleção, em ordem de relevância
+    INDICES_TEXTO = {
+        "produtos": ["nome", "marca"],
+        "clientes": ["nome", "cpf"],
+        "fornecedores": ["nome", "cnpj"],
+        "funcionarios": ["nome", "cpf"]
+    }
+    
+    ARQUIVOS_PADRAO = {
+        "json": "igo_data.json",
+        "colecoes": "igo_data",
+        "binario": "igo_data.bin"
+    }
+    
+    DURABILIDADES = ("sincrona", "assincrona")
     
-    def __init__(self):
-        self.data_file = "igo_data.json"
+    def __init__(self, data_file=None, journal=True, compactar_a_cada=1000, indices=None,
+                 geracoes=3, formato="json", durabilidade="sincrona", intervalo_gravacao=1.0,
+                 lote_gravacao=1000):
+        if formato not in self.ARQUIVOS_PADRAO:
+            raise ValueError(f"Formato de armazenamento inválido: {formato}")
+        if durabilidade not in self.DURABILIDADES:
+            raise ValueError(f"Durabilidade inválida: {durabilidade}")
+        if durabilidade == "assincrona" and not journal:
+            raise ValueError("A gravação assíncrona requer o journal")
+        
+        self.formato = formato
+        data_file = data_file or self.ARQUIVOS_PADRAO[formato]
+        self.data_file = data_file
+        self.journal_file = data_file + ".log"
+        self.geracoes = geracoes
+        self.journal = journal
+        self.compactar_a_cada = compactar_a_cada
+        self.durabilidade = durabilidade
+        self.intervalo_gravacao = intervalo_gravacao
+        self.lote_gravacao = lote_gravacao
+        self._journal_handle = None
+        self._gravador = None
+        self._ops_journal = 0
+        self._indice_id = {}
+        self._ids = {}
+        self.sequencias = {}
+        indices = indices if indices is not None else self.INDICES_PADRAO
+        self.indices_declarados = {collection: list(campos) for collection, campos in indices.items()}
+        for collection, campos in self.INDICES_UNICOS.items():
+            declarados = self.indices_declarados.setdefault(collection, [])
+            declarados.extend(campo for campo in campos if campo not in declarados)
+        self._indices = {}
+        self._ordenados = {}
+        self._textuais = {}
+        self._sujas = set()
+        self._transacao = None
+        self._compactacao_adiada = 0
+        self._inscritos = []
+        # Protege os registros e os índices durante uma alteração, para que
+        # threads de leitura (alertas de vencimento) não vejam índices pela metade
+        self.bloqueio = threading.RLock()
         self.data = self.load_data()
     
     def load_data(self):
-        """Carrega dados do arquivo JSON ou cria estrutura inicial"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                pass
+        """Carrega o snapshot (ou a estrutura inicial) e reaplica o journal"""
+        if self.formato == "colecoes":
+            lido = self._ler_colecoes()
+        else:
+            lido = self._ler_snapshot()
+        
+        if lido is not None:
+            data, sequencias = lido
+            self._carregar_indices(data, sequencias)
+            self._reaplicar_journal()
+            return data
+        
+        # Primeira execução em outro formato: migra o banco JSON existente
+        json_file = os.path.join(os.path.dirname(self.data_file), self.ARQUIVOS_PADRAO["json"])
+        if self.formato != "json" and os.path.exists(json_file):
+            print(f"ℹ️  Importando dados de '{json_file}'")
+            # O journal do banco JSON pode ter operações ainda fora do
+            # snapshot: abri-lo as reaplica e fechá-lo as compacta no arquivo
+            Database(json_file).fechar()
+            self.importar_json(json_file)
+            self._reaplicar_journal()
+            return self.data
         
         # Estrutura inicial do banco
-        initial_data = {
-            "usuarios": [
-                {
-                    "id": 1,
-                    "username": "admin",
-                    "senha": "admin123",
-                    "nome": "Administrador",
-                    "nivel_acesso": "administrador",
-                    "email": "admin@igo.com"
-                },
-                {
-                    "id": 2,
-                    "username": "gerente",
-                    "senha": "gerente123",
-                    "nome": "Gerente",
-                    "nivel_acesso": "gerente",
-                    "email": "gerente@igo.com"
-                },
-                {
-                    "id": 3,
-                    "username": "vendedor",
-                    "senha": "vendedor123",
-                    "nome": "Vendedor",
-                    "nivel_acesso": "vendedor",
-                    "email": "vendedor@igo.com"
-                },
-                {
-                    "id": 4,
-                    "username": "cliente",
-                    "senha": "cliente123",
-                    "nome": "Cliente",
-                    "nivel_acesso": "cliente",
-                    "email": "cliente@igo.com"
-                }
-            ],
-            "produtos": [],
-            "fornecedores": [],
-            "clientes": [],
-            "funcionarios": [],
-            "pedidos": [],
-            "movimentacoes": []
-        }
+        initial_data = estrutura_inicial()
         
+        self._carregar_indices(initial_data)
+        self._sujas.update(initial_data)
+        self._reaplicar_journal()
         self.save_data(initial_data)
         return initial_data
     
     def save_data(self, data=None):
-        """Salva dados no arquivo JSON"""
+        """Salva o snapshot completo e descarta o journal"""
         if data is None:
             data = self.data
         
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        # O journal pendente vai para o disco antes, caso o snapshot falhe
+        self._parar_gravador()
+        
+        if self.formato == "colecoes":
+            self._salvar_colecoes(data)
+        else:
+            self._salvar_snapshot(data)
         
         self.data = data
+        self._sujas.clear()
+        self._truncar_journal()
+    
+    def _salvar_snapshot(self, data):
+        """Grava o snapshot único (JSON ou binário), preservando as gerações anteriores"""
+        if self.formato == "binario":
+            conteudo = {"colecoes": dict(data), "sequencias": self.sequencias}
+            temp_file = self._escrever_temporario(
+                self.data_file,
+                lambda f: f.write(MAGICO_BINARIO + bytes([VERSAO_BINARIO]) +
+                                  pickle.dumps(conteudo, protocol=pickle.HIGHEST_PROTOCOL)),
+                binario=True
+            )
+        else:
+            snapshot = dict(data)
+            snapshot["_sequencias"] = self.sequencias
+            
+            temp_file = self._escrever_temporario(
+                self.data_file,
+                lambda f: json.dump(snapshot, f, indent=2, ensure_ascii=False, default=str)
+            )
+        
+        self._rotacionar_geracoes()
+        os.replace(temp_file, self.data_file)
+        self._sincronizar_diretorio(self.data_file)
+    
+    def _salvar_colecoes(self, data):
+        """Grava apenas as coleções alteradas, uma por arquivo JSONL"""
+        os.makedirs(self.data_file, exist_ok=True)
+        
+        for collection in sorted(self._sujas):
+            caminho = self._arquivo_colecao(collection)
+            anterior = None
+            if isinstance(data, ColecoesPreguicosas) and not data.carregada(collection):
+                # Não carregada: só tem inclusões pendentes, gravadas após uma
+                # cópia do arquivo atual, sem interpretar seus registros
+                itens = data.pendentes.get(collection)
+                if not itens:
+                    continue
+                anterior = caminho
+            else:
+                itens = data[collection]
+            
+            def escrever(f, itens=itens, anterior=anterior):
+                if anterior and os.path.exists(anterior):
+                    with open(anterior, 'r', encoding='utf-8') as origem:
+                        shutil.copyfileobj(origem, f)
+                for item in itens:
+                    f.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+            
+            os.replace(self._escrever_temporario(caminho, escrever), caminho)
+            if anterior:
+                del data.pendentes[collection]
+                data.ultimos_gravados.pop(collection, None)
+        
+        meta = {"colecoes": sorted(data.keys() | getattr(data, 'nomes', set())),
+                "sequencias": self.sequencias}
+        caminho = os.path.join(self.data_file, "_meta.json")
+        os.replace(self._escrever_temporario(caminho, lambda f: json.dump(meta, f, indent=2)), caminho)
+        self._sincronizar_diretorio(caminho)
+        
+        if isinstance(data, ColecoesPreguicosas):
+            data.nomes.update(data.keys())
+    
+    def _escrever_temporario(self, caminho, escrever, binario=False):
+        """Escreve em um arquivo temporário com fsync e retorna seu caminho.
+        
+        O arquivo definitivo só é substituído depois (os.replace), para que
+        uma interrupção no meio da escrita nunca trunque os dados.
+        """
+        temp_file = caminho + ".tmp"
+        with open(temp_file, 'wb' if binario else 'w', encoding=None if binario else 'utf-8') as f:
+            escrever(f)
+            f.flush()
+            os.fsync(f.fileno())
+        return temp_file
+    
+    def _arquivo_colecao(self, collection):
+        """Caminho do arquivo JSONL de uma coleção (formato "colecoes")"""
+        return os.path.join(self.data_file, f"{collection}.jsonl")
+    
+    def _ler_colecoes(self):
+        """Lê os metadados do formato "colecoes"; as coleções carregam sob demanda"""
+        caminho = os.path.join(self.data_file, "_meta.json")
+        if not os.path.exists(caminho):
+            return None
+        
+        with open(caminho, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        
+        return ColecoesPreguicosas(meta["colecoes"], self._carregar_colecao), meta["sequencias"]
+    
+    def _carregar_colecao(self, collection):
+        """Lê uma coleção do disco (mais as inclusões pendentes) e constrói seus índices"""
+        itens = []
+        caminho = self._arquivo_colecao(collection)
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                itens = [json.loads(linha) for linha in f if linha.strip()]
+        itens.extend(self.data.pendentes.pop(collection, []))
+        
+        self._indexar_colecao(collection, itens)
+        return itens
+    
+    def _colecao_adiada(self, collection):
+        """Indica se inclusões na coleção podem ficar pendentes, sem carregá-la"""
+        data = self.data
+        return isinstance(data, ColecoesPreguicosas) and not data.carregada(collection) and collection in data.nomes
+    
+    def _ultimo_id_gravado(self, collection):
+        """Maior ID no arquivo de uma coleção não carregada (lido só da última linha)"""
+        ultimos = self.data.ultimos_gravados
+        if collection not in ultimos:
+            ultimos[collection] = 0
+            caminho = self._arquivo_colecao(collection)
+            if os.path.exists(caminho) and os.path.getsize(caminho) > 0:
+                with open(caminho, 'rb') as f:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                        # Os arquivos são gravados em ordem de ID, uma linha por registro
+                        inicio = m.rfind(b"\n", 0, m.size() - 1) + 1
+                        ultimos[collection] = json.loads(m[inicio:])['id']
+        return ultimos[collection]
+    
+    def iterar_itens(self, collection):
+        """Percorre os registros de uma coleção sem carregá-la em memória.
+        
+        Coleções ainda não carregadas (formato "colecoes") são lidas do
+        arquivo via mmap, uma linha por vez, seguidas das inclusões
+        pendentes; nas demais, percorre a lista.
+        """
+        data = self.data
+        if not isinstance(data, ColecoesPreguicosas) or data.carregada(collection):
+            yield from data[collection]
+            return
+        
+        caminho = self._arquivo_colecao(collection)
+        if collection not in data.nomes:
+            return
+        
+        if os.path.exists(caminho) and os.path.getsize(caminho) > 0:
+            with open(caminho, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    for linha in iter(m.readline, b''):
+                        if linha.strip():
+                            yield json.loads(linha)
+        yield from list(data.pendentes.get(collection, []))
+    
+    def _arquivos_snapshot(self):
+        """Snapshot atual seguido das gerações anteriores (mais recente primeiro)"""
+        return [self.data_file] + [f"{self.data_file}.{n}" for n in range(1, self.geracoes + 1)]
+    
+    def _ler_snapshot(self):
+        """Lê o snapshot mais recente íntegro, recorrendo às gerações anteriores.
+        
+        Retorna None apenas quando não existe nenhum snapshot; se existirem
+        arquivos mas todos estiverem corrompidos, levanta erro em vez de
+        recriar o banco e apagar os dados.
+        """
+        existentes = [arquivo for arquivo in self._arquivos_snapshot() if os.path.exists(arquivo)]
+        
+        for arquivo in existentes:
+            try:
+                if self.formato == "binario":
+                    lido = self._ler_binario(arquivo)
+                else:
+                    with open(arquivo, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    lido = data, data.pop("_sequencias", {})
+            except (OSError, ValueError, EOFError, pickle.UnpicklingError) as e:
+                print(f"⚠️  Snapshot '{arquivo}' ilegível: {e}")
+                continue
+            
+            if arquivo != self.data_file:
+                print(f"⚠️  Dados recuperados da geração '{arquivo}'")
+            return lido
+        
+        if existentes:
+            raise RuntimeError(f"Nenhum snapshot íntegro encontrado para '{self.data_file}'")
+        return None
+    
+    def _ler_binario(self, arquivo):
+        """Lê um snapshot binário, validando assinatura e versão do formato"""
+        with open(arquivo, 'rb') as f:
+            cabecalho = f.read(len(MAGICO_BINARIO) + 1)
+            if cabecalho[:len(MAGICO_BINARIO)] != MAGICO_BINARIO:
+                raise ValueError("assinatura de snapshot binário inválida")
+            if cabecalho[-1] != VERSAO_BINARIO:
+                raise ValueError(f"versão de snapshot binário não suportada: {cabecalho[-1]}")
+            conteudo = pickle.load(f)
+        return conteudo["colecoes"], conteudo["sequencias"]
+    
+    def importar_json(self, caminho):
+        """Substitui os dados atuais pelo conteúdo de um snapshot JSON e salva"""
+        with open(caminho, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        self._carregar_indices(data, data.pop("_sequencias", {}))
+        self._sujas.update(data)
+        self.save_data(data)
+    
+    def exportar_json(self, caminho):
+        """Exporta todas as coleções para um snapshot no formato JSON original"""
+        snapshot = {collection: self.data[collection] for collection in self.colecoes()}
+        snapshot["_sequencias"] = self.sequencias
+        
+        temp_file = self._escrever_temporario(
+            caminho,
+            lambda f: json.dump(snapshot, f, indent=2, ensure_ascii=False, default=str)
+        )
+        os.replace(temp_file, caminho)
+    
+    def colecoes(self):
+        """Nomes de todas as coleções, inclusive as ainda não carregadas"""
+        return sorted(self.data.keys() | getattr(self.data, 'nomes', set()))
+    
+    def _rotacionar_geracoes(self):
+        """Desloca os snapshots anteriores (.1 -> .2 ...) preservando as últimas gerações"""
+        if self.geracoes <= 0 or not os.path.exists(self.data_file):
+            return
+        
+        arquivos = self._arquivos_snapshot()
+        for n in range(len(arquivos) - 1, 0, -1):
+            if os.path.exists(arquivos[n - 1]):
+                os.replace(arquivos[n - 1], arquivos[n])
+    
+    def _sincronizar_diretorio(self, caminho):
+        """Garante que a renomeação de um arquivo chegou ao disco (POSIX)"""
+        if os.name != 'posix':
+            return
+        
+        fd = os.open(os.path.dirname(os.path.abspath(caminho)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def compactar(self):
+        """Grava um novo snapshot consolidando as operações do journal"""
+        self.save_data()
+    
+    @contextmanager
+    def compactacao_adiada(self):
+        """Adia a compactação automática até o fim do bloco (cargas em lote).
+        
+        Sem isso, uma carga grande reescreveria o snapshot inteiro a cada
+        compactar_a_cada operações; no fim do bloco ele é gravado uma vez.
+        """
+        self._compactacao_adiada += 1
+        try:
+            yield self
+        finally:
+            self._compactacao_adiada -= 1
+            if not self._compactacao_adiada and self.journal and self._ops_journal >= self.compactar_a_cada:
+                self.compactar()
+    
+    def descarregar(self):
+        """Grava no disco as operações pendentes da gravação assíncrona"""
+        if self._gravador is not None:
+            self._gravador.descarregar()
+    
+    def _parar_gravador(self):
+        """Descarrega e encerra a thread de gravação assíncrona, se ativa"""
+        if self._gravador is not None:
+            gravador, self._gravador = self._gravador, None
+            gravador.parar()
+    
+    def fechar(self):
+        """Compacta o journal e libera o arquivo (chamar ao encerrar o sistema)"""
+        self._parar_gravador()
+        if self.journal and self._ops_journal:
+            self.compactar()
+        if self._journal_handle:
+            self._journal_handle.close()
+            self._journal_handle = None
+    
+    @contextmanager
+    def transaction(self):
+        """Agrupa várias mutações em uma única persistência atômica.
+        
+        As alterações são aplicadas em memória normalmente, mas só são
+        gravadas no commit (uma linha "tx" no journal, ou um único snapshot).
+        Se o bloco levantar uma exceção, as alterações são desfeitas.
+        Transações aninhadas fazem parte da transação externa. O bloqueio
+        do banco fica com a thread da transação até o commit ou rollback:
+        mutações de outras threads aguardam, em vez de entrarem nela.
+        
+            with db.transaction():
+                db.update_item("pedidos", ...)
+                db.update_item("produtos", ...)
+        """
+        with self.bloqueio:
+            if self._transacao is not None:
+                yield self
+                return
+            
+            self._transacao = {"ops": [], "desfazer": [], "eventos": []}
+            try:
+                yield self
+            except BaseException:
+                transacao, self._transacao = self._transacao, None
+                self._desfazer(transacao["desfazer"])
+                raise
+            
+            transacao, self._transacao = self._transacao, None
+            if len(transacao["ops"]) == 1:
+                self._gravar(transacao["ops"][0])
+            elif transacao["ops"]:
+                self._gravar({"op": "tx", "ops": transacao["ops"]}, len(transacao["ops"]))
+            for evento in transacao["eventos"]:
+                self._notificar(*evento)
+    
+    def _desfazer(self, desfazer):
+        """Reverte em memória as mutações de uma transação abortada"""
+        for acao, collection, valor in reversed(desfazer):
+            if acao == "add":
+                self._remover(collection, valor)
+            elif acao == "update":
+                item = self._indice_id[collection][valor['id']]
+                with self.bloqueio:
+                    for campo in set(item) - set(valor):
+                        del item[campo]
+                    self._atualizar(collection, item, valor, alertar=False)
+            elif acao == "delete":
+                self._inserir(collection, valor)
+    
+    def _persistir(self, operacao, desfazer=None):
+        """Persiste uma mutação, ou a acumula se houver transação aberta"""
+        if self._transacao is not None:
+            self._transacao["ops"].append(operacao)
+            self._transacao["desfazer"].append(desfazer)
+            return
+        
+        self._gravar(operacao)
+    
+    def _gravar(self, operacao, quantidade=1):
+        """Grava uma operação no journal (uma linha) ou o snapshot completo"""
+        if not self.journal:
+            self.save_data()
+            return
+        
+        # Serializada aqui: os registros continuam sendo alterados em memória
+        linha = json.dumps(operacao, ensure_ascii=False, default=str) + "\n"
+        if self.durabilidade == "assincrona":
+            if self._gravador is None:
+                self._gravador = GravadorJournal(self.journal_file, self.intervalo_gravacao, self.lote_gravacao)
+                self._gravador.iniciar()
+            self._gravador.escrever(linha)
+        else:
+            if self._journal_handle is None:
+                self._journal_handle = open(self.journal_file, 'a', encoding='utf-8')
+            
+            self._journal_handle.write(linha)
+            self._journal_handle.flush()
+            os.fsync(self._journal_handle.fileno())
+        
+        self._ops_journal += quantidade
+        if self._ops_journal >= self.compactar_a_cada and not self._compactacao_adiada:
+            self.compactar()
+    
+    def _truncar_journal(self):
+        """Remove o journal após um snapshot completo"""
+        if self._journal_handle:
+            self._journal_handle.close()
+            self._journal_handle = None
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self._ops_journal = 0
+    
+    def _carregar_indices(self, data, sequencias=None):
+        """Constrói os índices das coleções já presentes em memória"""
+        self.sequencias = sequencias or {}
+        self.data = data
+        self._indice_id = {}
+        self._ids = {}
+        self._indices = {}
+        self._ordenados = {}
+        self._textuais = {}
+        for collection, itens in list(data.items()):
+            self._indexar_colecao(collection, itens)
+        self._notificar("recarregar", None, None)
+    
+    def inscrever(self, callback):
+        """Registra callback(evento, collection, item) chamado a cada mutação.
+        
+        Eventos: "add", "update", "delete" e "recarregar" (dados substituídos
+        por inteiro; collection e item são None). Também são notificadas as
+        reversões de transações abortadas, como mutações inversas. Após o
+        "update" que leva um produto ao seu ponto de reposição (ou abaixo
+        dele) é emitido também "estoque_baixo"; dentro de uma transação,
+        apenas no commit.
+        """
+        self._inscritos.append(callback)
+    
+    def cancelar_inscricao(self, callback):
+        """Remove um callback registrado com inscrever()"""
+        if callback in self._inscritos:
+            self._inscritos.remove(callback)
+    
+    def sincronizar(self):
+        """Entrega aos inscritos mutações feitas por outros processos.
+        
+        Neste backend os dados pertencem a um único processo e as mutações
+        são notificadas no momento em que ocorrem; nada a fazer.
+        """
+    
+    def _notificar(self, evento, collection, item):
+        """Repassa uma mutação aos inscritos"""
+        for callback in self._inscritos:
+            callback(evento, collection, item)
+    
+    def _indexar_colecao(self, collection, itens):
+        """Constrói o índice por ID e os índices secundários de uma coleção.
+        
+        Cada coleção é mantida ordenada por ID, de modo que a posição de um
+        registro pode ser localizada por busca binária em self._ids.
+        """
+        if any(itens[i]['id'] > itens[i + 1]['id'] for i in range(len(itens) - 1)):
+            itens.sort(key=lambda item: item['id'])
+        self.data[collection] = itens
+        self._indice_id[collection] = {item['id']: item for item in itens}
+        self._ids[collection] = [item['id'] for item in itens]
+        
+        # Snapshots antigos não têm sequência: parte do maior ID existente
+        ultimo_id = self._ids[collection][-1] if itens else 0
+        self.sequencias[collection] = max(self.sequencias.get(collection, 0), ultimo_id)
+        
+        self._indices[collection] = {}
+        for campo in self.indices_declarados.get(collection, []):
+            self._construir_indice(collection, campo)
+        
+        self._ordenados[collection] = {}
+        for nome, chave in self.INDICES_ORDENADOS.get(collection, {}).items():
+            indice = IndiceOrdenado(chave)
+            for item in itens:
+                indice.adicionar(item)
+            self._ordenados[collection][nome] = indice
+        
+        if collection in self.INDICES_TEXTO:
+            indice = IndiceTexto(self.INDICES_TEXTO[collection])
+            for item in itens:
+                indice.adicionar(item)
+            self._textuais[collection] = indice
+    
+    def _indice_primario(self, collection):
+        """Índice por ID de uma coleção, carregando-a sob demanda"""
+        if collection not in self._indice_id:
+            self.data[collection]
+        return self._indice_id[collection]
+    
+    def criar_indice(self, collection, campo):
+        """Declara um índice secundário de igualdade para get_items"""
+        campos = self.indices_declarados.setdefault(collection, [])
+        if campo not in campos:
+            campos.append(campo)
+        if collection in self._indice_id:
+            return self._construir_indice(collection, campo)
+        return None
+    
+    def _construir_indice(self, collection, campo):
+        """Constrói um índice secundário sobre os registros em memória"""
+        indice = IndiceSecundario(campo)
+        for item in self.data[collection]:
+            indice.adicionar(item)
+        self._indices.setdefault(collection, {})[campo] = indice
+        return indice
+    
+    def _indices_da_colecao(self, collection):
+        """Índices secundários, ordenados e textuais mantidos para uma coleção"""
+        indices = (list(self._indices.get(collection, {}).values())
+                   + list(self._ordenados.get(collection, {}).values()))
+        if collection in self._textuais:
+            indices.append(self._textuais[collection])
+        return indices
+    
+    def indice_ordenado(self, collection, nome):
+        """Retorna um índice ordenado de INDICES_ORDENADOS"""
+        self._indice_primario(collection)
+        return self._ordenados[collection][nome]
+    
+    def _inserir(self, collection, item):
+        """Insere um registro na coleção e nos índices.
+        
+        Em uma coleção ainda não carregada (formato "colecoes") o registro
+        fica pendente, sem ler o arquivo: é anexado a ele na próxima
+        gravação, ou à lista se a coleção for carregada antes disso.
+        """
+        with self.bloqueio:
+            if self._colecao_adiada(collection):
+                self.data.pendentes.setdefault(collection, []).append(item)
+                self.sequencias[collection] = max(self.sequencias.get(collection, 0), item['id'])
+                self._sujas.add(collection)
+                self._notificar("add", collection, item)
+                return
+            
+            if collection in self.data:
+                self._indice_primario(collection)
+            else:
+                self._indexar_colecao(collection, [])
+            self._sujas.add(collection)
+            
+            ids = self._ids[collection]
+            if ids and item['id'] < ids[-1]:
+                posicao = bisect_left(ids, item['id'])
+                self.data[collection].insert(posicao, item)
+                ids.insert(posicao, item['id'])
+            else:
+                self.data[collection].append(item)
+                ids.append(item['id'])
+            self._indice_id[collection][item['id']] = item
+            self.sequencias[collection] = max(self.sequencias.get(collection, 0), item['id'])
+            
+            for indice in self._indices_da_colecao(collection):
+                indice.adicionar(item)
+            self._notificar("add", collection, item)
+    
+    def _atualizar(self, collection, item, updates, alertar=True):
+        """Aplica alterações a um registro e reindexa os campos afetados.
+        
+        Com alertar=False (reversão de transação) não emite "estoque_baixo".
+        """
+        with self.bloqueio:
+            reposicao = self._ordenados.get(collection, {}).get("reposicao")
+            antes = reposicao.chaves.get(item['id']) if reposicao else None
+            
+            self._sujas.add(collection)
+            item.update(updates)
+            for indice in self._indices_da_colecao(collection):
+                indice.atualizar(item)
+            self._notificar("update", collection, item)
+            
+            if alertar and reposicao and (antes is None or antes > 0):
+                depois = reposicao.chaves.get(item['id'])
+                if depois is not None and depois <= 0:
+                    if self._transacao is not None:
+                        # Só no commit: um rollback desfaz a queda do estoque
+                        self._transacao["eventos"].append(("estoque_baixo", collection, item))
+                    else:
+                        self._notificar("estoque_baixo", collection, item)
+    
+    def _remover(self, collection, item_id):
+        """Remove um registro da coleção e dos índices"""
+        with self.bloqueio:
+            item = self._indice_primario(collection).pop(item_id, None)
+            if item is None:
+                return None
+            self._sujas.add(collection)
+            
+            ids = self._ids[collection]
+            posicao = bisect_left(ids, item_id)
+            del ids[posicao]
+            del self.data[collection][posicao]
+            
+            for indice in self._indices_da_colecao(collection):
+                indice.remover(item_id)
+            self._notificar("delete", collection, item)
+            return item
+    
+    def _reaplicar_journal(self):
+        """Reaplica sobre o snapshot as operações registradas no journal.
+        
+        As operações são idempotentes (inclusões com ID já existente são
+        ignoradas e atualizações gravam valores absolutos), então reaplicar
+        um journal já incorporado ao snapshot não altera o resultado.
+        
+        Uma linha incompleta (queda durante a escrita) encerra a reaplicação
+        e é cortada do arquivo: sem isso, as próximas operações seriam
+        gravadas depois dela e também ignoradas na reaplicação seguinte.
+        """
+        if not os.path.exists(self.journal_file):
+            return 0
+        
+        aplicadas = 0
+        valido = 0
+        with open(self.journal_file, 'rb') as f:
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break
+                try:
+                    operacao = json.loads(linha)
+                except ValueError:
+                    break
+                self._aplicar_operacao(operacao)
+                aplicadas += 1
+                valido += len(linha)
+            
+            if f.seek(0, os.SEEK_END) > valido:
+                with open(self.journal_file, 'r+b') as journal:
+                    journal.truncate(valido)
+                    journal.flush()
+                    os.fsync(journal.fileno())
+        
+        self._ops_journal = aplicadas
+        return aplicadas
+    
+    def _aplicar_operacao(self, operacao):
+        """Aplica uma operação do journal sobre os dados em memória"""
+        if operacao['op'] == 'tx':
+            for sub_operacao in operacao['ops']:
+                self._aplicar_operacao(sub_operacao)
+            return
+        
+        collection = operacao['colecao']
+        if operacao['op'] == 'add' and self._colecao_adiada(collection):
+            # Inclusão sem carregar a coleção: IDs até o último do arquivo já estão nele
+            if operacao['item']['id'] > self._ultimo_id_gravado(collection):
+                self._inserir(collection, operacao['item'])
+            return
+        
+        indice = self._indice_primario(collection) if collection in self.data else {}
+        
+        if operacao['op'] == 'add':
+            if operacao['item']['id'] not in indice:
+                self._inserir(collection, operacao['item'])
+        elif operacao['op'] == 'update':
+            item = indice.get(operacao['id'])
+            if item is not None:
+                self._atualizar(collection, item, operacao['dados'])
+        elif operacao['op'] == 'delete':
+            self._remover(collection, operacao['id'])
     
     def get_next_id(self, collection):
-        """Gera próximo ID para uma coleção"""
-        if not self.data[collection]:
-            return 1
+        """Gera próximo ID para uma coleção (IDs nunca são reutilizados)"""
+        proximo_id = self.sequencias.get(collection, 0) + 1
+        self.sequencias[collection] = proximo_id
+        return proximo_id
+    
+    def _verificar_unicidade(self, collection, item, item_id=None):
+        """Rejeita valores já usados por outro registro nos campos únicos"""
+        campos = self.INDICES_UNICOS.get(collection)
+        if not campos:
+            return
         
-        max_id = max(item['id'] for item in self.data[collection])
-        return max_id + 1
+        self._indice_primario(collection)
+        for campo in campos:
+            valor = item.get(campo)
+            if valor is None or valor == "":
+                continue
+            if any(outro_id != item_id for outro_id in self._indices[collection][campo].buscar(valor)):
+                raise RegistroDuplicadoError(collection, campo, valor)
+    
+    def buscar_unico(self, collection, campo, valor):
+        """Busca o registro com o valor informado em um campo único (ou None)"""
+        self._indice_primario(collection)
+        encontrados = self._indices[collection][campo].buscar(valor)
+        return next(iter(encontrados.values()), None)
     
     def add_item(self, collection, item):
         """Adiciona item a uma coleção"""
-        item['id'] = self.get_next_id(collection)
-        self.data[collection].append(item)
-        self.save_data()
-        return item
+        with self.bloqueio:
+            self._verificar_unicidade(collection, item)
+            item['id'] = self.get_next_id(collection)
+            item['versao'] = 1
+            self._inserir(collection, item)
+            self._persistir({"op": "add", "colecao": collection, "item": item},
+                            ("add", collection, item['id']))
+            return item
     
-    def update_item(self, collection, item_id, updates):
-        """Atualiza item de uma coleção"""
-        for item in self.data[collection]:
-            if item['id'] == item_id:
-                item.update(updates)
-                self.save_data()
-                return item
-        return None
+    def update_item(self, collection, item_id, updates, versao=None):
+        """Atualiza item de uma coleção, incrementando a versão do registro.
+        
+        Com versao informada (a lida junto com o registro), a alteração só é
+        aplicada se o registro ainda estiver nessa versão; senão levanta
+        ConflitoVersaoError sem alterar nada (compare-and-swap). A verificação
+        e a alteração são feitas sob o mesmo bloqueio, sem intervalo em que
+        outra thread possa gravar o registro entre elas.
+        """
+        with self.bloqueio:
+            item = self._indice_primario(collection).get(item_id)
+            if item is None:
+                return None
+            
+            if versao is not None and versao_atual(item) != versao:
+                raise ConflitoVersaoError(collection, item_id, versao, versao_atual(item))
+            # Só os campos alterados: duplicados anteriores à regra não impedem
+            # a alteração dos demais campos do registro
+            self._verificar_unicidade(collection, alterados(item, updates), item_id)
+            updates = {**updates, 'versao': versao_atual(item) + 1}
+            anterior = copy.deepcopy(item) if self._transacao is not None else None
+            self._atualizar(collection, item, updates)
+            self._persistir({"op": "update", "colecao": collection, "id": item_id, "dados": updates},
+                            ("update", collection, anterior))
+            return item
     
     def delete_item(self, collection, item_id):
         """Remove item de uma coleção"""
-        for i, item in enumerate(self.data[collection]):
-            if item['id'] == item_id:
-                deleted = self.data[collection].pop(i)
-                self.save_data()
-                return deleted
-        return None
+        with self.bloqueio:
+            deleted = self._remover(collection, item_id)
+            if deleted is not None:
+                self._persistir({"op": "delete", "colecao": collection, "id": item_id},
+                                ("delete", collection, deleted))
+            return deleted
     
     def get_item(self, collection, item_id):
         """Busca item por ID"""
-        for item in self.data[collection]:
-            if item['id'] == item_id:
-                return item
-        return None
+        return self._indice_primario(collection).get(item_id)
     
     def get_items(self, collection, filters=None):
         """Busca itens de uma coleção com filtros opcionais"""
         items = self.data[collection]
         
         if filters:
+            candidatos = self._buscar_por_indices(collection, filters)
+            if candidatos is not None:
+                items = candidatos
+            
             filtered_items = []
             for item in items:
                 match = True
@@ -139,23 +1011,86 @@ class Database:
         
         return items
     
-    def get_produtos_baixo_estoque(self, limite=10):
-        """Retorna produtos com estoque baixo"""
-        return [p for p in self.data['produtos'] if p['quantidade'] <= limite]
+    def get_pagina(self, collection, offset=0, limite=20, filters=None):
+        """Página de registros em ordem de ID, por deslocamento: retorna (itens, total)"""
+        items = self.get_items(collection, filters)
+        return items[offset:offset + limite], len(items)
     
-    def get_produtos_vencendo(self, dias=30):
-        """Retorna produtos próximos do vencimento (apenas alimentos)"""
-        hoje = datetime.now()
-        limite = hoje + timedelta(days=dias)
+    def get_itens_apos(self, collection, apos_id=0, limite=20, filters=None):
+        """Paginação por chave: até `limite` registros com ID maior que apos_id"""
+        items = self.get_items(collection, filters)
+        posicao = self._posicao_apos(items, apos_id)
+        return items[posicao:posicao + limite]
+    
+    def get_itens_antes(self, collection, antes_id, limite=20, filters=None):
+        """Paginação por chave: os `limite` registros imediatamente anteriores a antes_id"""
+        items = self.get_items(collection, filters)
+        posicao = self._posicao_apos(items, antes_id - 1)
+        return items[max(0, posicao - limite):posicao]
+    
+    def _posicao_apos(self, items, item_id):
+        """Busca binária do primeiro registro com ID maior que item_id (itens em ordem de ID)"""
+        inicio, fim = 0, len(items)
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            if items[meio]['id'] <= item_id:
+                inicio = meio + 1
+            else:
+                fim = meio
+        return inicio
+    
+    def _buscar_por_indices(self, collection, filters):
+        """Planeja a consulta usando os índices secundários disponíveis.
         
-        produtos_vencendo = []
-        for produto in self.data['produtos']:
-            if produto['categoria'] == 'alimento' and 'validade' in produto:
-                try:
-                    validade = datetime.strptime(produto['validade'], '%Y-%m-%d')
-                    if validade <= limite:
-                        produtos_vencendo.append(produto)
-                except:
-                    pass
+        Intersecta os grupos dos campos indexados, começando pelo menor
+        (mais seletivo). Retorna None quando nenhum filtro é indexado, e
+        os candidatos em ordem de ID para que os demais filtros sejam
+        verificados sobre eles.
+        """
+        indices = self._indices.get(collection, {})
+        grupos = []
+        for key, value in filters.items():
+            if key not in indices:
+                continue
+            try:
+                grupos.append(indices[key].buscar(value))
+            except TypeError:
+                continue
         
-        return produtos_vencendo
+        if not grupos:
+            return None
+        
+        grupos.sort(key=len)
+        ids = grupos[0].keys()
+        for grupo in grupos[1:]:
+            if not ids:
+                break
+            ids = ids & grupo.keys()
+        
+        return [self._indice_id[collection][item_id] for item_id in sorted(ids)]
+    
+    def buscar_texto(self, collection, termo, limite=None):
+        """Busca por substring/prefixo, sem acentos, nos campos de INDICES_TEXTO.
+        
+        Retorna os registros do mais ao menos relevante (ver indices.pontuar).
+        """
+        self._indice_primario(collection)
+        if collection not in self._textuais:
+            raise ValueError(f"Coleção sem busca textual: {collection}")
+        return self._textuais[collection].buscar(termo, limite)
+    
+    def get_produtos_baixo_estoque(self, limite=None):
+        """Retorna produtos com estoque baixo, dos mais críticos aos menos.
+        
+        Sem limite, compara cada produto com o seu ponto de reposição
+        (ponto_reposicao, ou PONTO_REPOSICAO_PADRAO); com limite, usa o
+        mesmo valor para todos os produtos.
+        """
+        if limite is None:
+            return self.indice_ordenado("produtos", "reposicao").intervalo(maximo=0)
+        return self.indice_ordenado("produtos", "quantidade").intervalo(maximo=limite)
+    
+    def get_produtos_vencendo(self, dias=30):
+        """Retorna produtos próximos do vencimento (apenas alimentos)"""
+        limite = (datetime.now() + timedelta(days=dias)).date()
+        return self.indice_ordenado("produtos", "vencimento").intervalo(maximo=limite)
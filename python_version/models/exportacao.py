@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportação de Dados - Sistema IGO
+"""
+
+import csv
+import io
+import json
+import os
+from itertools import chain, islice
+
+FORMATOS = ("csv", "jsonl")
+
+def formato_por_extensao(caminho, padrao="jsonl"):
+    """Formato pela extensão do arquivo ("csv" ou "jsonl")"""
+    extensao = os.path.splitext(caminho)[1].lower().lstrip(".")
+    if extensao in ("jsonl", "ndjson"):
+        return "jsonl"
+    return extensao if extensao in FORMATOS else padrao
+
+def gerar_jsonl(registros):
+    """Gera uma linha JSON por registro"""
+    for registro in registros:
+        yield json.dumps(registro, ensure_ascii=False, default=str) + "\n"
+
+def gerar_csv(registros, colunas=None, amostra=100):
+    """Gera as linhas CSV (cabeçalho primeiro) dos registros.
+    
+    Sem colunas explícitas, usa a união dos campos dos primeiros `amostra`
+    registros, de modo que apenas eles ficam em memória; campos que só
+    aparecem depois são ignorados (exportar_colecao calcula as colunas da
+    coleção inteira). Listas e dicionários (ex.: itens de um pedido) são
+    gravados como JSON.
+    """
+    registros = iter(registros)
+    primeiros = list(islice(registros, amostra))
+    if colunas is None:
+        colunas = []
+        for registro in primeiros:
+            colunas.extend(campo for campo in registro if campo not in colunas)
+    if not colunas:
+        return
+    
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, colunas, extrasaction="ignore")
+    
+    def esvaziar():
+        texto = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return texto
+    
+    escritor.writeheader()
+    yield esvaziar()
+    for registro in chain(primeiros, registros):
+        escritor.writerow({campo: json.dumps(valor, ensure_ascii=False) if isinstance(valor, (dict, list)) else valor
+                           for campo, valor in registro.items()})
+        yield esvaziar()
+
+def exportar(registros, destino, formato="jsonl", colunas=None):
+    """Grava os registros em um caminho ou arquivo aberto, sem materializá-los.
+    
+    Retorna o número de registros exportados.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato} (use {' ou '.join(FORMATOS)})")
+    
+    exportados = 0
+    
+    def contar(itens):
+        nonlocal exportados
+        for item in itens:
+            exportados += 1
+            yield item
+    
+    linhas = gerar_csv(contar(registros), colunas) if formato == "csv" else gerar_jsonl(contar(registros))
+    if hasattr(destino, "write"):
+        destino.writelines(linhas)
+    else:
+        with open(destino, 'w', encoding='utf-8', newline='') as f:
+            f.writelines(linhas)
+    return exportados
+
+def colunas_colecao(database, collection):
+    """União dos campos de todos os registros de uma coleção, na ordem em que aparecem"""
+    colunas = {}
+    for registro in database.iterar_itens(collection):
+        for campo in registro:
+            colunas.setdefault(campo, None)
+    return list(colunas)
+
+def exportar_colecao(database, collection, destino, formato="jsonl", colunas=None):
+    """Exporta uma coleção inteira, percorrendo-a com iterar_itens.
+    
+    Em CSV, sem colunas explícitas, a coleção é percorrida duas vezes: a
+    primeira apenas reúne os campos de todos os registros.
+    """
+    if collection not in database.colecoes():
+        raise ValueError(f"Coleção inexistente: {collection}")
+    if formato == "csv" and colunas is None:
+        colunas = colunas_colecao(database, collection)
+    return exportar(database.iterar_itens(collection), destino, formato, colunas)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gravação Assíncrona do Journal - Sistema IGO
+"""
+
+import atexit
+import os
+import threading
+
+class GravadorJournal:
+    """Grava as linhas do journal em segundo plano (write-behind).
+    
+    As linhas chegam já serializadas e são acumuladas em memória; a thread
+    as grava a cada `intervalo` segundos, ou assim que houver `lote` linhas
+    pendentes, com uma única escrita e um único fsync para todo o grupo.
+    Uma queda pode perder apenas as linhas ainda pendentes (no máximo
+    `intervalo` segundos de operações), nunca corromper as já gravadas.
+    Um erro de escrita na thread é levantado na próxima chamada.
+    """
+    
+    def __init__(self, caminho, intervalo=1.0, lote=1000):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self.lote = lote
+        self._pendentes = []
+        self._condicao = threading.Condition()
+        self._gravando = threading.Lock()
+        self._parar = False
+        self._erro = None
+        self._arquivo = None
+        self._thread = None
+    
+    def escrever(self, linha):
+        """Enfileira uma linha (terminada em nova linha) para gravação"""
+        self._verificar_erro()
+        with self._condicao:
+            self._pendentes.append(linha)
+            if len(self._pendentes) >= self.lote:
+                self._condicao.notify()
+    
+    def descarregar(self):
+        """Grava imediatamente as linhas pendentes (com fsync)"""
+        self._gravar_pendentes()
+        self._verificar_erro()
+    
+    def _verificar_erro(self):
+        """Levanta o erro ocorrido em uma gravação anterior"""
+        if self._erro is not None:
+            erro, self._erro = self._erro, None
+            raise erro
+    
+    def _gravar_pendentes(self):
+        """Grava em bloco as linhas acumuladas (chamado pela thread ou por descarregar)"""
+        with self._gravando:
+            with self._condicao:
+                linhas, self._pendentes = self._pendentes, []
+            if not linhas:
+                return
+            
+            try:
+                if self._arquivo is None:
+                    self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+                self._arquivo.write("".join(linhas))
+                self._arquivo.flush()
+                os.fsync(self._arquivo.fileno())
+            except OSError as e:
+                # Devolve as linhas à fila para a próxima tentativa
+                with self._condicao:
+                    self._pendentes[:0] = linhas
+                self._erro = e
+    
+    def _executar(self):
+        """Laço da thread de gravação"""
+        while True:
+            with self._condicao:
+                if not self._parar and len(self._pendentes) < self.lote:
+                    self._condicao.wait(self.intervalo)
+                parar = self._parar
+            self._gravar_pendentes()
+            if parar:
+                return
+    
+    def iniciar(self):
+        """Inicia a thread de gravação (daemon, descarregada também ao sair do processo)"""
+        if self._thread is not None:
+            return
+        self._parar = False
+        self._thread = threading.Thread(target=self._executar, name="gravador-journal", daemon=True)
+        self._thread.start()
+        atexit.register(self.parar)
+    
+    def parar(self):
+        """Grava as linhas pendentes, encerra a thread e fecha o arquivo"""
+        if self._thread is not None:
+            with self._condicao:
+                self._parar = True
+                self._condicao.notify()
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.parar)
+        
+        self._gravar_pendentes()
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+        self._verificar_erro()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importação em Lote - Sistema IGO
+"""
+
+import csv
+import json
+import os
+from models.servicos import ServicoCadastros
+from models.validacao import VALIDADORES
+
+def detectar_formato(caminho):
+    """Formato do arquivo pela extensão: "csv" ou "jsonl" """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == ".csv":
+        return "csv"
+    if extensao in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Formato não reconhecido: {caminho} (use .csv ou .jsonl)")
+
+def ler_registros(caminho, formato=None):
+    """Gera (número da linha, campos) lendo o arquivo linha a linha.
+    
+    CSV deve ter cabeçalho (separador "," ou ";"). Em JSONL, linhas que não
+    são um objeto JSON geram (número da linha, ValueError).
+    """
+    formato = formato or detectar_formato(caminho)
+    with open(caminho, 'r', encoding='utf-8-sig', newline='') as f:
+        if formato == "csv":
+            amostra = f.read(4096)
+            f.seek(0)
+            try:
+                dialeto = csv.Sniffer().sniff(amostra, delimiters=",;")
+            except csv.Error:
+                dialeto = csv.excel
+            for numero, linha in enumerate(csv.DictReader(f, dialect=dialeto), 2):
+                yield numero, linha
+        else:
+            for numero, linha in enumerate(f, 1):
+                if not linha.strip():
+                    continue
+                try:
+                    dados = json.loads(linha)
+                except ValueError as e:
+                    yield numero, ValueError(f"JSON inválido: {e}")
+                    continue
+                if not isinstance(dados, dict):
+                    yield numero, ValueError("Linha não é um objeto JSON")
+                    continue
+                yield numero, dados
+
+def importar_arquivo(database, collection, caminho, arquivo_erros=None, lote=500, formato=None):
+    """Importa registros de um arquivo CSV/JSONL para uma coleção.
+    
+    Cada registro passa por ServicoCadastros.cadastrar, com as regras do
+    formulário de cadastro. Os registros são gravados em lotes, cada lote em
+    uma única transação (uma gravação no journal); os rejeitados, inclusive
+    CPF/CNPJ duplicados, vão para arquivo_erros (JSONL com linha, erro e
+    campos originais), criado apenas se houver rejeições.
+    
+    Retorna {"importados", "rejeitados", "arquivo_erros"}.
+    """
+    if collection not in VALIDADORES:
+        raise ValueError(f"Importação não suportada para: {collection}")
+    cadastros = ServicoCadastros(database)
+    arquivo_erros = arquivo_erros or os.path.splitext(caminho)[0] + ".erros.jsonl"
+    
+    resumo = {"importados": 0, "rejeitados": 0, "arquivo_erros": None}
+    erros = None
+    
+    def rejeitar(numero, erro, dados):
+        nonlocal erros
+        if erros is None:
+            erros = open(arquivo_erros, 'w', encoding='utf-8')
+            resumo["arquivo_erros"] = arquivo_erros
+        registro = {"linha": numero, "erro": str(erro), "dados": dados if isinstance(dados, dict) else None}
+        erros.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        resumo["rejeitados"] += 1
+    
+    def gravar(pendentes):
+        with database.transaction():
+            for numero, dados in pendentes:
+                try:
+                    # Mesmas regras (e movimentação de entrada) do cadastro interativo
+                    cadastros.cadastrar(collection, dados, "Importação em lote")
+                except ValueError as e:
+                    rejeitar(numero, e, dados)
+                    continue
+                resumo["importados"] += 1
+    
+    try:
+        # A compactação do journal é feita uma vez, no fim da importação
+        with database.compactacao_adiada():
+            pendentes = []
+            for numero, dados in ler_registros(caminho, formato):
+                if isinstance(dados, Exception):
+                    rejeitar(numero, dados, dados)
+                    continue
+                
+                pendentes.append((numero, dados))
+                if len(pendentes) >= lote:
+                    gravar(pendentes)
+                    pendentes = []
+            if pendentes:
+                gravar(pendentes)
+    finally:
+        if erros is not None:
+            erros.close()
+    
+    return resumo
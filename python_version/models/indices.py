@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índices em Memória - Sistema IGO
+"""
+
+import heapq
+import unicodedata
+from bisect import bisect_left, insort
+
+def normalizar_texto(texto):
+    """Converte para minúsculas e remove acentos ("Açúcar" -> "acucar")"""
+    decomposto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+def pontuar(termo, textos):
+    """Relevância de um termo já normalizado nos textos de um registro.
+    
+    Retorna None se o termo não ocorre em nenhum texto; senão, uma tupla
+    em que menor é melhor: texto igual ao termo, início do texto, início
+    de palavra e, por último, qualquer posição. Empates são decididos
+    pela ordem do campo e pela posição da ocorrência.
+    """
+    melhor = None
+    for campo, texto in enumerate(textos):
+        posicao = texto.find(termo)
+        if posicao < 0:
+            continue
+        if texto == termo:
+            classe = 0
+        elif posicao == 0:
+            classe = 1
+        elif not texto[posicao - 1].isalnum():
+            classe = 2
+        else:
+            classe = 3
+        pontos = (classe, campo, posicao)
+        if melhor is None or pontos < melhor:
+            melhor = pontos
+    return melhor
+
+class IndiceSecundario:
+    """Índice de igualdade sobre um campo de uma coleção (valor -> registros)"""
+    
+    def __init__(self, campo):
+        self.campo = campo
+        self.valores = {}
+        # Valor indexado de cada registro, necessário para removê-lo do
+        # grupo antigo mesmo quando o dicionário foi alterado in-place
+        self.chaves = {}
+    
+    def adicionar(self, item):
+        """Indexa um registro pelo valor atual do campo"""
+        if self.campo not in item:
+            return
+        
+        valor = item[self.campo]
+        try:
+            grupo = self.valores.setdefault(valor, {})
+        except TypeError:
+            # Valores não "hasheáveis" (listas, dicionários) não são indexados
+            return
+        
+        grupo[item['id']] = item
+        self.chaves[item['id']] = valor
+    
+    def remover(self, item_id):
+        """Remove um registro do índice"""
+        if item_id not in self.chaves:
+            return
+        
+        valor = self.chaves.pop(item_id)
+        grupo = self.valores[valor]
+        del grupo[item_id]
+        if not grupo:
+            del self.valores[valor]
+    
+    def atualizar(self, item):
+        """Reindexa um registro cujo campo pode ter mudado"""
+        if item['id'] in self.chaves and self.campo in item:
+            try:
+                if self.chaves[item['id']] == item[self.campo]:
+                    return
+            except TypeError:
+                pass
+        
+        self.remover(item['id'])
+        self.adicionar(item)
+    
+    def buscar(self, valor):
+        """Retorna os registros (id -> registro) com o valor informado"""
+        return self.valores.get(valor, {})
+
+class IndiceOrdenado:
+    """Índice ordenado por uma chave calculada a partir do registro.
+    
+    A chave é calculada uma única vez, na escrita (inclusão ou alteração);
+    registros cuja chave é None ficam fora do índice. As chaves (chave, id)
+    são mantidas em uma lista ordenada, e consultas por intervalo são
+    resolvidas com bisect em O(log n + k).
+    """
+    
+    def __init__(self, chave):
+        self.chave = chave
+        self.ordem = []
+        self.registros = {}
+        # Chave indexada de cada registro, necessária para localizá-lo na
+        # lista mesmo quando o dicionário foi alterado in-place
+        self.chaves = {}
+    
+    def adicionar(self, item):
+        """Indexa um registro pela chave calculada"""
+        valor = self.chave(item)
+        if valor is None:
+            return
+        
+        entrada = (valor, item['id'])
+        if not self.ordem or entrada > self.ordem[-1]:
+            self.ordem.append(entrada)
+        else:
+            insort(self.ordem, entrada)
+        self.registros[item['id']] = item
+        self.chaves[item['id']] = valor
+    
+    def remover(self, item_id):
+        """Remove um registro do índice"""
+        if item_id not in self.chaves:
+            return
+        
+        entrada = (self.chaves.pop(item_id), item_id)
+        del self.ordem[bisect_left(self.ordem, entrada)]
+        del self.registros[item_id]
+    
+    def atualizar(self, item):
+        """Reposiciona um registro cuja chave pode ter mudado"""
+        if item['id'] in self.chaves and self.chaves[item['id']] == self.chave(item):
+            return
+        
+        self.remover(item['id'])
+        self.adicionar(item)
+    
+    def intervalo(self, minimo=None, maximo=None):
+        """Retorna, em ordem de chave, os registros com minimo <= chave <= maximo"""
+        inicio = 0 if minimo is None else bisect_left(self.ordem, (minimo,))
+        fim = len(self.ordem)
+        if maximo is not None:
+            # (maximo, infinito) fica após qualquer (maximo, id)
+            fim = bisect_left(self.ordem, (maximo, float('inf')), inicio)
+        return [self.registros[item_id] for valor, item_id in self.ordem[inicio:fim]]
+    
+    def primeiro_acima(self, valor):
+        """Menor chave estritamente maior que o valor, ou None"""
+        posicao = bisect_left(self.ordem, (valor, float('inf')))
+        return self.ordem[posicao][0] if posicao < len(self.ordem) else None
+
+class IndiceTexto:
+    """Índice invertido de trigramas para busca textual sem acentos.
+    
+    Os textos dos campos são normalizados uma vez, na escrita. Uma busca
+    intersecta os conjuntos de IDs dos trigramas do termo (do menor para o
+    maior) e só confirma e pontua os candidatos restantes; termos com menos
+    de três caracteres percorrem os textos já normalizados.
+    """
+    
+    def __init__(self, campos):
+        self.campos = campos
+        self.trigramas = {}
+        self.textos = {}
+        self.registros = {}
+    
+    def _trigramas(self, texto):
+        """Conjunto de trigramas de um texto normalizado"""
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+    
+    def _textos(self, item):
+        """Textos normalizados dos campos indexados de um registro"""
+        return tuple(normalizar_texto(item.get(campo) or "") for campo in self.campos)
+    
+    def adicionar(self, item):
+        """Indexa os textos de um registro"""
+        textos = self._textos(item)
+        self.textos[item['id']] = textos
+        self.registros[item['id']] = item
+        for trigrama in set().union(*(self._trigramas(texto) for texto in textos)):
+            self.trigramas.setdefault(trigrama, set()).add(item['id'])
+    
+    def remover(self, item_id):
+        """Remove um registro do índice"""
+        textos = self.textos.pop(item_id, None)
+        if textos is None:
+            return
+        
+        del self.registros[item_id]
+        for trigrama in set().union(*(self._trigramas(texto) for texto in textos)):
+            ids = self.trigramas[trigrama]
+            ids.discard(item_id)
+            if not ids:
+                del self.trigramas[trigrama]
+    
+    def atualizar(self, item):
+        """Reindexa um registro cujos textos podem ter mudado"""
+        if self.textos.get(item['id']) == self._textos(item):
+            return
+        
+        self.remover(item['id'])
+        self.adicionar(item)
+    
+    def buscar(self, termo, limite=None):
+        """Registros que contêm o termo, do mais ao menos relevante"""
+        termo = normalizar_texto(termo).strip()
+        if not termo:
+            return []
+        
+        trigramas = self._trigramas(termo)
+        if trigramas:
+            conjuntos = sorted((self.trigramas.get(t, set()) for t in trigramas), key=len)
+            candidatos = conjuntos[0].intersection(*conjuntos[1:])
+        else:
+            candidatos = self.textos.keys()
+        
+        resultados = []
+        for item_id in candidatos:
+            pontos = pontuar(termo, self.textos[item_id])
+            if pontos is not None:
+                resultados.append((pontos, item_id))
+        
+        ordenados = heapq.nsmallest(limite, resultados) if limite else sorted(resultados)
+        return [self.registros[item_id] for pontos, item_id in ordenados]
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modo Servidor (Banco Compartilhado) - Sistema IGO
+"""
+
+import copy
+import json
+import os
+import socket
+import socketserver
+import threading
+from contextlib import ExitStack, contextmanager
+from models.database import ConflitoVersaoError, RegistroDuplicadoError
+
+# Métodos do banco que os terminais podem chamar remotamente
+METODOS_REMOTOS = (
+    "add_item", "update_item", "delete_item", "get_item", "get_items",
+    "get_pagina", "get_itens_apos", "get_itens_antes", "buscar_texto", "buscar_unico",
+    "get_produtos_baixo_estoque", "get_produtos_vencendo", "colecoes", "compactar"
+)
+
+# Eventos acumulados por terminal antes de serem trocados por um "recarregar"
+LIMITE_EVENTOS = 10000
+
+def _enviar(arquivo, mensagem):
+    """Grava uma mensagem JSON terminada em nova linha"""
+    arquivo.write(json.dumps(mensagem, ensure_ascii=False, default=str).encode('utf-8') + b"\n")
+    arquivo.flush()
+
+def _descrever_erro(erro):
+    """Converte uma exceção em resposta de erro do protocolo"""
+    resposta = {"ok": False, "erro": type(erro).__name__, "mensagem": str(erro)}
+    if isinstance(erro, RegistroDuplicadoError):
+        resposta["detalhes"] = [erro.collection, erro.campo, erro.valor]
+    elif isinstance(erro, ConflitoVersaoError):
+        resposta["detalhes"] = [erro.collection, erro.item_id, erro.esperada, erro.atual]
+    return resposta
+
+def _recriar_erro(resposta):
+    """Reconstrói no terminal a exceção levantada no servidor"""
+    if resposta["erro"] == "RegistroDuplicadoError":
+        return RegistroDuplicadoError(*resposta["detalhes"])
+    if resposta["erro"] == "ConflitoVersaoError":
+        return ConflitoVersaoError(*resposta["detalhes"])
+    tipo = {"ValueError": ValueError, "KeyError": KeyError, "TypeError": TypeError}.get(resposta["erro"], RuntimeError)
+    return tipo(resposta["mensagem"])
+
+class _Conexao(socketserver.StreamRequestHandler):
+    """Atende um terminal: uma requisição JSON por linha, respondida em ordem"""
+    
+    def setup(self):
+        super().setup()
+        self.transacao = None
+        self.adiamento = None
+        self.eventos = None
+    
+    def handle(self):
+        servidor = self.server.banco
+        try:
+            for linha in self.rfile:
+                try:
+                    requisicao = json.loads(linha)
+                    resultado = servidor.executar(self, requisicao["metodo"], requisicao.get("args", []),
+                                                  requisicao.get("kwargs", {}))
+                    resposta = {"ok": True, "resultado": resultado}
+                except Exception as e:
+                    resposta = _descrever_erro(e)
+                _enviar(self.wfile, resposta)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            servidor.desconectar(self)
+
+class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class ServidorBanco:
+    """Processo único dono dos dados, atendendo vários terminais por um socket Unix.
+    
+    Todas as operações passam por uma única trava (um escritor por vez), sobre
+    o banco e os índices em memória deste processo. Uma transação aberta por
+    um terminal mantém a trava até o commit ou rollback, de modo que
+    operações compostas (aprovar pedido, atualizar estoque) são atômicas
+    também entre terminais. As mutações são enfileiradas para os terminais
+    inscritos e entregues em ClienteBanco.sincronizar().
+    """
+    
+    def __init__(self, database, caminho_socket="igo.sock"):
+        self.db = database
+        self.caminho_socket = caminho_socket
+        self._trava = threading.RLock()
+        self._inscritos = []
+        self._servidor = None
+        database.inscrever(self._ao_mudar)
+    
+    def _ao_mudar(self, evento, collection, item):
+        """Enfileira a mutação para cada terminal inscrito (chamado sob a trava)"""
+        if not self._inscritos:
+            return
+        
+        item = copy.deepcopy(item)
+        for conexao in self._inscritos:
+            if len(conexao.eventos) >= LIMITE_EVENTOS:
+                conexao.eventos = [("recarregar", None, None)]
+            else:
+                conexao.eventos.append((evento, collection, item))
+    
+    def executar(self, conexao, metodo, args, kwargs):
+        """Executa uma requisição de um terminal"""
+        if metodo == "iniciar_transacao":
+            if conexao.transacao is not None:
+                raise RuntimeError("Transação já iniciada")
+            self._trava.acquire()
+            conexao.transacao = ExitStack()
+            conexao.transacao.enter_context(self.db.transaction())
+            return None
+        if metodo in ("confirmar_transacao", "desfazer_transacao"):
+            self._encerrar_transacao(conexao, metodo == "confirmar_transacao")
+            return None
+        
+        with self._trava:
+            if metodo == "inscrever":
+                if conexao.eventos is None:
+                    conexao.eventos = []
+                    self._inscritos.append(conexao)
+                return None
+            if metodo == "eventos":
+                if conexao.eventos is None:
+                    return []
+                eventos, conexao.eventos = conexao.eventos, []
+                return eventos
+            if metodo == "adiar_compactacao":
+                if conexao.adiamento is None:
+                    conexao.adiamento = ExitStack()
+                    conexao.adiamento.enter_context(self.db.compactacao_adiada())
+                return None
+            if metodo == "retomar_compactacao":
+                self._retomar_compactacao(conexao)
+                return None
+            if metodo not in METODOS_REMOTOS:
+                raise ValueError(f"Operação não permitida: {metodo}")
+            return getattr(self.db, metodo)(*args, **kwargs)
+    
+    def _encerrar_transacao(self, conexao, confirmar):
+        """Confirma ou desfaz a transação do terminal e libera a trava"""
+        if conexao.transacao is None:
+            raise RuntimeError("Nenhuma transação iniciada")
+        transacao, conexao.transacao = conexao.transacao, None
+        try:
+            if confirmar:
+                transacao.close()
+            else:
+                erro = RuntimeError("Transação desfeita pelo terminal")
+                transacao.__exit__(type(erro), erro, None)
+        finally:
+            self._trava.release()
+    
+    def _retomar_compactacao(self, conexao):
+        """Encerra o adiamento da compactação pedido pelo terminal (chamado sob a trava)"""
+        if conexao.adiamento is not None:
+            adiamento, conexao.adiamento = conexao.adiamento, None
+            adiamento.close()
+    
+    def desconectar(self, conexao):
+        """Desfaz a transação pendente de um terminal que se desconectou"""
+        if conexao.transacao is not None:
+            self._encerrar_transacao(conexao, False)
+        with self._trava:
+            self._retomar_compactacao(conexao)
+            if conexao in self._inscritos:
+                self._inscritos.remove(conexao)
+    
+    def iniciar(self):
+        """Atende os terminais até parar() (ou Ctrl+C)"""
+        if os.path.exists(self.caminho_socket):
+            os.remove(self.caminho_socket)
+        self._servidor = _ServidorUnix(self.caminho_socket, _Conexao)
+        self._servidor.banco = self
+        try:
+            self._servidor.serve_forever()
+        finally:
+            self._servidor.server_close()
+            if os.path.exists(self.caminho_socket):
+                os.remove(self.caminho_socket)
+    
+    def parar(self):
+        """Interrompe o atendimento (chamado de outra thread)"""
+        if self._servidor is not None:
+            self._servidor.shutdown()
+
+class ClienteBanco:
+    """Terminal leve: mesma interface da classe Database, executada no servidor.
+    
+    Os registros retornados são cópias; alterações devem passar por
+    update_item, como no banco local. Os inscritos recebem as mutações de
+    todos os terminais (inclusive as próprias) a cada sincronizar(), chamado
+    automaticamente após as operações de escrita deste terminal.
+    """
+    
+    def __init__(self, caminho_socket="igo.sock"):
+        self.caminho_socket = caminho_socket
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(caminho_socket)
+        self._arquivo = self._socket.makefile('rwb')
+        self._em_transacao = False
+        self._adiamentos = 0
+        self._inscritos = []
+    
+    def _chamar(self, metodo, *args, **kwargs):
+        """Envia uma requisição e aguarda a resposta"""
+        _enviar(self._arquivo, {"metodo": metodo, "args": args, "kwargs": kwargs})
+        linha = self._arquivo.readline()
+        if not linha:
+            raise ConnectionError("Conexão com o servidor encerrada")
+        resposta = json.loads(linha)
+        if not resposta["ok"]:
+            raise _recriar_erro(resposta)
+        return resposta["resultado"]
+    
+    def fechar(self):
+        """Encerra a conexão com o servidor"""
+        if self._socket is not None:
+            self._arquivo.close()
+            self._socket.close()
+            self._socket = None
+    
+    @contextmanager
+    def _transacao_remota(self):
+        """Transação no servidor, que bloqueia as escritas dos demais terminais"""
+        if self._em_transacao:
+            yield
+            return
+        
+        self._chamar("iniciar_transacao")
+        self._em_transacao = True
+        try:
+            yield
+        except BaseException:
+            self._em_transacao = False
+            self._chamar("desfazer_transacao")
+            raise
+        self._em_transacao = False
+        self._chamar("confirmar_transacao")
+    
+    @contextmanager
+    def transaction(self):
+        """Agrupa várias operações em uma transação atômica no servidor"""
+        externa = not self._em_transacao
+        with self._transacao_remota():
+            yield self
+        if externa:
+            self.sincronizar()
+    
+    @contextmanager
+    def compactacao_adiada(self):
+        """Adia a compactação automática do servidor até o fim do bloco (ver Database.compactacao_adiada)"""
+        if not self._adiamentos:
+            self._chamar("adiar_compactacao")
+        self._adiamentos += 1
+        try:
+            yield self
+        finally:
+            self._adiamentos -= 1
+            if not self._adiamentos:
+                self._chamar("retomar_compactacao")
+    
+    def inscrever(self, callback):
+        """Registra callback(evento, collection, item) para as mutações de todos os terminais.
+        
+        O callback recebe as mutações ocorridas a partir da inscrição; quem
+        mantém um estado derivado lê os dados iniciais depois de se inscrever
+        (sem bloquear o servidor) e deve tolerar eventos já incluídos nessa
+        leitura (ver AgregadosRelatorio).
+        """
+        if self._inscritos:
+            self.sincronizar()
+        else:
+            self._chamar("inscrever")
+        self._inscritos.append(callback)
+    
+    def cancelar_inscricao(self, callback):
+        """Remove um callback registrado com inscrever()"""
+        if callback in self._inscritos:
+            self._inscritos.remove(callback)
+    
+    def sincronizar(self):
+        """Entrega aos inscritos as mutações ocorridas desde a última sincronização"""
+        if not self._inscritos:
+            return
+        
+        # Fora de transação remota: os inscritos podem reler dados do servidor
+        # (num "recarregar") sem bloquear as escritas dos demais terminais
+        eventos = self._chamar("eventos")
+        # "recarregar" reconstrói tudo a partir do estado atual, que já
+        # inclui os demais eventos do lote
+        if any(evento == "recarregar" for evento, collection, item in eventos):
+            eventos = [("recarregar", None, None)]
+        for evento, collection, item in eventos:
+            for callback in list(self._inscritos):
+                callback(evento, collection, item)
+    
+    def _escrever(self, metodo, *args):
+        """Executa uma escrita e, fora de transação, sincroniza os inscritos"""
+        resultado = self._chamar(metodo, *args)
+        if not self._em_transacao:
+            self.sincronizar()
+        return resultado
+    
+    def add_item(self, collection, item):
+        """Adiciona item a uma coleção (o dicionário recebe o registro gravado: id e versão)"""
+        item.update(self._escrever("add_item", collection, item))
+        return item
+    
+    def update_item(self, collection, item_id, updates, versao=None):
+        """Atualiza item de uma coleção (com versao, apenas se o registro ainda estiver nela).
+        
+        A comparação da versão e a alteração são feitas pelo servidor em uma
+        única chamada, sob a trava que serializa todas as conexões.
+        """
+        return self._escrever("update_item", collection, item_id, updates, versao)
+    
+    def delete_item(self, collection, item_id):
+        """Remove item de uma coleção"""
+        return self._escrever("delete_item", collection, item_id)
+    
+    def get_item(self, collection, item_id):
+        """Busca item por ID"""
+        return self._chamar("get_item", collection, item_id)
+    
+    def get_items(self, collection, filters=None):
+        """Busca itens de uma coleção com filtros opcionais"""
+        return self._chamar("get_items", collection, filters)
+    
+    def get_pagina(self, collection, offset=0, limite=20, filters=None):
+        """Página de registros em ordem de ID, por deslocamento: retorna (itens, total)"""
+        itens, total = self._chamar("get_pagina", collection, offset, limite, filters)
+        return itens, total
+    
+    def get_itens_apos(self, collection, apos_id=0, limite=20, filters=None):
+        """Paginação por chave: até `limite` registros com ID maior que apos_id"""
+        return self._chamar("get_itens_apos", collection, apos_id, limite, filters)
+    
+    def get_itens_antes(self, collection, antes_id, limite=20, filters=None):
+        """Paginação por chave: os `limite` registros imediatamente anteriores a antes_id"""
+        return self._chamar("get_itens_antes", collection, antes_id, limite, filters)
+    
+    def iterar_itens(self, collection, lote=500):
+        """Percorre uma coleção em lotes, sem transferi-la de uma vez"""
+        ultimo_id = 0
+        while True:
+            itens = self.get_itens_apos(collection, ultimo_id, lote)
+            yield from itens
+            if len(itens) < lote:
+                return
+            ultimo_id = itens[-1]['id']
+    
+    def buscar_texto(self, collection, termo, limite=None):
+        """Busca por substring/prefixo, sem acentos (ver Database.buscar_texto)"""
+        return self._chamar("buscar_texto", collection, termo, limite)
+    
+    def buscar_unico(self, collection, campo, valor):
+        """Busca o registro com o valor informado em um campo único (ou None)"""
+        return self._chamar("buscar_unico", collection, campo, valor)
+    
+    def get_produtos_baixo_estoque(self, limite=None):
+        """Retorna produtos com estoque baixo"""
+        return self._chamar("get_produtos_baixo_estoque", limite)
+    
+    def get_produtos_vencendo(self, dias=30):
+        """Retorna produtos próximos do vencimento (apenas alimentos)"""
+        return self._chamar("get_produtos_vencendo", dias)
+    
+    def colecoes(self):
+        """Nomes de todas as coleções"""
+        return self._chamar("colecoes")
+    
+    def compactar(self):
+        """Consolida o journal do servidor em um novo snapshot"""
+        self._chamar("compactar")
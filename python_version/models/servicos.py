@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serviços (Regras de Negócio) - Sistema IGO
+"""
+
+from datetime import datetime
+from models.database import versao_atual
+from models.validacao import VALIDADORES
+
+# Operações sem entrada/saída de terminal: recebem valores já convertidos,
+# retornam os registros gravados e sinalizam falhas com exceções (todas
+# subclasses de ValueError, com a mensagem exibida pelos menus). São usadas
+# pelos menus, pela API HTTP, pela importação e pelo executor em lote. As
+# alterações que dependem do valor lido (estoque, status do pedido) são
+# condicionadas à versão lida: um escritor concorrente resulta em
+# ConflitoVersaoError, nunca em uma atualização perdida.
+
+class RegistroNaoEncontradoError(ValueError):
+    """Registro inexistente"""
+    
+    def __init__(self, collection, item_id, descricao):
+        super().__init__(f"{descricao} não encontrado!")
+        self.collection = collection
+        self.item_id = item_id
+
+class EstoqueInsuficienteError(ValueError):
+    """Quantidade solicitada maior que a disponível"""
+    
+    def __init__(self, produto, solicitado):
+        super().__init__(f"Quantidade insuficiente em estoque: {produto['nome']} "
+                         f"(disponível: {produto['quantidade']}, solicitado: {solicitado})")
+        self.produto = produto
+        self.solicitado = solicitado
+
+class PedidoNaoPendenteError(ValueError):
+    """Aprovação ou rejeição de pedido que não está mais pendente"""
+    
+    def __init__(self, pedido):
+        super().__init__(f"Pedido #{pedido['id']} já está {pedido['status']}!")
+        self.pedido = pedido
+
+def _agora():
+    """Data/hora no formato do banco"""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def _quantidade(valor, rotulo="Quantidade"):
+    """Converte uma quantidade, que deve ser um inteiro maior que zero"""
+    try:
+        quantidade = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"{rotulo} deve ser um número!")
+    if quantidade <= 0:
+        raise ValueError(f"{rotulo} deve ser maior que zero!")
+    return quantidade
+
+class ServicoBase:
+    """Acesso ao banco comum aos serviços"""
+    
+    def __init__(self, database):
+        self.db = database
+    
+    def _obter(self, collection, item_id, descricao):
+        """Busca um registro ou levanta RegistroNaoEncontradoError"""
+        item = self.db.get_item(collection, item_id)
+        if not item:
+            raise RegistroNaoEncontradoError(collection, item_id, descricao)
+        return item
+
+class ServicoEstoque(ServicoBase):
+    """Entradas e saídas de estoque, sempre acompanhadas da movimentação"""
+    
+    def registrar_movimentacao(self, tipo, produto_id, quantidade, descricao):
+        """Registra uma movimentação de estoque; retorna a movimentação"""
+        return self.db.add_item("movimentacoes", {
+            "tipo": tipo,
+            "produto_id": produto_id,
+            "quantidade": quantidade,
+            "descricao": descricao,
+            "data_hora": _agora()
+        })
+    
+    def movimentar(self, produto_id, tipo, quantidade):
+        """Entrada ("entrada") ou saída ("saida") de estoque; retorna o produto atualizado.
+        
+        Levanta RegistroNaoEncontradoError, EstoqueInsuficienteError ou
+        ValueError (tipo ou quantidade inválidos).
+        """
+        if tipo not in ("entrada", "saida"):
+            raise ValueError("Tipo inválido!")
+        quantidade = _quantidade(quantidade)
+        
+        with self.db.transaction():
+            produto = self._obter("produtos", produto_id, "Produto")
+            if tipo == "entrada":
+                nova_quantidade = produto['quantidade'] + quantidade
+                descricao = f"Entrada de {quantidade} unidades"
+            else:
+                if produto['quantidade'] < quantidade:
+                    raise EstoqueInsuficienteError(produto, quantidade)
+                nova_quantidade = produto['quantidade'] - quantidade
+                descricao = f"Saída de {quantidade} unidades"
+            
+            produto = self.db.update_item("produtos", produto_id, {"quantidade": nova_quantidade},
+                                          versao_atual(produto))
+            self.registrar_movimentacao(tipo, produto_id, quantidade, descricao)
+        return produto
+
+class ServicoCadastros(ServicoBase):
+    """Cadastro de produtos, clientes, fornecedores e funcionários"""
+    
+    def __init__(self, database):
+        super().__init__(database)
+        self.estoque = ServicoEstoque(database)
+    
+    def cadastrar(self, collection, dados, descricao="Cadastro inicial"):
+        """Valida (models.validacao) e inclui um cadastro; retorna o registro gravado.
+        
+        Produtos recebem a movimentação de entrada da quantidade inicial na
+        mesma transação. Levanta ValueError (inclusive RegistroDuplicadoError
+        para CPF/CNPJ já cadastrado).
+        """
+        if collection not in VALIDADORES:
+            raise ValueError(f"Cadastro não suportado para: {collection}")
+        registro = VALIDADORES[collection](dados)
+        
+        with self.db.transaction():
+            novo = self.db.add_item(collection, registro)
+            if collection == "produtos":
+                self.estoque.registrar_movimentacao("entrada", novo['id'], novo['quantidade'], descricao)
+        return novo
+
+class ServicoPedidos(ServicoBase):
+    """Criação, aprovação e rejeição de pedidos"""
+    
+    def criar(self, cliente_id, itens, observacoes=""):
+        """Cria um pedido pendente; itens é uma lista de (produto_id, quantidade).
+        
+        Levanta RegistroNaoEncontradoError (cliente ou produto),
+        EstoqueInsuficienteError (somando itens repetidos do mesmo produto)
+        ou ValueError (pedido sem itens, quantidade inválida).
+        """
+        cliente = self._obter("clientes", cliente_id, "Cliente")
+        if not itens:
+            raise ValueError("Pedido sem itens!")
+        
+        itens_pedido = []
+        solicitados = {}
+        total = 0.0
+        for produto_id, quantidade in itens:
+            produto = self._obter("produtos", produto_id, "Produto")
+            quantidade = _quantidade(quantidade)
+            solicitados[produto['id']] = solicitados.get(produto['id'], 0) + quantidade
+            if solicitados[produto['id']] > produto['quantidade']:
+                raise EstoqueInsuficienteError(produto, solicitados[produto['id']])
+            
+            preco_unitario = produto.get('preco', 0)
+            subtotal = preco_unitario * quantidade
+            total += subtotal
+            itens_pedido.append({
+                "produto_id": produto['id'],
+                "nome_produto": produto['nome'],
+                "quantidade": quantidade,
+                "preco_unitario": preco_unitario,
+                "subtotal": subtotal
+            })
+        
+        return self.db.add_item("pedidos", {
+            "cliente_id": cliente['id'],
+            "cliente_nome": cliente['nome'],
+            "itens": itens_pedido,
+            "total": total,
+            "status": "pendente",
+            "data_pedido": _agora(),
+            "data_aprovacao": None,
+            "observacoes": observacoes
+        })
+    
+    def _pendente(self, pedido_id):
+        """Busca um pedido que ainda aguarda aprovação"""
+        pedido = self._obter("pedidos", pedido_id, "Pedido")
+        if pedido['status'] != "pendente":
+            raise PedidoNaoPendenteError(pedido)
+        return pedido
+    
+    def aprovar(self, pedido_id):
+        """Aprova um pedido pendente e baixa o estoque (uma transação); retorna o pedido"""
+        with self.db.transaction():
+            pedido = self._pendente(pedido_id)
+            pedido = self.db.update_item("pedidos", pedido_id, {
+                "status": "aprovado",
+                "data_aprovacao": _agora()
+            }, versao_atual(pedido))
+            for item in pedido['itens']:
+                produto = self.db.get_item("produtos", item['produto_id'])
+                if produto:
+                    nova_quantidade = produto['quantidade'] - item['quantidade']
+                    self.db.update_item("produtos", produto['id'], {"quantidade": nova_quantidade},
+                                        versao_atual(produto))
+        return pedido
+    
+    def rejeitar(self, pedido_id, motivo=""):
+        """Rejeita um pedido pendente; retorna o pedido"""
+        with self.db.transaction():
+            pedido = self._pendente(pedido_id)
+            return self.db.update_item("pedidos", pedido_id, {
+                "status": "rejeitado",
+                "observacoes": f"Rejeitado: {motivo}"
+            }, versao_atual(pedido))
+
+class Servicos:
+    """Todos os serviços sobre um banco, com execução por nome de operação"""
+    
+    # Operação -> (serviço, método), para execução em lote
+    OPERACOES = {
+        "cadastrar": ("cadastros", "cadastrar"),
+        "movimentar_estoque": ("estoque", "movimentar"),
+        "criar_pedido": ("pedidos", "criar"),
+        "aprovar_pedido": ("pedidos", "aprovar"),
+        "rejeitar_pedido": ("pedidos", "rejeitar")
+    }
+    
+    def __init__(self, database):
+        self.cadastros = ServicoCadastros(database)
+        self.estoque = self.cadastros.estoque
+        self.pedidos = ServicoPedidos(database)
+    
+    def executar(self, operacao, parametros):
+        """Executa uma operação pelo nome, com os parâmetros nomeados do método"""
+        if operacao not in self.OPERACOES:
+            raise ValueError(f"Operação inexistente: {operacao}")
+        servico, metodo = self.OPERACOES[operacao]
+        return getattr(getattr(self, servico), metodo)(**parametros)
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Banco de Dados SQLite - Sistema IGO
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from models.database import (PONTO_REPOSICAO_PADRAO, ConflitoVersaoError, Database, RegistroDuplicadoError,
+                             alterados, chave_reposicao, estrutura_inicial, versao_atual)
+from models.indices import normalizar_texto, pontuar
+
+class SQLiteDatabase:
+    """Backend SQLite com a mesma interface da classe Database.
+    
+    Cada coleção é uma tabela (id, dados JSON). Os filtros de get_items e as
+    consultas de estoque baixo e vencimento são resolvidos em SQL, apoiados
+    por índices sobre expressões json_extract, de modo que a inicialização
+    não precisa carregar o banco inteiro em memória. A busca textual usa
+    uma tabela FTS5 (tokenizador trigram) por coleção de INDICES_TEXTO,
+    com os textos já normalizados.
+    """
+    
+    # Campos consultados com frequência, além dos índices secundários padrão
+    INDICES_SQL = {
+        "produtos": ["quantidade", "validade"],
+        "movimentacoes": ["data_hora"]
+    }
+    
+    # Quantidade acima do ponto de reposição, em SQL (ver chave_reposicao)
+    EXPRESSAO_REPOSICAO = (
+        "json_extract(dados, '$.quantidade') - "
+        f"coalesce(json_extract(dados, '$.ponto_reposicao'), {PONTO_REPOSICAO_PADRAO})"
+    )
+    
+    def __init__(self, data_file="igo_data.db", json_file="igo_data.json"):
+        self.data_file = data_file
+        novo = not os.path.exists(data_file)
+        
+        # Sem verificação de thread: a conexão pode ser compartilhada entre
+        # threads, e as transações são serializadas por self.bloqueio
+        self.conn = sqlite3.connect(data_file, isolation_level=None, check_same_thread=False)
+        self.bloqueio = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._em_transacao = False
+        self._inscritos = []
+        self._notificacoes_pendentes = []
+        
+        self._tabelas = list(estrutura_inicial().keys())
+        for collection in self._tabelas:
+            self._criar_tabela(collection)
+        
+        for collection, campos in Database.INDICES_PADRAO.items():
+            for campo in campos:
+                self.criar_indice(collection, campo)
+        for indices in (self.INDICES_SQL, Database.INDICES_UNICOS):
+            for collection, campos in indices.items():
+                for campo in campos:
+                    self.criar_indice(collection, campo)
+        self.conn.execute(
+            f'CREATE INDEX IF NOT EXISTS "idx_produtos_reposicao" ON "produtos" ({self.EXPRESSAO_REPOSICAO})'
+        )
+        
+        if novo:
+            self._popular(json_file)
+        for collection in Database.INDICES_TEXTO:
+            self._criar_indice_texto(collection)
+        
+        # Muda sempre que outra conexão confirma uma transação (ver sincronizar)
+        self._versao_dados = self.conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _popular(self, json_file):
+        """Importa o banco JSON existente, ou a estrutura inicial, para o SQLite"""
+        if json_file and os.path.exists(json_file):
+            origem = Database(json_file)
+            data = origem.data
+            origem.fechar()
+        else:
+            data = estrutura_inicial()
+        
+        with self.transaction():
+            for collection, itens in data.items():
+                self._criar_tabela(collection)
+                for item in itens:
+                    dados = {k: v for k, v in item.items() if k != 'id'}
+                    self.conn.execute(
+                        f'INSERT INTO "{collection}" (id, dados) VALUES (?, ?)',
+                        (item['id'], self._serializar(dados))
+                    )
+    
+    def _criar_tabela(self, collection):
+        """Cria a tabela de uma coleção, se ainda não existir"""
+        self._validar_nome(collection)
+        if collection not in self._tabelas:
+            self._tabelas.append(collection)
+        
+        # AUTOINCREMENT garante que IDs excluídos nunca sejam reutilizados
+        self.conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{collection}" '
+            '(id INTEGER PRIMARY KEY AUTOINCREMENT, dados TEXT NOT NULL)'
+        )
+    
+    def colecoes(self):
+        """Nomes de todas as coleções"""
+        return sorted(self._tabelas)
+    
+    def inscrever(self, callback):
+        """Registra callback(evento, collection, item) chamado a cada mutação.
+        
+        Dentro de uma transação as notificações só são entregues no commit
+        e são descartadas no rollback.
+        """
+        self._inscritos.append(callback)
+    
+    def cancelar_inscricao(self, callback):
+        """Remove um callback registrado com inscrever()"""
+        if callback in self._inscritos:
+            self._inscritos.remove(callback)
+    
+    def sincronizar(self):
+        """Entrega aos inscritos mutações feitas por outros processos.
+        
+        Outras conexões ao mesmo arquivo não geram eventos individuais:
+        quando PRAGMA data_version indica um commit externo, os inscritos
+        recebem "recarregar".
+        """
+        versao = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if versao != self._versao_dados:
+            self._versao_dados = versao
+            self._notificar("recarregar", None, None)
+    
+    def _notificar(self, evento, collection, item):
+        """Repassa uma mutação aos inscritos (ou a adia até o commit)"""
+        if self._em_transacao:
+            self._notificacoes_pendentes.append((evento, collection, item))
+            return
+        for callback in self._inscritos:
+            callback(evento, collection, item)
+    
+    def _validar_nome(self, nome):
+        """Impede nomes de coleção/campo que não sejam identificadores simples"""
+        if not nome.isidentifier():
+            raise ValueError(f"Nome inválido: {nome}")
+    
+    def _serializar(self, dados):
+        """Converte os campos de um registro (sem o ID) em JSON"""
+        return json.dumps(dados, ensure_ascii=False, default=str)
+    
+    def _desserializar(self, linha):
+        """Reconstrói um registro a partir de uma linha (id, dados)"""
+        item = json.loads(linha[1])
+        item['id'] = linha[0]
+        return item
+    
+    def _criar_indice_texto(self, collection):
+        """Cria (e preenche, em bancos anteriores a ela) a tabela FTS5 de uma coleção"""
+        tabela = f"{collection}_texto"
+        existe = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)
+        ).fetchone()
+        if existe:
+            return
+        
+        campos = ", ".join(Database.INDICES_TEXTO[collection])
+        with self.transaction():
+            self.conn.execute(f'CREATE VIRTUAL TABLE "{tabela}" USING fts5({campos}, tokenize = \'trigram\')')
+            for item in self.iterar_itens(collection):
+                self._indexar_texto(collection, item, novo=True)
+    
+    def _indexar_texto(self, collection, item, novo=False):
+        """Grava os textos normalizados de um registro na tabela FTS5 da coleção"""
+        campos = Database.INDICES_TEXTO.get(collection)
+        if not campos:
+            return
+        
+        tabela = f"{collection}_texto"
+        if not novo:
+            self.conn.execute(f'DELETE FROM "{tabela}" WHERE rowid = ?', (item['id'],))
+        textos = [normalizar_texto(item.get(campo) or "") for campo in campos]
+        self.conn.execute(
+            f'INSERT INTO "{tabela}" (rowid, {", ".join(campos)}) VALUES (?{", ?" * len(campos)})',
+            (item['id'], *textos)
+        )
+    
+    def criar_indice(self, collection, campo):
+        """Cria um índice SQL sobre um campo do JSON dos registros"""
+        self._validar_nome(collection)
+        self._validar_nome(campo)
+        self.conn.execute(
+            f'CREATE INDEX IF NOT EXISTS "idx_{collection}_{campo}" '
+            f'ON "{collection}" (json_extract(dados, \'$.{campo}\'))'
+        )
+    
+    @contextmanager
+    def transaction(self):
+        """Agrupa várias mutações em uma única transação SQLite.
+        
+        BEGIN IMMEDIATE reserva a escrita contra outros processos; o bloqueio
+        faz o mesmo entre as threads que compartilham a conexão, de modo que
+        verificações e alterações de update_item ocorrem sem interrupção.
+        """
+        with self.bloqueio:
+            if self._em_transacao:
+                yield self
+                return
+            
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._em_transacao = True
+            try:
+                yield self
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                self._em_transacao = False
+                self._notificacoes_pendentes = []
+                raise
+            
+            self.conn.execute("COMMIT")
+            self._em_transacao = False
+            pendentes, self._notificacoes_pendentes = self._notificacoes_pendentes, []
+            for notificacao in pendentes:
+                self._notificar(*notificacao)
+    
+    @contextmanager
+    def compactacao_adiada(self):
+        """Sem efeito: o SQLite não reescreve o banco ao gravar (ver Database.compactacao_adiada)"""
+        yield self
+    
+    def compactar(self):
+        """Incorpora o WAL ao arquivo principal do banco"""
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    def fechar(self):
+        """Fecha a conexão (chamar ao encerrar o sistema)"""
+        if self.conn is not None:
+            self.compactar()
+            self.conn.close()
+            self.conn = None
+    
+    def _verificar_unicidade(self, collection, item, item_id=None):
+        """Rejeita valores já usados por outro registro nos campos únicos"""
+        for campo in Database.INDICES_UNICOS.get(collection, []):
+            valor = item.get(campo)
+            if valor is None or valor == "":
+                continue
+            linha = self.conn.execute(
+                f'SELECT id FROM "{collection}" WHERE json_extract(dados, \'$.{campo}\') = ? AND id IS NOT ?',
+                (valor, item_id)
+            ).fetchone()
+            if linha:
+                raise RegistroDuplicadoError(collection, campo, valor)
+    
+    def buscar_unico(self, collection, campo, valor):
+        """Busca o registro com o valor informado em um campo único (ou None)"""
+        self._validar_nome(campo)
+        linha = self.conn.execute(
+            f'SELECT id, dados FROM "{collection}" WHERE json_extract(dados, \'$.{campo}\') = ? ORDER BY id LIMIT 1',
+            (valor,)
+        ).fetchone()
+        return self._desserializar(linha) if linha else None
+    
+    def add_item(self, collection, item):
+        """Adiciona item a uma coleção"""
+        dados = {k: v for k, v in item.items() if k != 'id'}
+        with self.transaction():
+            self._verificar_unicidade(collection, dados)
+            dados['versao'] = item['versao'] = 1
+            cursor = self.conn.execute(
+                f'INSERT INTO "{collection}" (dados) VALUES (?)', (self._serializar(dados),)
+            )
+            item['id'] = cursor.lastrowid
+            self._indexar_texto(collection, item, novo=True)
+            self._notificar("add", collection, item)
+        return item
+    
+    def update_item(self, collection, item_id, updates, versao=None):
+        """Atualiza item de uma coleção, incrementando a versão (ver Database.update_item)"""
+        with self.transaction():
+            item = self.get_item(collection, item_id)
+            if item is None:
+                return None
+            
+            if versao is not None and versao_atual(item) != versao:
+                raise ConflitoVersaoError(collection, item_id, versao, versao_atual(item))
+            antes = chave_reposicao(item) if collection == "produtos" else None
+            self._verificar_unicidade(collection, alterados(item, updates), item_id)
+            item.update({**updates, 'versao': versao_atual(item) + 1})
+            dados = {k: v for k, v in item.items() if k != 'id'}
+            self.conn.execute(
+                f'UPDATE "{collection}" SET dados = ? WHERE id = ?', (self._serializar(dados), item_id)
+            )
+            self._indexar_texto(collection, item)
+            self._notificar("update", collection, item)
+            
+            if collection == "produtos" and (antes is None or antes > 0):
+                depois = chave_reposicao(item)
+                if depois is not None and depois <= 0:
+                    self._notificar("estoque_baixo", collection, item)
+        return item
+    
+    def delete_item(self, collection, item_id):
+        """Remove item de uma coleção"""
+        with self.transaction():
+            item = self.get_item(collection, item_id)
+            if item is not None:
+                self.conn.execute(f'DELETE FROM "{collection}" WHERE id = ?', (item_id,))
+                if collection in Database.INDICES_TEXTO:
+                    self.conn.execute(f'DELETE FROM "{collection}_texto" WHERE rowid = ?', (item_id,))
+                self._notificar("delete", collection, item)
+        return item
+    
+    def get_item(self, collection, item_id):
+        """Busca item por ID"""
+        linha = self.conn.execute(
+            f'SELECT id, dados FROM "{collection}" WHERE id = ?', (item_id,)
+        ).fetchone()
+        return self._desserializar(linha) if linha else None
+    
+    def get_items(self, collection, filters=None):
+        """Busca itens de uma coleção com filtros opcionais"""
+        return self._consultar(collection, *self._traduzir_filtros(filters))
+    
+    def _traduzir_filtros(self, filters):
+        """Converte filtros de igualdade em (condições SQL, parâmetros, filtros restantes)"""
+        condicoes = []
+        parametros = []
+        restantes = {}
+        
+        for key, value in (filters or {}).items():
+            if key == 'id' and isinstance(value, int):
+                condicoes.append("id = ?")
+                parametros.append(value)
+            elif not key.isidentifier() or isinstance(value, (dict, list)):
+                restantes[key] = value
+            elif value is None:
+                condicoes.append(f"json_type(dados, '$.{key}') = 'null'")
+            elif isinstance(value, bool):
+                condicoes.append(f"json_type(dados, '$.{key}') = ?")
+                parametros.append('true' if value else 'false')
+            else:
+                condicoes.append(f"json_extract(dados, '$.{key}') = ?")
+                parametros.append(value)
+        
+        return condicoes, parametros, restantes
+    
+    def _consultar(self, collection, condicoes, parametros, restantes=None, limite=None, offset=0,
+                   decrescente=False, ordem=None):
+        """Executa um SELECT na coleção e aplica em Python os filtros não traduzíveis.
+        
+        Com limite, a paginação (LIMIT/OFFSET) fica a cargo do SQLite, a
+        menos que haja filtros restantes; nesse caso é feita na leitura.
+        Os registros vêm em ordem de ID, ou pela expressão SQL `ordem`
+        desempatada pelo ID (como nos índices ordenados do Database).
+        """
+        sql = f'SELECT id, dados FROM "{collection}"'
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        ordem_id = "id DESC" if decrescente else "id"
+        sql += f" ORDER BY {ordem}, {ordem_id}" if ordem else f" ORDER BY {ordem_id}"
+        
+        ignorar = 0
+        if limite is not None and not restantes:
+            sql += " LIMIT ? OFFSET ?"
+            parametros = list(parametros) + [limite, offset]
+        else:
+            ignorar = offset
+        
+        items = []
+        for linha in self.conn.execute(sql, parametros):
+            item = self._desserializar(linha)
+            if restantes and any(key not in item or item[key] != value
+                                 for key, value in restantes.items()):
+                continue
+            if ignorar:
+                ignorar -= 1
+                continue
+            items.append(item)
+            if limite is not None and len(items) >= limite:
+                break
+        return items
+    
+    def _contar(self, collection, condicoes, parametros, restantes=None):
+        """Número de registros que atendem às condições"""
+        if restantes:
+            return len(self._consultar(collection, condicoes, parametros, restantes))
+        sql = f'SELECT COUNT(*) FROM "{collection}"'
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        return self.conn.execute(sql, parametros).fetchone()[0]
+    
+    def get_pagina(self, collection, offset=0, limite=20, filters=None):
+        """Página de registros em ordem de ID, por deslocamento: retorna (itens, total)"""
+        condicoes, parametros, restantes = self._traduzir_filtros(filters)
+        itens = self._consultar(collection, condicoes, parametros, restantes, limite, offset)
+        return itens, self._contar(collection, condicoes, parametros, restantes)
+    
+    def get_itens_apos(self, collection, apos_id=0, limite=20, filters=None):
+        """Paginação por chave: até `limite` registros com ID maior que apos_id"""
+        condicoes, parametros, restantes = self._traduzir_filtros(filters)
+        return self._consultar(collection, condicoes + ["id > ?"], parametros + [apos_id], restantes, limite)
+    
+    def get_itens_antes(self, collection, antes_id, limite=20, filters=None):
+        """Paginação por chave: os `limite` registros imediatamente anteriores a antes_id"""
+        condicoes, parametros, restantes = self._traduzir_filtros(filters)
+        itens = self._consultar(collection, condicoes + ["id < ?"], parametros + [antes_id], restantes, limite,
+                                decrescente=True)
+        return itens[::-1]
+    
+    def iterar_itens(self, collection):
+        """Percorre os registros de uma coleção sem materializar a lista"""
+        cursor = self.conn.execute(f'SELECT id, dados FROM "{collection}" ORDER BY id')
+        for linha in cursor:
+            yield self._desserializar(linha)
+    
+    def buscar_texto(self, collection, termo, limite=None):
+        """Busca por substring/prefixo, sem acentos, nos campos de Database.INDICES_TEXTO.
+        
+        Termos com três ou mais caracteres são resolvidos pelo índice FTS5
+        de trigramas; os mais curtos percorrem apenas os textos normalizados
+        da tabela FTS5. Os candidatos são ordenados pela mesma relevância do
+        backend em memória, e só os registros retornados são lidos.
+        """
+        if collection not in Database.INDICES_TEXTO:
+            raise ValueError(f"Coleção sem busca textual: {collection}")
+        termo = normalizar_texto(termo).strip()
+        if not termo:
+            return []
+        
+        campos = Database.INDICES_TEXTO[collection]
+        tabela = f"{collection}_texto"
+        if len(termo) >= 3:
+            # Entre aspas o termo é uma sequência literal de trigramas
+            linhas = self.conn.execute(
+                f'SELECT rowid, {", ".join(campos)} FROM "{tabela}" WHERE "{tabela}" MATCH ?',
+                ('"' + termo.replace('"', '""') + '"',)
+            )
+        else:
+            condicoes = " OR ".join(f"instr({campo}, ?) > 0" for campo in campos)
+            linhas = self.conn.execute(
+                f'SELECT rowid, {", ".join(campos)} FROM "{tabela}" WHERE {condicoes}', (termo,) * len(campos)
+            )
+        
+        resultados = []
+        for linha in linhas:
+            pontos = pontuar(termo, linha[1:])
+            if pontos is not None:
+                resultados.append((pontos, linha[0]))
+        resultados.sort()
+        
+        ids = [item_id for pontos, item_id in resultados[:limite]]
+        itens = {item['id']: item for item in self._consultar_ids(collection, ids)}
+        return [itens[item_id] for item_id in ids if item_id in itens]
+    
+    def _consultar_ids(self, collection, ids):
+        """Registros com os IDs informados (em lotes, pelo limite de parâmetros do SQLite)"""
+        for inicio in range(0, len(ids), 500):
+            lote = ids[inicio:inicio + 500]
+            cursor = self.conn.execute(
+                f'SELECT id, dados FROM "{collection}" WHERE id IN ({", ".join("?" * len(lote))})', lote
+            )
+            for linha in cursor:
+                yield self._desserializar(linha)
+    
+    def get_produtos_baixo_estoque(self, limite=None):
+        """Retorna produtos com estoque baixo, dos mais críticos aos menos (ver Database)"""
+        if limite is None:
+            return self._consultar("produtos", [f"{self.EXPRESSAO_REPOSICAO} <= 0"], [],
+                                   ordem=self.EXPRESSAO_REPOSICAO)
+        quantidade = "json_extract(dados, '$.quantidade')"
+        return self._consultar("produtos", [f"{quantidade} <= ?"], [limite], ordem=quantidade)
+    
+    def get_produtos_vencendo(self, dias=30):
+        """Retorna produtos próximos do vencimento (apenas alimentos), dos que vencem primeiro"""
+        limite = (datetime.now() + timedelta(days=dias)).strftime('%Y-%m-%d')
+        validade = "json_extract(dados, '$.validade')"
+        return self._consultar("produtos", [
+            "json_extract(dados, '$.categoria') = 'alimento'",
+            f"{validade} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'",
+            f"{validade} <= ?"
+        ], [limite], ordem=validade)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validação de Cadastros - Sistema IGO
+"""
+
+from datetime import datetime
+from models.database import PONTO_REPOSICAO_PADRAO
+
+# Regras dos formulários de cadastro, para registros que não passam pelos
+# prompts (importação em lote). Cada função recebe os campos brutos (CSV ou
+# JSON) e retorna o registro pronto para o banco, ou levanta ValueError com
+# a mesma mensagem exibida pelo formulário.
+
+def _texto(dados, campo):
+    """Valor textual de um campo, sem espaços nas pontas"""
+    valor = dados.get(campo)
+    return "" if valor is None else str(valor).strip()
+
+def _obrigatorio(dados, campo, mensagem):
+    """Valor textual de um campo que não pode estar vazio"""
+    valor = _texto(dados, campo)
+    if not valor:
+        raise ValueError(mensagem)
+    return valor
+
+def _numero(dados, campo, tipo, rotulo, negativo, padrao=None):
+    """Converte um campo numérico não negativo (aceita vírgula decimal)"""
+    valor = dados.get(campo)
+    if valor is None or valor == "":
+        if padrao is None:
+            raise ValueError(f"{rotulo} deve ser um número!")
+        return padrao
+    
+    try:
+        numero = tipo(str(valor).strip().replace(",", ".") if isinstance(valor, str) else valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"{rotulo} deve ser um número!")
+    if numero < 0:
+        raise ValueError(negativo)
+    return numero
+
+def _data(texto):
+    """Converte DD/MM/AAAA (ou AAAA-MM-DD) para AAAA-MM-DD"""
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(texto, formato).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError("Formato de data inválido! Use DD/MM/AAAA")
+
+def _agora():
+    """Data/hora de cadastro no formato do banco"""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def validar_produto(dados):
+    """Regras de ProdutoController.cadastrar_produto"""
+    nome = _obrigatorio(dados, "nome", "Nome não pode estar vazio!")
+    
+    categoria = _texto(dados, "categoria").lower()
+    categoria = {"1": "roupa", "2": "alimento"}.get(categoria, categoria)
+    if categoria not in ("roupa", "alimento"):
+        raise ValueError("Categoria inválida!")
+    
+    tamanho = ""
+    if categoria == "roupa":
+        tamanho = _obrigatorio(dados, "tamanho", "Tamanho não pode estar vazio!").upper()
+    
+    marca = _obrigatorio(dados, "marca", "Marca não pode estar vazia!")
+    
+    validade = ""
+    if categoria == "alimento":
+        validade = _data(_obrigatorio(dados, "validade", "Data de validade não pode estar vazia!"))
+    
+    return {
+        "nome": nome,
+        "categoria": categoria,
+        "tamanho": tamanho,
+        "marca": marca,
+        "validade": validade,
+        "quantidade": _numero(dados, "quantidade", int, "Quantidade", "Quantidade não pode ser negativa!"),
+        "ponto_reposicao": _numero(dados, "ponto_reposicao", int, "Ponto de reposição",
+                                   "Ponto de reposição não pode ser negativo!", PONTO_REPOSICAO_PADRAO),
+        "preco": _numero(dados, "preco", float, "Preço", "Preço não pode ser negativo!"),
+        "data_cadastro": _agora()
+    }
+
+def validar_cliente(dados):
+    """Regras de ClienteController.cadastrar_cliente"""
+    return {
+        "nome": _obrigatorio(dados, "nome", "Nome não pode estar vazio!"),
+        "cpf": _obrigatorio(dados, "cpf", "CPF não pode estar vazio!"),
+        "telefone": _texto(dados, "telefone"),
+        "email": _texto(dados, "email"),
+        "endereco": _texto(dados, "endereco"),
+        "data_cadastro": _agora()
+    }
+
+def validar_fornecedor(dados):
+    """Regras de FornecedorController.cadastrar_fornecedor"""
+    return {
+        "nome": _obrigatorio(dados, "nome", "Nome não pode estar vazio!"),
+        "cnpj": _obrigatorio(dados, "cnpj", "CNPJ não pode estar vazio!"),
+        "telefone": _texto(dados, "telefone"),
+        "email": _texto(dados, "email"),
+        "endereco": _texto(dados, "endereco"),
+        "data_cadastro": _agora()
+    }
+
+def validar_funcionario(dados):
+    """Regras de FuncionarioController.cadastrar_funcionario"""
+    return {
+        "nome": _obrigatorio(dados, "nome", "Nome não pode estar vazio!"),
+        "cpf": _obrigatorio(dados, "cpf", "CPF não pode estar vazio!"),
+        "cargo": _obrigatorio(dados, "cargo", "Cargo não pode estar vazio!"),
+        "telefone": _texto(dados, "telefone"),
+        "email": _texto(dados, "email"),
+        "salario": _texto(dados, "salario"),
+        "data_admissao": _agora()
+    }
+
+VALIDADORES = {
+    "produtos": validar_produto,
+    "clientes": validar_cliente,
+    "fornecedores": validar_fornecedor,
+    "funcionarios": validar_funcionario
+}
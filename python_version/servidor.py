@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor do Sistema IGO (vários terminais)
+
+Mantém o banco (e seus índices) em um único processo e o atende por um
+socket Unix. Os terminais se conectam executando o sistema com
+IGO_SERVIDOR=<socket>. Usa o banco configurado por IGO_FORMATO.
+
+Uso:
+    python servidor.py
+    python servidor.py --socket /tmp/igo.sock
+"""
+
+import argparse
+import os
+import sys
+
+from main import abrir_banco
+from models.remoto import ServidorBanco
+
+def main():
+    """Função principal do servidor"""
+    parser = argparse.ArgumentParser(description="Servidor do Sistema IGO")
+    parser.add_argument("--socket", default=os.environ.get("IGO_SERVIDOR", "igo.sock"),
+                        help="caminho do socket Unix (padrão: IGO_SERVIDOR ou igo.sock)")
+    args = parser.parse_args()
+    
+    if os.environ.get("IGO_BACKEND", "json").lower() == "sqlite":
+        # O servidor compartilha o banco em memória; com SQLite cada terminal
+        # abre o mesmo arquivo, e o próprio SQLite coordena os processos
+        print("❌ O modo servidor usa o banco em memória (IGO_BACKEND=json)")
+        return 1
+    
+    db = abrir_banco(remoto=False)
+    servidor = ServidorBanco(db, args.socket)
+    print(f"✅ Servidor IGO aguardando terminais em {args.socket} (Ctrl+C para encerrar)")
+    try:
+        servidor.iniciar()
+    except KeyboardInterrupt:
+        print("\nEncerrando servidor...")
+    finally:
+        db.fechar()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,25 @@ Teste do Sistema IGO - Verificação de Funcionamento
 import os
 import sys
 
+def levanta(erro, funcao, *args, **kwargs):
+    """Indica se a chamada levanta o erro esperado"""
+    try:
+        funcao(*args, **kwargs)
+    except erro:
+        return True
+    return False
+
+def iniciar_servidor(db, caminho_socket):
+    """Inicia um ServidorBanco em segundo plano e aguarda o socket"""
+    import threading
+    from models.remoto import ServidorBanco
+    
+    servidor = ServidorBanco(db, caminho_socket)
+    threading.Thread(target=servidor.iniciar, daemon=True).start()
+    while not os.path.exists(servidor.caminho_socket):
+        threading.Event().wait(0.01)
+    return servidor
+
 def testar_imports():
     """Testa se todos os módulos podem ser importados"""
     print("🧪 TESTANDO IMPORTS...")
@@ -80,6 +99,1099 @@ def testar_database():
         print(f"❌ Erro ao testar banco de dados: {e}")
         return False
 
+def testar_journal():
+    """Testa a persistência via journal e a reaplicação na inicialização"""
+    print("\n📝 TESTANDO JOURNAL...")
+    
+    import tempfile
+    from models.database import Database
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = os.path.join(tmp, "igo_data.json")
+        db = Database(arquivo)
+        produto = db.add_item("produtos", {"nome": "Teste", "categoria": "roupa", "quantidade": 5})
+        db.update_item("produtos", produto['id'], {"quantidade": 7})
+        
+        assert os.path.exists(db.journal_file), "Journal não foi criado"
+        print("✅ Mutações registradas no journal")
+        
+        # Nova instância reaplica snapshot + journal
+        recarregado = Database(arquivo).get_item("produtos", produto['id'])
+        assert recarregado and recarregado['quantidade'] == 7, "Journal não foi reaplicado corretamente"
+        print("✅ Journal reaplicado na inicialização")
+        
+        db.fechar()
+        assert not os.path.exists(db.journal_file), "Journal não foi compactado"
+        print("✅ Journal compactado no snapshot")
+        
+        # Queda no meio de uma gravação: a linha incompleta é descartada e
+        # as operações gravadas depois dela não se perdem
+        db = Database(arquivo)
+        db.update_item("produtos", produto['id'], {"quantidade": 99})
+        with open(db.journal_file, 'a', encoding='utf-8') as f:
+            f.write('{"op": "update", "colecao": "produ')
+        
+        recarregado = Database(arquivo)
+        assert recarregado.get_item("produtos", produto['id'])['quantidade'] == 99, \
+            "Operações anteriores à linha incompleta foram perdidas"
+        novo = recarregado.add_item("produtos", {"nome": "Depois da queda", "categoria": "roupa", "quantidade": 1})
+        
+        recarregado = Database(arquivo)
+        assert recarregado.get_item("produtos", novo['id']) is not None, \
+            "Operação gravada após a linha incompleta foi perdida"
+        assert recarregado.get_item("produtos", produto['id'])['quantidade'] == 99, "Reaplicação alterou o produto"
+        recarregado.fechar()
+        print("✅ Linha incompleta descartada sem perder as gravações seguintes")
+        
+        # Gravação assíncrona: linhas agrupadas e descarregadas sob demanda
+        assincrono = Database(arquivo, durabilidade="assincrona", intervalo_gravacao=60)
+        for i in range(3):
+            assincrono.update_item("produtos", produto['id'], {"quantidade": i})
+        assincrono.descarregar()
+        assert Database(arquivo).get_item("produtos", produto['id'])['quantidade'] == 2, \
+            "Journal assíncrono não foi descarregado"
+        assincrono.fechar()
+        
+        # A mesma queda, reaberta com a gravação assíncrona
+        db = Database(arquivo)
+        db.update_item("produtos", produto['id'], {"quantidade": 5})
+        with open(db.journal_file, 'a', encoding='utf-8') as f:
+            f.write('{"op": "upd')
+        assincrono = Database(arquivo, durabilidade="assincrona", intervalo_gravacao=60)
+        assincrono.update_item("produtos", produto['id'], {"quantidade": 42})
+        assincrono.descarregar()
+        assert Database(arquivo).get_item("produtos", produto['id'])['quantidade'] == 42, \
+            "Gravação assíncrona após a linha incompleta foi perdida"
+        assincrono.fechar()
+        print("✅ Journal assíncrono gravado em lote")
+
+def testar_transacao():
+    """Testa commit e rollback de transações no banco de dados"""
+    print("\n🔒 TESTANDO TRANSAÇÕES...")
+    
+    import tempfile
+    from models.database import Database
+    from models.sqlite_database import SQLiteDatabase
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "igo_data.json"))
+        produto = db.add_item("produtos", {"nome": "Teste", "categoria": "roupa", "quantidade": 10})
+        
+        with db.transaction():
+            db.update_item("produtos", produto['id'], {"quantidade": 4})
+            db.add_item("movimentacoes", {"tipo": "saida", "produto_id": produto['id'], "quantidade": 6})
+        print("✅ Transação confirmada")
+        
+        try:
+            with db.transaction():
+                db.update_item("produtos", produto['id'], {"quantidade": 0})
+                raise RuntimeError("falha simulada")
+        except RuntimeError:
+            pass
+        
+        assert db.get_item("produtos", produto['id'])['quantidade'] == 4, "Rollback não restaurou o produto"
+        print("✅ Rollback restaurou o estado anterior")
+        
+        recarregado = Database(os.path.join(tmp, "igo_data.json"))
+        assert len(recarregado.get_items("movimentacoes")) == 1, "Transação não foi persistida"
+        print("✅ Transação persistida em uma única gravação")
+        
+        # Rollback de alterações, inclusões e exclusões, com os índices
+        bancos = [db, SQLiteDatabase(os.path.join(tmp, "igo_data.db"), os.path.join(tmp, "ausente.json"))]
+        for banco in bancos:
+            produto = banco.add_item("produtos", {"nome": "Arroz", "categoria": "alimento", "quantidade": 20,
+                                                  "ponto_reposicao": 10})
+            outro = banco.add_item("produtos", {"nome": "Feijão", "categoria": "alimento", "quantidade": 30})
+            try:
+                with banco.transaction():
+                    banco.update_item("produtos", produto['id'], {"quantidade": 5, "categoria": "roupa",
+                                                                  "observacao": "temporária"})
+                    banco.delete_item("produtos", outro['id'])
+                    banco.add_item("produtos", {"nome": "Descartado", "categoria": "roupa"})
+                    raise RuntimeError("falha simulada")
+            except RuntimeError:
+                pass
+            
+            restaurado = banco.get_item("produtos", produto['id'])
+            assert restaurado['id'] == produto['id'] and restaurado['quantidade'] == 20, \
+                "Rollback não restaurou a alteração"
+            assert "observacao" not in restaurado, "Rollback manteve um campo incluído na transação"
+            assert restaurado['versao'] == 1, "Rollback não restaurou a versão"
+            assert banco.get_item("produtos", outro['id']) is not None, "Rollback não restaurou o registro excluído"
+            assert not banco.get_items("produtos", {"nome": "Descartado"}), "Rollback manteve a inclusão"
+            assert {p['id'] for p in banco.get_items("produtos", {"categoria": "alimento"})} >= \
+                {produto['id'], outro['id']}, "Índice de categoria não foi restaurado"
+            assert produto['id'] not in [p['id'] for p in banco.get_produtos_baixo_estoque()], \
+                "Índice de estoque baixo não foi restaurado"
+        bancos[1].fechar()
+        db.fechar()
+        print("✅ Rollback de alterações, inclusões e exclusões (memória e SQLite)")
+
+
+def testar_sqlite():
+    """Testa o backend SQLite com a mesma interface do Database"""
+    print("\n🗃️  TESTANDO BACKEND SQLITE...")
+    
+    import tempfile
+    from models.sqlite_database import SQLiteDatabase
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteDatabase(os.path.join(tmp, "igo_data.db"), os.path.join(tmp, "igo_data.json"))
+        
+        assert len(db.get_items("usuarios")) >= 4, "Usuários padrão não foram criados"
+        print("✅ Estrutura inicial criada no SQLite")
+        
+        produto = db.add_item("produtos", {"nome": "Arroz", "categoria": "alimento",
+                                           "validade": "2000-01-01", "quantidade": 2})
+        db.update_item("produtos", produto['id'], {"quantidade": 1})
+        
+        assert [p['id'] for p in db.get_items("produtos", {"categoria": "alimento"})] == [produto['id']], \
+            "Filtro por categoria falhou"
+        assert db.get_produtos_baixo_estoque() and db.get_produtos_vencendo(), \
+            "Consultas de estoque baixo/vencimento falharam"
+        print("✅ Filtros e consultas resolvidos em SQL")
+        
+        db.fechar()
+
+def testar_unicidade():
+    """Testa a rejeição de CPF/CNPJ/username duplicados nos dois backends"""
+    print("\n🔑 TESTANDO CAMPOS ÚNICOS...")
+    
+    import json
+    import tempfile
+    from models.database import Database, RegistroDuplicadoError, estrutura_inicial
+    from models.sqlite_database import SQLiteDatabase
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        bancos = [
+            Database(os.path.join(tmp, "igo_data.json")),
+            SQLiteDatabase(os.path.join(tmp, "igo_data.db"), os.path.join(tmp, "ausente.json"))
+        ]
+        for db in bancos:
+            cliente = db.add_item("clientes", {"nome": "Ana", "cpf": "12345678900"})
+            assert levanta(RegistroDuplicadoError, db.add_item, "clientes", {"nome": "Outra Ana", "cpf": "12345678900"}), \
+                "CPF duplicado foi aceito"
+            
+            outro = db.add_item("clientes", {"nome": "Bia", "cpf": "98765432100"})
+            assert levanta(RegistroDuplicadoError, db.update_item, "clientes", outro['id'], {"cpf": cliente['cpf']}), \
+                "Alteração para CPF duplicado foi aceita"
+            assert db.get_item("clientes", outro['id'])['cpf'] == "98765432100", "Alteração rejeitada foi gravada"
+            
+            # O próprio CPF pode ser regravado (formulário de edição envia todos os campos)
+            db.update_item("clientes", cliente['id'], {"nome": "Ana Maria", "cpf": cliente['cpf']})
+            
+            assert db.buscar_unico("usuarios", "username", "admin")['nivel_acesso'] == "administrador", \
+                "Busca por username falhou"
+            db.fechar()
+        print("✅ Duplicados rejeitados e busca por chave única funcionando")
+        
+        # Duplicados anteriores à regra: os demais campos continuam editáveis
+        legado = estrutura_inicial()
+        legado["clientes"] = [{"id": 1, "nome": "Ana", "cpf": "111"},
+                              {"id": 2, "nome": "Ana (repetida)", "cpf": "111"},
+                              {"id": 3, "nome": "Bia", "cpf": "222"}]
+        arquivo_legado = os.path.join(tmp, "legado.json")
+        with open(arquivo_legado, 'w', encoding='utf-8') as f:
+            json.dump(legado, f)
+        
+        bancos = [
+            Database(arquivo_legado),
+            SQLiteDatabase(os.path.join(tmp, "legado.db"), arquivo_legado)
+        ]
+        for db in bancos:
+            atualizado = db.update_item("clientes", 2, {"nome": "Ana Souza", "cpf": "111", "telefone": "9999"})
+            assert atualizado['nome'] == "Ana Souza", "Duplicado legado não pôde ser editado"
+            assert levanta(RegistroDuplicadoError, db.update_item, "clientes", 3, {"cpf": "111"}), \
+                "Alteração para CPF de duplicado legado foi aceita"
+            db.update_item("clientes", 2, {"cpf": "333"})
+            assert db.buscar_unico("clientes", "cpf", "333")['id'] == 2, "Correção do duplicado legado falhou"
+            db.fechar()
+        print("✅ Verificação apenas dos campos alterados (duplicados legados editáveis)")
+
+
+def testar_versoes():
+    """Testa a versão por registro e a atualização condicional nos backends e no servidor"""
+    print("\n🔢 TESTANDO VERSÕES...")
+    
+    import tempfile
+    import threading
+    import time
+    from models.database import Database, ConflitoVersaoError
+    from models.remoto import ClienteBanco
+    from models.sqlite_database import SQLiteDatabase
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        servidor = iniciar_servidor(Database(os.path.join(tmp, "servidor.json")), os.path.join(tmp, "igo.sock"))
+        
+        bancos = [
+            Database(os.path.join(tmp, "igo_data.json")),
+            SQLiteDatabase(os.path.join(tmp, "igo_data.db"), os.path.join(tmp, "ausente.json")),
+            ClienteBanco(servidor.caminho_socket)
+        ]
+        for db in bancos:
+            cliente = db.add_item("clientes", {"nome": "Ana"})
+            assert cliente['versao'] == 1, "Registro novo não começa na versão 1"
+            assert db.get_item("clientes", cliente['id'])['versao'] == 1, "Versão do registro gravado difere"
+            
+            # Duas edições a partir da mesma leitura: a segunda é rejeitada
+            versao = cliente['versao']
+            db.update_item("clientes", cliente['id'], {"nome": "Ana Maria"}, versao)
+            assert levanta(ConflitoVersaoError, db.update_item, "clientes", cliente['id'], {"nome": "Ana Paula"}, versao), \
+                "Atualização com versão antiga foi aceita"
+            
+            atual = db.get_item("clientes", cliente['id'])
+            assert atual['nome'] == "Ana Maria" and atual['versao'] == 2, "Conflito alterou o registro"
+            
+            assert db.update_item("clientes", cliente['id'], {"nome": "Ana"})['versao'] == 3, \
+                "Atualização sem versão não incrementou a versão"
+            db.fechar()
+        servidor.parar()
+        print("✅ Versões incrementadas e conflitos rejeitados (local, SQLite e servidor)")
+        
+        # Edições concorrentes a partir de leituras próprias: cada versão é
+        # concedida a uma única thread, e nenhuma alteração aceita se perde
+        bancos = [
+            Database(os.path.join(tmp, "concorrente.json")),
+            SQLiteDatabase(os.path.join(tmp, "concorrente.db"), os.path.join(tmp, "ausente.json"))
+        ]
+        for db in bancos:
+            produto = db.add_item("produtos", {"nome": "Arroz", "categoria": "alimento", "quantidade": 0})
+            aceitas = []
+            erros = []
+            
+            # Alarga o intervalo entre a comparação da versão e a gravação
+            verificar = db._verificar_unicidade
+            db._verificar_unicidade = lambda *args: (time.sleep(0.001), verificar(*args))
+            
+            def editar():
+                for _ in range(20):
+                    lido = dict(db.get_item("produtos", produto['id']))
+                    try:
+                        db.update_item("produtos", produto['id'], {"quantidade": lido['quantidade'] + 1},
+                                       lido['versao'])
+                        aceitas.append(lido['versao'])
+                    except ConflitoVersaoError:
+                        pass
+                    except Exception as e:
+                        erros.append(e)
+            
+            threads = [threading.Thread(target=editar) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            final = db.get_item("produtos", produto['id'])
+            assert not erros, f"Edição concorrente falhou: {erros[0]!r}"
+            assert len(aceitas) == len(set(aceitas)), "A mesma versão foi aceita por duas threads"
+            assert final['quantidade'] == len(aceitas) and final['versao'] == len(aceitas) + 1, \
+                "Alteração concorrente perdida"
+            db.fechar()
+        print("✅ Verificação de versão e alteração atômicas entre threads (memória e SQLite)")
+        
+        # Formulário de edição: conflito e duplicado são exibidos, sem gravar
+        from views.edicao_view import EdicaoView
+        db = Database(os.path.join(tmp, "edicao.json"))
+        edicao = EdicaoView(db)
+        ana = db.add_item("clientes", {"nome": "Ana", "cpf": "111"})
+        bia = db.add_item("clientes", {"nome": "Bia", "cpf": "222"})
+        assert edicao.gravar("clientes", ana['id'], {"nome": "Ana Maria"}, 1, "cliente"), "Edição válida não foi gravada"
+        assert not edicao.gravar("clientes", ana['id'], {"nome": "Ana Paula"}, 1, "cliente"), "Conflito foi gravado"
+        assert not edicao.gravar("clientes", bia['id'], {"cpf": "111"}, 1, "cliente"), "Duplicado foi gravado"
+        assert db.get_item("clientes", ana['id'])['nome'] == "Ana Maria" and \
+            db.get_item("clientes", bia['id'])['cpf'] == "222", "Edição rejeitada alterou o registro"
+        db.fechar()
+        print("✅ Edição pelos formulários com conflito e duplicado rejeitados")
+
+def testar_indice_primario():
+    """Testa a busca, alteração e exclusão de registros pelo índice por ID"""
+    print("\n📇 TESTANDO ÍNDICE POR ID...")
+    
+    import tempfile
+    from models.database import Database
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "igo_data.json"))
+        ids = [db.add_item("produtos", {"nome": f"Produto {i}", "categoria": "roupa", "quantidade": i})['id']
+               for i in range(5)]
+        
+        assert db.get_item("produtos", ids[2])['nome'] == "Produto 2", "get_item retornou o registro errado"
+        assert db.delete_item("produtos", ids[2])['id'] == ids[2], "Exclusão não retornou o registro"
+        assert db.get_item("produtos", ids[2]) is None, "Registro excluído continua no índice por ID"
+        assert db.update_item("produtos", ids[2], {"quantidade": 1}) is None, "Registro excluído foi atualizado"
+        assert db.delete_item("produtos", ids[2]) is None, "Registro excluído foi removido duas vezes"
+        assert [p['id'] for p in db.get_items("produtos")] == ids[:2] + ids[3:], "Coleção fora de ordem após exclusão"
+        
+        db.update_item("produtos", ids[4], {"nome": "Alterado"})
+        assert db.get_items("produtos")[-1]['nome'] == "Alterado", "Alteração não chegou à coleção"
+        db.fechar()
+        print("✅ Busca, alteração e exclusão por ID")
+
+def testar_sequencias():
+    """Testa que IDs excluídos nunca são reutilizados, inclusive após recarregar"""
+    print("\n🔢 TESTANDO SEQUÊNCIAS DE IDS...")
+    
+    import tempfile
+    from models.database import Database
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = os.path.join(tmp, "igo_data.json")
+        db = Database(arquivo)
+        ids = [db.add_item("produtos", {"nome": f"Produto {i}", "categoria": "roupa"})['id'] for i in range(3)]
+        assert ids == [1, 2, 3], "IDs não seguem a sequência da coleção"
+        assert db.add_item("clientes", {"nome": "Ana"})['id'] == 1, "Sequência compartilhada entre coleções"
+        
+        # O último ID excluído não é reutilizado, nem depois de recarregar
+        db.delete_item("produtos", 3)
+        assert db.add_item("produtos", {"nome": "Novo", "categoria": "roupa"})['id'] == 4, "ID reutilizado"
+        db.delete_item("produtos", 4)
+        db.fechar()
+        
+        db = Database(arquivo)
+        assert db.add_item("produtos", {"nome": "Outro", "categoria": "roupa"})['id'] == 5, \
+            "Sequência de IDs não foi persistida no snapshot"
+        db.delete_item("produtos", 5)
+        assert Database(arquivo).add_item("produtos", {"nome": "Mais um", "categoria": "roupa"})['id'] == 6, \
+            "Sequência de IDs não foi reconstruída pelo journal"
+        print("✅ IDs nunca reutilizados (sequências persistidas)")
+
+def testar_indices_secundarios():
+    """Testa os filtros de get_items resolvidos pelos índices secundários"""
+    print("\n🗂️  TESTANDO ÍNDICES SECUNDÁRIOS...")
+    
+    import tempfile
+    from models.database import Database
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "igo_data.json"))
+        for i in range(5):
+            db.add_item("produtos", {"nome": f"Produto {i}", "categoria": "roupa", "quantidade": i})
+        
+        # Índices de igualdade acompanham as alterações do campo indexado
+        db.update_item("produtos", 1, {"categoria": "alimento"})
+        assert [p['id'] for p in db.get_items("produtos", {"categoria": "alimento"})] == [1], \
+            "Índice de categoria não acompanhou a alteração"
+        assert [p['id'] for p in db.get_items("produtos", {"categoria": "roupa"})] == [2, 3, 4, 5], \
+            "Registro alterado continua no grupo antigo"
+        assert [p['id'] for p in db.get_items("produtos", {"categoria": "roupa", "quantidade": 3})] == [4], \
+            "Filtro misto (indexado e não indexado) incorreto"
+        db.delete_item("produtos", 4)
+        assert [p['id'] for p in db.get_items("produtos", {"categoria": "roupa"})] == [2, 3, 5], \
+            "Registro excluído continua no índice"
+        
+        db.criar_indice("produtos", "nome")
+        assert [p['id'] for p in db.get_items("produtos", {"nome": "Produto 4"})] == [5], \
+            "Índice criado sob demanda falhou"
+        db.add_item("produtos", {"nome": "Produto 4", "categoria": "alimento"})
+        assert [p['id'] for p in db.get_items("produtos", {"nome": "Produto 4", "categoria": "alimento"})] == [6], \
+            "Interseção de índices incorreta"
+        assert db.get_items("produtos", {"nome": "Inexistente"}) == [], "Filtro sem resultado retornou registros"
+        db.fechar()
+        print("✅ Filtros resolvidos pelos índices secundários")
+
+def testar_geracoes():
+    """Testa a gravação atômica do snapshot e a recuperação pela geração anterior"""
+    print("\n💾 TESTANDO GERAÇÕES DO SNAPSHOT...")
+    
+    import tempfile
+    from models.database import Database
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = os.path.join(tmp, "igo_data.json")
+        db = Database(arquivo)
+        db.add_item("produtos", {"nome": "Arroz", "categoria": "alimento"})
+        db.compactar()
+        db.add_item("produtos", {"nome": "Feijão", "categoria": "alimento"})
+        db.compactar()
+        db.fechar()
+        
+        assert os.path.exists(arquivo + ".1"), "Geração anterior não foi preservada"
+        assert not [nome for nome in os.listdir(tmp) if nome.endswith(".tmp")], "Arquivo temporário ficou no disco"
+        
+        # Snapshot corrompido: carrega a geração anterior em vez de recriar o banco
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            f.write('{"produtos": [')
+        recuperado = Database(arquivo)
+        assert [p['nome'] for p in recuperado.get_items("produtos")] == ["Arroz"], \
+            "Geração anterior não foi carregada"
+        print("✅ Snapshot atômico com gerações anteriores")
+
+def testar_colecoes():
+    """Testa o formato "colecoes", com cada coleção lida no primeiro acesso"""
+    print("\n📂 TESTANDO SNAPSHOT POR COLEÇÃO...")
+    
+    import tempfile
+    from models.database import Database
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        diretorio = os.path.join(tmp, "colecoes", "igo_data")
+        db = Database(diretorio, formato="colecoes")
+        for i in range(3):
+            db.add_item("movimentacoes", {"tipo": "entrada", "produto_id": 1, "quantidade": i})
+        db.add_item("produtos", {"nome": "Arroz", "categoria": "alimento"})
+        db.fechar()
+        
+        db = Database(diretorio, formato="colecoes")
+        assert not db.data.carregada("movimentacoes"), "Coleção carregada na inicialização"
+        assert [m['quantidade'] for m in db.iterar_itens("movimentacoes")] == [0, 1, 2], \
+            "Leitura sem carregar a coleção falhou"
+        assert not db.data.carregada("movimentacoes"), "iterar_itens carregou a coleção"
+        assert len(db.get_items("movimentacoes")) == 3 and db.data.carregada("movimentacoes"), \
+            "Carga sob demanda falhou"
+        db.update_item("produtos", 1, {"quantidade": 4})
+        db.fechar()
+        assert Database(diretorio, formato="colecoes").get_item("produtos", 1)['quantidade'] == 4, \
+            "Coleção alterada não foi gravada"
+        print("✅ Formato por coleção carregado sob demanda")
+        
+        # Inclusões (e sua reaplicação pelo journal) não carregam a coleção
+        db = Database(diretorio, formato="colecoes")
+        assert db.add_item("movimentacoes", {"tipo": "saida", "produto_id": 1, "quantidade": 3})['id'] == 4, \
+            "Sequência da coleção não carregada incorreta"
+        assert not db.data.carregada("movimentacoes"), "Inclusão carregou a coleção"
+        assert [m['quantidade'] for m in db.iterar_itens("movimentacoes")] == [0, 1, 2, 3], \
+            "Inclusão pendente ausente da leitura"
+        db.fechar()
+        
+        db = Database(diretorio, formato="colecoes")
+        db.add_item("movimentacoes", {"tipo": "saida", "produto_id": 1, "quantidade": 4})
+        with open(db.journal_file, 'r', encoding='utf-8') as f:
+            journal = f.read()
+        
+        db = Database(diretorio, formato="colecoes")
+        assert not db.data.carregada("movimentacoes"), "Reaplicação do journal carregou a coleção"
+        assert [m['id'] for m in db.iterar_itens("movimentacoes")] == [1, 2, 3, 4, 5], \
+            "Inclusão do journal não foi reaplicada"
+        db.fechar()
+        
+        # Queda após gravar o arquivo e antes de descartar o journal
+        with open(db.journal_file, 'w', encoding='utf-8') as f:
+            f.write(journal)
+        db = Database(diretorio, formato="colecoes")
+        assert [m['id'] for m in db.get_items("movimentacoes")] == [1, 2, 3, 4, 5], \
+            "Inclusão já gravada foi reaplicada em duplicidade"
+        db.fechar()
+        print("✅ Inclusões anexadas sem carregar a coleção")
+
+def testar_binario():
+    """Testa o snapshot binário e a exportação de volta para o JSON original"""
+    print("\n🧱 TESTANDO SNAPSHOT BINÁRIO...")
+    
+    import json
+    import tempfile
+    from models.database import Database, MAGICO_BINARIO
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        binario = os.path.join(tmp, "igo_data.bin")
+        db = Database(binario, formato="binario")
+        produto = db.add_item("produtos", {"nome": "Açúcar", "categoria": "alimento", "quantidade": 3})
+        db.fechar()
+        with open(binario, 'rb') as f:
+            assert f.read(len(MAGICO_BINARIO)) == MAGICO_BINARIO, "Snapshot binário sem assinatura"
+        
+        db = Database(binario, formato="binario")
+        assert db.get_item("produtos", produto['id']) == produto, "Snapshot binário não foi relido"
+        exportado = os.path.join(tmp, "exportado.json")
+        db.exportar_json(exportado)
+        with open(exportado, 'r', encoding='utf-8') as f:
+            assert json.load(f)["produtos"] == [produto], "Exportação JSON difere do snapshot binário"
+        print("✅ Snapshot binário e exportação JSON")
+        
+        # Migração de um banco JSON com operações ainda só no journal
+        os.makedirs(os.path.join(tmp, "migracao"))
+        legado = Database(os.path.join(tmp, "migracao", "igo_data.json"))
+        arroz = legado.add_item("produtos", {"nome": "Arroz", "categoria": "alimento", "quantidade": 3})
+        legado.update_item("produtos", arroz['id'], {"quantidade": 7})
+        assert os.path.getsize(legado.journal_file) > 0, "Operações do banco legado não ficaram no journal"
+        
+        migrado = Database(os.path.join(tmp, "migracao", "igo_data.bin"), formato="binario")
+        assert migrado.get_item("produtos", arroz['id'])['quantidade'] == 7, "Journal do banco JSON não foi migrado"
+        assert migrado.add_item("produtos", {"nome": "Feijão", "categoria": "alimento"})['id'] == arroz['id'] + 1, \
+            "Sequência do journal do banco JSON não foi migrada"
+        migrado.fechar()
+        print("✅ Migração do banco JSON incluindo o journal pendente")
+
+def testar_agregados():
+    """Testa os agregados de relatório mantidos a cada mutação"""
+    print("\n📊 TESTANDO AGREGADOS DE RELATÓRIOS...")
+    
+    import tempfile
+    from models.agregados import AgregadosRelatorio
+    from models.database import Database
+    from models.servicos import Servicos
+    
+    def estado(agregados):
+        return (agregados.contagens, round(agregados.valor_estoque, 6), agregados.produtos_por_categoria,
+                agregados.pedidos_por_status, agregados.movimentacoes_por_tipo)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "igo_data.json"))
+        agregados = AgregadosRelatorio(db)
+        servicos = Servicos(db)
+        
+        arroz = servicos.cadastros.cadastrar("produtos", {"nome": "Arroz", "categoria": "alimento", "marca": "IGO",
+                                                          "validade": "31/12/2030", "quantidade": 10, "preco": 5})
+        camisa = servicos.cadastros.cadastrar("produtos", {"nome": "Camisa", "categoria": "roupa", "marca": "IGO",
+                                                           "tamanho": "M", "quantidade": 4, "preco": 20})
+        cliente = servicos.cadastros.cadastrar("clientes", {"nome": "Ana", "cpf": "12345678900"})
+        
+        aprovado = servicos.pedidos.criar(cliente['id'], [(arroz['id'], 3), (camisa['id'], 1)])
+        servicos.pedidos.aprovar(aprovado['id'])
+        outro = servicos.pedidos.criar(cliente['id'], [(arroz['id'], 2)])
+        servicos.pedidos.aprovar(outro['id'])
+        rejeitado = servicos.pedidos.criar(cliente['id'], [(camisa['id'], 2)])
+        servicos.pedidos.rejeitar(rejeitado['id'], "sem estoque")
+        servicos.estoque.movimentar(camisa['id'], "entrada", 6)
+        db.delete_item("pedidos", outro['id'])
+        try:
+            with db.transaction():
+                servicos.estoque.movimentar(arroz['id'], "saida", 5)
+                raise RuntimeError("falha simulada")
+        except RuntimeError:
+            pass
+        
+        # Os valores mantidos incrementalmente são os de uma reconstrução
+        assert estado(agregados) == estado(AgregadosRelatorio(db)), "Agregados divergem da reconstrução"
+        assert agregados.pedidos_por_status == {"aprovado": 1, "rejeitado": 1}, "Pedidos por status incorretos"
+        assert agregados.valor_estoque == 5 * 5 + 9 * 20, "Valor do estoque incorreto"
+        print("✅ Agregados mantidos a cada mutação (inclusive rollback)")
+        
+        # Eventos já incluídos na leitura inicial podem ser entregues de novo
+        reconstruido = estado(AgregadosRelatorio(db))
+        for evento, collection, item in [("add", "produtos", arroz), ("update", "pedidos", aprovado),
+                                         ("add", "clientes", cliente), ("delete", "pedidos", outro)]:
+            agregados._ao_mudar(evento, collection, item)
+        assert estado(agregados) == reconstruido, "Evento repetido alterou os agregados"
+        db.fechar()
+        print("✅ Eventos repetidos não alteram os agregados")
+
+def testar_ranking():
+    """Testa o ranking de produtos mais solicitados"""
+    print("\n🏆 TESTANDO RANKING DE PRODUTOS...")
+    
+    import tempfile
+    from models.agregados import RankingProdutos
+    from models.database import Database
+    from models.servicos import Servicos
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "igo_data.json"))
+        ranking = RankingProdutos(db)
+        servicos = Servicos(db)
+        
+        arroz = servicos.cadastros.cadastrar("produtos", {"nome": "Arroz", "categoria": "alimento", "marca": "IGO",
+                                                          "validade": "31/12/2030", "quantidade": 10, "preco": 5})
+        camisa = servicos.cadastros.cadastrar("produtos", {"nome": "Camisa", "categoria": "roupa", "marca": "IGO",
+                                                           "tamanho": "M", "quantidade": 4, "preco": 20})
+        cliente = servicos.cadastros.cadastrar("clientes", {"nome": "Ana", "cpf": "12345678900"})
+        
+        aprovado = servicos.pedidos.criar(cliente['id'], [(arroz['id'], 3), (camisa['id'], 1)])
+        servicos.pedidos.aprovar(aprovado['id'])
+        outro = servicos.pedidos.criar(cliente['id'], [(arroz['id'], 2)])
+        servicos.pedidos.aprovar(outro['id'])
+        rejeitado = servicos.pedidos.criar(cliente['id'], [(camisa['id'], 2)])
+        servicos.pedidos.rejeitar(rejeitado['id'], "sem estoque")
+        db.delete_item("pedidos", outro['id'])
+        
+        assert ranking.top(10) == RankingProdutos(db).top(10), "Ranking diverge da reconstrução"
+        assert [(produto_id, dados['quantidade_total']) for produto_id, dados in ranking.top(10)] == \
+            [(arroz['id'], 3), (camisa['id'], 1)], "Ranking de produtos incorreto"
+        assert ranking.top(1, dias=1)[0][0] == arroz['id'], "Ranking por período incorreto"
+        assert ranking.top(10, dias=0) == [], "Ranking de período vazio retornou produtos"
+        db.fechar()
+        print("✅ Ranking de produtos mais solicitados")
+
+def testar_historico():
+    """Testa o histórico de movimentações por período e por produto"""
+    print("\n🕒 TESTANDO HISTÓRICO DE MOVIMENTAÇÕES...")
+    
+    import tempfile
+    from datetime import datetime
+    from models.agregados import HistoricoMovimentacoes
+    from models.database import Database
+    from models.servicos import Servicos
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "igo_data.json"))
+        historico = HistoricoMovimentacoes(db)
+        servicos = Servicos(db)
+        
+        arroz = servicos.cadastros.cadastrar("produtos", {"nome": "Arroz", "categoria": "alimento", "marca": "IGO",
+                                                          "validade": "31/12/2030", "quantidade": 10, "preco": 5})
+        camisa = servicos.cadastros.cadastrar("produtos", {"nome": "Camisa", "categoria": "roupa", "marca": "IGO",
+                                                           "tamanho": "M", "quantidade": 4, "preco": 20})
+        servicos.estoque.movimentar(arroz['id'], "saida", 2)
+        servicos.estoque.movimentar(camisa['id'], "entrada", 6)
+        
+        # Movimentações com datas conhecidas, fora de ordem
+        datas = ["2024-01-10 08:00:00", "2024-01-05 09:00:00", "2024-01-10 18:30:00", "2024-02-01 10:00:00"]
+        movs = [db.add_item("movimentacoes", {"tipo": "entrada", "produto_id": camisa['id'], "quantidade": 1,
+                                              "data_hora": data}) for data in datas]
+        assert [m['id'] for m in historico.entre("2024-01-05", "2024-01-10")] == \
+            [movs[1]['id'], movs[0]['id'], movs[2]['id']], "Intervalo de datas incorreto"
+        assert historico.totais_periodo("2024-01-01", "2024-01-31") == {"entrada": {"registros": 3, "quantidade": 3}}, \
+            "Totais do período incorretos"
+        
+        db.update_item("movimentacoes", movs[3]['id'], {"data_hora": "2024-01-07 12:00:00"})
+        db.delete_item("movimentacoes", movs[0]['id'])
+        assert [m['id'] for m in historico.entre("2024-01-01", "2024-01-31", camisa['id'])] == \
+            [movs[1]['id'], movs[3]['id'], movs[2]['id']], "Histórico não acompanhou alteração e exclusão"
+        hoje = datetime.now().strftime("%Y-%m-%d")
+        assert historico.ultimas(2) == historico.entre(hoje, hoje)[::-1][:2], "Últimas movimentações incorretas"
+        assert [m['id'] for m in historico.ultimas(50, arroz['id'])] == \
+            [m['id'] for m in reversed(db.get_items("movimentacoes", {"produto_id": arroz['id']}))], \
+            "Histórico por produto incorreto"
+        db.fechar()
+        print("✅ Histórico de movimentações por período e produto")
+
+def testar_vencimentos():
+    """Testa o índice de vencimento e os alertas do agendador"""
+    print("\n📅 TESTANDO VENCIMENTOS...")
+    
+    import tempfile
+    from datetime import datetime, timedelta
+    from models.alertas import AgendadorVencimentos
+    from models.database import Database
+    from models.sqlite_database import SQLiteDatabase
+    
+    def validade(dias):
+        return (datetime.now() + timedelta(days=dias)).strftime("%Y-%m-%d")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        bancos = [
+            Database(os.path.join(tmp, "igo_data.json")),
+            SQLiteDatabase(os.path.join(tmp, "igo_data.db"), os.path.join(tmp, "ausente.json"))
+        ]
+        for db in bancos:
+            proximo = db.add_item("produtos", {"nome": "Leite", "categoria": "alimento", "validade": validade(5),
+                                               "quantidade": 50})
+            distante = db.add_item("produtos", {"nome": "Arroz", "categoria": "alimento", "validade": validade(60),
+                                                "quantidade": 50})
+            db.add_item("produtos", {"nome": "Camisa", "categoria": "roupa", "validade": validade(1), "quantidade": 50})
+            db.add_item("produtos", {"nome": "Feijão", "categoria": "alimento", "validade": "", "quantidade": 50})
+            
+            assert [p['id'] for p in db.get_produtos_vencendo(30)] == [proximo['id']], "Produtos vencendo incorretos"
+            
+            alertas = []
+            agendador = AgendadorVencimentos(db, alertas.append, dias=30)
+            assert [p['id'] for p in agendador.verificar()] == [proximo['id']], "Primeiro alerta incorreto"
+            assert agendador.verificar() == [], "Produto alertado novamente"
+            db.update_item("produtos", distante['id'], {"validade": validade(10)})
+            assert [p['id'] for p in agendador.verificar()] == [distante['id']], "Novo produto na janela não foi alertado"
+            assert len(alertas) == 2, "Callback chamado sem produtos novos"
+            
+            db.add_item("produtos", {"nome": "Iogurte", "categoria": "alimento", "validade": validade(2),
+                                     "quantidade": 50})
+            assert [p['nome'] for p in db.get_produtos_vencendo(30)] == ["Iogurte", "Leite", "Arroz"], \
+                "Produtos vencendo fora da ordem de validade"
+            db.fechar()
+        print("✅ Vencimentos e alertas (memória e SQLite)")
+
+def testar_reposicao():
+    """Testa os pontos de reposição por produto e o evento de estoque baixo"""
+    print("\n📉 TESTANDO PONTOS DE REPOSIÇÃO...")
+    
+    import tempfile
+    from models.database import Database
+    from models.sqlite_database import SQLiteDatabase
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        bancos = [
+            Database(os.path.join(tmp, "igo_data.json")),
+            SQLiteDatabase(os.path.join(tmp, "igo_data.db"), os.path.join(tmp, "ausente.json"))
+        ]
+        for db in bancos:
+            db.add_item("produtos", {"nome": "Arroz", "categoria": "alimento", "quantidade": 50})
+            
+            # Ponto de reposição por produto (padrão 10) e evento ao atingi-lo
+            eventos = []
+            db.inscrever(lambda evento, collection, item: eventos.append((evento, item and item['id'])))
+            acima = db.add_item("produtos", {"nome": "Macarrão", "categoria": "alimento", "quantidade": 5,
+                                             "ponto_reposicao": 3})
+            padrao = db.add_item("produtos", {"nome": "Açúcar", "categoria": "alimento", "quantidade": 8})
+            baixos = {p['id'] for p in db.get_produtos_baixo_estoque()}
+            assert padrao['id'] in baixos and acima['id'] not in baixos, "Ponto de reposição por produto ignorado"
+            assert {p['id'] for p in db.get_produtos_baixo_estoque(5)} == {acima['id']}, "Limite único ignorado"
+            
+            db.update_item("produtos", acima['id'], {"quantidade": 3})
+            db.update_item("produtos", acima['id'], {"quantidade": 2})
+            assert eventos.count(("estoque_baixo", acima['id'])) == 1, "Evento de estoque baixo incorreto"
+            
+            # Em transação, o evento só sai no commit e é descartado no rollback
+            arroz = db.get_items("produtos", {"nome": "Arroz"})[0]
+            try:
+                with db.transaction():
+                    db.update_item("produtos", arroz['id'], {"quantidade": 1})
+                    raise RuntimeError("falha simulada")
+            except RuntimeError:
+                pass
+            with db.transaction():
+                db.update_item("produtos", arroz['id'], {"quantidade": 2})
+                assert ("estoque_baixo", arroz['id']) not in eventos, "Evento de estoque baixo antes do commit"
+            assert eventos.count(("estoque_baixo", arroz['id'])) == 1, "Evento de estoque baixo da transação incorreto"
+            db.update_item("produtos", arroz['id'], {"quantidade": 50})
+            assert acima['id'] in {p['id'] for p in db.get_produtos_baixo_estoque()}, "Índice de reposição desatualizado"
+            
+            db.update_item("produtos", padrao['id'], {"quantidade": 9})
+            assert [p['nome'] for p in db.get_produtos_baixo_estoque()] == ["Macarrão", "Açúcar"], \
+                "Estoque baixo fora da ordem de criticidade"
+            assert [p['nome'] for p in db.get_produtos_baixo_estoque(10)] == ["Macarrão", "Açúcar"], \
+                "Estoque baixo (limite único) fora da ordem de quantidade"
+            db.update_item("produtos", padrao['id'], {"quantidade": 3})
+            assert [p['nome'] for p in db.get_produtos_baixo_estoque()] == ["Açúcar", "Macarrão"], \
+                "Estoque baixo fora da ordem de criticidade"
+            assert [p['nome'] for p in db.get_produtos_baixo_estoque(10)] == ["Macarrão", "Açúcar"], \
+                "Estoque baixo (limite único) fora da ordem de quantidade"
+            db.update_item("produtos", padrao['id'], {"quantidade": 1})
+            assert [p['nome'] for p in db.get_produtos_baixo_estoque(10)] == ["Açúcar", "Macarrão"], \
+                "Estoque baixo (limite único) fora da ordem de quantidade"
+            db.fechar()
+        print("✅ Pontos de reposição e evento de estoque baixo (memória e SQLite)")
+
+def testar_busca():
+    """Testa a busca textual sem acentos nos dois backends"""
+    print("\n🔎 TESTANDO BUSCA TEXTUAL...")
+    
+    import tempfile
+    from models.database import Database
+    from models.sqlite_database import SQLiteDatabase
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        bancos = [
+            Database(os.path.join(tmp, "igo_data.json")),
+            SQLiteDatabase(os.path.join(tmp, "igo_data.db"), os.path.join(tmp, "ausente.json"))
+        ]
+        resultados = []
+        for db in bancos:
+            for nome, marca in [("Farinha de Arroz", "Yoki"), ("Arroz Integral", "Tio João"),
+                                ("Feijão Preto", "Camil"), ("Arroz", "Camil")]:
+                db.add_item("produtos", {"nome": nome, "categoria": "alimento", "marca": marca})
+            db.add_item("clientes", {"nome": "José Araújo", "cpf": "12345678900"})
+            
+            def nomes(collection, termo, limite=None):
+                return [item['nome'] for item in db.buscar_texto(collection, termo, limite)]
+            
+            assert nomes("produtos", "arroz") == ["Arroz", "Arroz Integral", "Farinha de Arroz"], \
+                "Busca não ordenou por relevância"
+            assert nomes("produtos", "FEIJAO") == ["Feijão Preto"], "Busca sem acentos falhou"
+            assert nomes("produtos", "joão") == ["Arroz Integral"], "Busca pela marca falhou"
+            assert nomes("produtos", "ij") == ["Feijão Preto"], "Busca por termo curto falhou"
+            assert nomes("produtos", "arroz", 1) == ["Arroz"], "Limite da busca ignorado"
+            assert nomes("clientes", "araujo") == nomes("clientes", "456") == ["José Araújo"], \
+                "Busca de clientes falhou"
+            
+            db.update_item("produtos", 3, {"nome": "Lentilha"})
+            db.delete_item("produtos", 4)
+            assert nomes("produtos", "feijao") == [] and nomes("produtos", "lentilha") == ["Lentilha"], \
+                "Índice textual não acompanhou a alteração"
+            assert nomes("produtos", "camil") == ["Lentilha"], "Registro excluído continua na busca"
+            resultados.append([nomes("produtos", termo) for termo in ("ar", "arroz", "o", "in")])
+            db.fechar()
+        
+        assert resultados[0] == resultados[1], "Backends retornam buscas diferentes"
+        print("✅ Busca por substring, sem acentos e por relevância (memória e SQLite)")
+
+def testar_paginacao():
+    """Testa a paginação por deslocamento e por chave nos dois backends"""
+    print("\n📄 TESTANDO PAGINAÇÃO...")
+    
+    import tempfile
+    from models.database import Database
+    from models.sqlite_database import SQLiteDatabase
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        bancos = [
+            Database(os.path.join(tmp, "igo_data.json")),
+            SQLiteDatabase(os.path.join(tmp, "igo_data.db"), os.path.join(tmp, "ausente.json"))
+        ]
+        for db in bancos:
+            ids = [db.add_item("pedidos", {"cliente_id": i % 2, "status": "pendente"})['id'] for i in range(25)]
+            db.delete_item("pedidos", ids[12])
+            del ids[12]
+            
+            def ids_de(itens):
+                return [item['id'] for item in itens]
+            
+            itens, total = db.get_pagina("pedidos", 20, 10)
+            assert ids_de(itens) == ids[20:] and total == 24, "Página por deslocamento incorreta"
+            assert ids_de(db.get_itens_apos("pedidos", ids[9], 5)) == ids[10:15], "Página seguinte incorreta"
+            assert ids_de(db.get_itens_antes("pedidos", ids[10], 5)) == ids[5:10], "Página anterior incorreta"
+            assert ids_de(db.get_itens_antes("pedidos", ids[2], 5)) == ids[:2], "Primeira página incorreta"
+            assert db.get_itens_apos("pedidos", ids[-1]) == [], "Página após o último registro não está vazia"
+            
+            pares = [item_id for item_id in ids if (item_id - 1) % 2 == 0]
+            itens, total = db.get_pagina("pedidos", 0, 3, {"cliente_id": 0})
+            assert ids_de(itens) == pares[:3] and total == len(pares), "Página filtrada incorreta"
+            assert ids_de(db.get_itens_apos("pedidos", pares[2], 3, {"cliente_id": 0})) == pares[3:6], \
+                "Página filtrada por chave incorreta"
+            db.fechar()
+        print("✅ Paginação por deslocamento e por chave (memória e SQLite)")
+
+def testar_importacao():
+    """Testa a importação em lote de CSV/JSONL com validação e rejeitados"""
+    print("\n📥 TESTANDO IMPORTAÇÃO...")
+    
+    import json
+    import tempfile
+    from models.database import Database
+    from models.importacao import importar_arquivo
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "igo_data.json"), compactar_a_cada=2)
+        compactacoes = []
+        compactar = db.compactar
+        db.compactar = lambda: (compactacoes.append(1), compactar())
+        
+        arquivo = os.path.join(tmp, "produtos.csv")
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            f.write("nome;categoria;marca;validade;tamanho;quantidade;preco\n"
+                    "Arroz;alimento;IGO;31/12/2030;;10;5,50\n"
+                    "Camisa;roupa;IGO;;m;-1;20\n"
+                    "Camiseta;2;IGO;31/12/2030;;3;8\n"
+                    "Calça;roupa;IGO;;G;2;30\n")
+        resumo = importar_arquivo(db, "produtos", arquivo, lote=1)
+        
+        assert resumo["importados"] == 3 and resumo["rejeitados"] == 1, f"Resumo da importação incorreto: {resumo}"
+        assert len(compactacoes) == 1, f"Journal compactado {len(compactacoes)} vezes na importação"
+        with open(resumo["arquivo_erros"], 'r', encoding='utf-8') as f:
+            erros = [json.loads(linha) for linha in f]
+        assert [(erro["linha"], erro["erro"]) for erro in erros] == [(3, "Quantidade não pode ser negativa!")], \
+            "Arquivo de erros incorreto"
+        assert [(p['nome'], p['preco']) for p in db.get_items("produtos")] == \
+            [("Arroz", 5.5), ("Camiseta", 8.0), ("Calça", 30.0)], "Produtos importados incorretos"
+        assert len(db.get_items("movimentacoes")) == 3, "Entradas de estoque da importação não registradas"
+        
+        clientes = os.path.join(tmp, "clientes.jsonl")
+        with open(clientes, 'w', encoding='utf-8') as f:
+            f.write('{"nome": "Ana", "cpf": "111"}\n{"nome": "Bia", "cpf": "111"}\n[1]\n{"nome": ""}\n')
+        resumo = importar_arquivo(db, "clientes", clientes)
+        assert resumo["importados"] == 1 and resumo["rejeitados"] == 3, "Duplicados e inválidos não foram rejeitados"
+        db.fechar()
+        print("✅ Importação com validação, rejeitados em arquivo e compactação única")
+
+def testar_exportacao():
+    """Testa a exportação de coleções para CSV e JSONL"""
+    print("\n📤 TESTANDO EXPORTAÇÃO...")
+    
+    import csv
+    import io
+    import json
+    import tempfile
+    from models.database import Database
+    from models.exportacao import exportar_colecao
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "igo_data.json"))
+        for nome, categoria in [("Arroz", "alimento"), ("Camiseta", "roupa"), ("Calça", "roupa")]:
+            produto = db.add_item("produtos", {"nome": nome, "categoria": categoria, "quantidade": 1})
+            db.add_item("movimentacoes", {"tipo": "entrada", "produto_id": produto['id'], "quantidade": 1})
+        
+        # Campo que só aparece no último registro também vira coluna
+        db.update_item("produtos", 3, {"observacao": "doação"})
+        destino = os.path.join(tmp, "produtos.csv")
+        assert exportar_colecao(db, "produtos", destino, "csv") == 3, "Exportação CSV incompleta"
+        with open(destino, 'r', encoding='utf-8', newline='') as f:
+            linhas = list(csv.DictReader(f))
+        assert [linha['nome'] for linha in linhas] == ["Arroz", "Camiseta", "Calça"], "Linhas do CSV incorretas"
+        assert linhas[2]['observacao'] == "doação" and linhas[0]['observacao'] == "", "Coluna tardia ausente do CSV"
+        
+        saida = io.StringIO()
+        exportar_colecao(db, "produtos", saida, "csv", ["id", "nome"])
+        assert saida.getvalue().splitlines()[:2] == ["id,nome", "1,Arroz"], "Colunas explícitas ignoradas"
+        
+        saida = io.StringIO()
+        exportar_colecao(db, "pedidos", saida)
+        assert saida.getvalue() == "", "Coleção vazia gerou linhas"
+        exportar_colecao(db, "movimentacoes", saida)
+        assert [json.loads(linha) for linha in saida.getvalue().splitlines()] == db.get_items("movimentacoes"), \
+            "Exportação JSONL difere da coleção"
+        assert levanta(ValueError, exportar_colecao, db, "inexistente", saida), "Coleção inexistente foi exportada"
+        db.fechar()
+        print("✅ Exportação de coleções para CSV e JSONL")
+
+def testar_servicos():
+    """Testa os serviços de estoque e pedidos, sem menus"""
+    print("\n🧩 TESTANDO SERVIÇOS...")
+    
+    import tempfile
+    from models.database import Database
+    from models.servicos import EstoqueInsuficienteError, PedidoNaoPendenteError, Servicos
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "igo_data.json"))
+        servicos = Servicos(db)
+        produto = servicos.cadastros.cadastrar("produtos", {"nome": "Arroz", "categoria": "alimento", "marca": "IGO",
+                                                            "validade": "31/12/2030", "quantidade": 5, "preco": 4})
+        cliente = servicos.cadastros.cadastrar("clientes", {"nome": "Ana", "cpf": "12345678900"})
+        
+        assert levanta(EstoqueInsuficienteError, servicos.estoque.movimentar, produto['id'], "saida", 6), \
+            "Saída acima do estoque foi aceita"
+        
+        pedido = servicos.pedidos.criar(cliente['id'], [(produto['id'], 2)])
+        servicos.pedidos.aprovar(pedido['id'])
+        assert levanta(PedidoNaoPendenteError, servicos.pedidos.rejeitar, pedido['id'], "duplicado"), \
+            "Pedido já aprovado foi rejeitado"
+        
+        assert db.get_item("produtos", produto['id'])['quantidade'] == 3 and len(db.get_items("movimentacoes")) == 1, \
+            "Estoque ou movimentações incorretos após os serviços"
+        
+        db.fechar()
+        print("✅ Cadastro, estoque e pedidos funcionando sem menus")
+
+def testar_servidor():
+    """Testa o modo servidor: terminais concorrentes sem atualizações perdidas"""
+    print("\n🖧 TESTANDO MODO SERVIDOR...")
+    
+    import tempfile
+    import threading
+    from models.agregados import AgregadosRelatorio
+    from models.database import Database
+    from models.remoto import ClienteBanco
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "igo_data.json"))
+        servidor = iniciar_servidor(db, os.path.join(tmp, "igo.sock"))
+        
+        terminal = ClienteBanco(servidor.caminho_socket)
+        produto = terminal.add_item("produtos", {"nome": "Arroz", "quantidade": 0})
+        eventos = []
+        terminal.inscrever(lambda evento, collection, item: eventos.append(evento))
+        
+        def operar():
+            cliente = ClienteBanco(servidor.caminho_socket)
+            for i in range(50):
+                with cliente.transaction():
+                    atual = cliente.get_item("produtos", produto['id'])
+                    cliente.update_item("produtos", produto['id'], {"quantidade": atual['quantidade'] + 1})
+            cliente.fechar()
+        
+        operadores = [threading.Thread(target=operar) for i in range(4)]
+        for operador in operadores:
+            operador.start()
+        for operador in operadores:
+            operador.join()
+        
+        assert db.get_item("produtos", produto['id'])['quantidade'] == 200, "Atualizações concorrentes foram perdidas"
+        
+        terminal.sincronizar()
+        assert eventos.count("update") == 200, "Eventos dos outros terminais não foram entregues"
+        
+        # Agregados do terminal: uma única leitura inicial, sem bloquear os demais
+        class Agregados(AgregadosRelatorio):
+            construcoes = 0
+            
+            def reconstruir(self):
+                Agregados.construcoes += 1
+                outro = ClienteBanco(servidor.caminho_socket)
+                escrita = threading.Thread(target=outro.add_item, args=("produtos", {"nome": "Feijão"}))
+                escrita.start()
+                escrita.join(5)
+                assert not escrita.is_alive(), "Leitura inicial bloqueou a escrita de outro terminal"
+                outro.fechar()
+                super().reconstruir()
+        
+        agregados = Agregados(terminal)
+        terminal.sincronizar()
+        assert Agregados.construcoes == 1, f"Agregados construídos {Agregados.construcoes} vezes"
+        assert agregados.contagens == AgregadosRelatorio(db).contagens, "Agregados do terminal divergem do servidor"
+        
+        terminal.fechar()
+        servidor.parar()
+        db.fechar()
+        print("✅ Transações serializadas entre terminais e eventos entregues")
+
+def testar_api():
+    """Testa as rotas da API HTTP/JSON, diretamente e por um socket real"""
+    print("\n🌐 TESTANDO API HTTP...")
+    
+    import asyncio
+    import http.client
+    import json
+    import socket
+    import tempfile
+    import threading
+    from controllers.api_controller import ApiController
+    from models.database import Database
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "igo_data.json"))
+        produto = db.add_item("produtos", {"nome": "Feijão", "categoria": "alimento", "quantidade": 10, "preco": 8.0})
+        cliente = db.add_item("clientes", {"nome": "Ana", "cpf": "12345678900"})
+        api = ApiController(db)
+        
+        def requisitar(metodo, alvo, corpo=None):
+            status, resposta = api.tratar(metodo, alvo, {}, json.dumps(corpo).encode() if corpo else b"")
+            return status, json.loads(resposta)
+        
+        status, resposta = requisitar("GET", "/produtos/busca?q=feijao")
+        assert status == 200 and resposta['itens'][0]['id'] == produto['id'], "Busca de produtos pela API falhou"
+        
+        status, pedido = requisitar("POST", "/pedidos", {"cliente_id": cliente['id'],
+                                                         "itens": [{"produto_id": produto['id'], "quantidade": 4}]})
+        assert status == 201 and requisitar("POST", f"/pedidos/{pedido['id']}/aprovar")[0] == 200, \
+            "Criação/aprovação de pedido pela API falhou"
+        assert db.get_item("produtos", produto['id'])['quantidade'] == 6, "Aprovação pela API não baixou o estoque"
+        
+        assert requisitar("POST", f"/produtos/{produto['id']}/estoque", {"tipo": "saida", "quantidade": 7})[0] == 409, \
+            "Saída acima do estoque foi aceita"
+        
+        status, relatorio = requisitar("GET", "/relatorios/produtos_solicitados")
+        assert status == 200 and relatorio['linhas'][0]['quantidade_total'] == 4, "Relatório pela API incorreto"
+        
+        # Servidor real em uma porta livre, com o laço de eventos em outra thread
+        portas = []
+        tarefas = []
+        iniciado = threading.Event()
+        
+        def ao_iniciar(servidor):
+            portas.append(servidor.sockets[0].getsockname()[1])
+            tarefas.append(asyncio.current_task())
+            iniciado.set()
+        
+        async def encerrar():
+            tarefas[0].cancel()
+            await asyncio.gather(tarefas[0], return_exceptions=True)
+        
+        laco = asyncio.new_event_loop()
+        thread_laco = threading.Thread(target=laco.run_forever, daemon=True)
+        thread_laco.start()
+        asyncio.run_coroutine_threadsafe(api.servir("127.0.0.1", 0, ao_iniciar), laco)
+        try:
+            assert iniciado.wait(5), "Servidor da API não iniciou"
+            
+            conexao = http.client.HTTPConnection("127.0.0.1", portas[0], timeout=5)
+            conexao.request("GET", f"/produtos/{produto['id']}")
+            primeira = conexao.getresponse()
+            corpo = json.loads(primeira.read())
+            soquete = conexao.sock
+            conexao.request("GET", "/pedidos")
+            segunda = conexao.getresponse()
+            segunda.read()
+            assert primeira.status == 200 and corpo['quantidade'] == 6 and segunda.status == 200, \
+                "Requisições pelo socket falharam"
+            assert soquete is not None and conexao.sock is soquete, "Conexão keep-alive não foi reaproveitada"
+            conexao.close()
+            
+            with socket.create_connection(("127.0.0.1", portas[0]), timeout=5) as bruto:
+                bruto.sendall(b"INVALIDA\r\n\r\n")
+                resposta = b""
+                while True:
+                    parte = bruto.recv(4096)
+                    if not parte:
+                        break
+                    resposta += parte
+            assert resposta.startswith(b"HTTP/1.1 400") and b"Connection: close" in resposta, \
+                "Requisição malformada não foi recusada com 400"
+        finally:
+            if tarefas:
+                asyncio.run_coroutine_threadsafe(encerrar(), laco).result(5)
+            laco.call_soon_threadsafe(laco.stop)
+            thread_laco.join(5)
+            laco.close()
+        
+        db.fechar()
+        print("✅ Produtos, pedidos e relatórios acessíveis pela API (inclusive por socket)")
+
 def testar_controllers():
     """Testa funcionalidades básicas dos controladores"""
     print("\n🎮 TESTANDO CONTROLADORES...")
@@ -135,6 +1247,29 @@ def main():
     testes = [
         ("Imports", testar_imports),
         ("Database", testar_database),
+        ("Journal", testar_journal),
+        ("Transações", testar_transacao),
+        ("SQLite", testar_sqlite),
+        ("Campos únicos", testar_unicidade),
+        ("Versões", testar_versoes),
+        ("Índice por ID", testar_indice_primario),
+        ("Sequências", testar_sequencias),
+        ("Índices", testar_indices_secundarios),
+        ("Gerações do snapshot", testar_geracoes),
+        ("Snapshot por coleção", testar_colecoes),
+        ("Snapshot binário", testar_binario),
+        ("Agregados", testar_agregados),
+        ("Ranking", testar_ranking),
+        ("Histórico", testar_historico),
+        ("Vencimentos", testar_vencimentos),
+        ("Reposição", testar_reposicao),
+        ("Busca textual", testar_busca),
+        ("Paginação", testar_paginacao),
+        ("Importação", testar_importacao),
+        ("Exportação", testar_exportacao),
+        ("Serviços", testar_servicos),
+        ("Modo servidor", testar_servidor),
+        ("API HTTP", testar_api),
         ("Controllers", testar_controllers),
         ("Views", testar_views)
     ]
@@ -143,7 +1278,8 @@ def main():
     for nome, teste in testes:
         try:
             resultado = teste()
-            resultados.append((nome, resultado))
+            # Os testes com assert não retornam valor: sem exceção, passaram
+            resultados.append((nome, resultado is not False))
         except Exception as e:
             print(f"❌ Erro no teste {nome}: {e}")
             resultados.append((nome, False))
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+View de Edição - Sistema IGO
+"""
+
+from models.database import ConflitoVersaoError, RegistroDuplicadoError
+
+class EdicaoView:
+    """Grava a edição de um registro feita nos formulários dos cadastros.
+    
+    O formulário lê o registro, pede os novos valores e só então grava;
+    a gravação é condicionada à versão lida no início (ver
+    Database.update_item), de modo que uma alteração feita por outra
+    operação durante a edição não é sobrescrita silenciosamente.
+    """
+    
+    def __init__(self, database):
+        self.db = database
+    
+    def gravar(self, collection, item_id, alteracoes, versao, descricao):
+        """Grava as alterações se o registro ainda estiver na versão lida.
+        
+        Em caso de conflito ou de valor duplicado, exibe o motivo e não
+        grava nada. Retorna True quando as alterações foram gravadas.
+        """
+        try:
+            self.db.update_item(collection, item_id, alteracoes, versao)
+        except ConflitoVersaoError:
+            print(f"❌ O {descricao} foi alterado por outra operação durante a edição. "
+                  "Nenhuma alteração foi gravada; tente novamente.")
+            return False
+        except RegistroDuplicadoError as e:
+            print(f"❌ {e}")
+            return False
+        return True
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+View de Paginação - Sistema IGO
+"""
+
+class PaginadorView:
+    """Exibe uma coleção uma tela por vez, com navegação entre páginas.
+    
+    Próxima e anterior usam paginação por chave (IDs vizinhos aos da página
+    atual); ir para uma página usa deslocamento. Apenas os registros da
+    página exibida são lidos do banco.
+    """
+    
+    def __init__(self, database, tamanho_pagina=20):
+        self.db = database
+        self.tamanho_pagina = tamanho_pagina
+    
+    def paginar(self, collection, exibir_pagina, filters=None):
+        """Navega pela coleção chamando exibir_pagina(itens) a cada tela.
+        
+        Retorna o total de registros (0 quando não há nenhum, sem exibir nada).
+        """
+        itens, total = self.db.get_pagina(collection, 0, self.tamanho_pagina, filters)
+        if not total:
+            return 0
+        
+        total_paginas = (total + self.tamanho_pagina - 1) // self.tamanho_pagina
+        pagina = 1
+        while True:
+            exibir_pagina(itens)
+            print(f"Página {pagina} de {total_paginas} | Total: {total} registro(s)")
+            if total_paginas == 1:
+                return total
+            
+            opcao = input("[P]róxima  [A]nterior  [I]r para página  [S]air: ").strip().lower()
+            if opcao == "p":
+                if pagina == total_paginas:
+                    print("⚠️  Esta é a última página!")
+                    continue
+                itens = self.db.get_itens_apos(collection, itens[-1]['id'], self.tamanho_pagina, filters)
+                pagina += 1
+            elif opcao == "a":
+                if pagina == 1:
+                    print("⚠️  Esta é a primeira página!")
+                    continue
+                itens = self.db.get_itens_antes(collection, itens[0]['id'], self.tamanho_pagina, filters)
+                pagina -= 1
+            elif opcao == "i":
+                destino = input(f"Página (1-{total_paginas}): ").strip()
+                if not destino.isdigit() or not 1 <= int(destino) <= total_paginas:
+                    print("❌ Página inválida!")
+                    continue
+                pagina = int(destino)
+                itens, total = self.db.get_pagina(collection, (pagina - 1) * self.tamanho_pagina,
+                                                  self.tamanho_pagina, filters)
+            elif opcao in ("s", ""):
+                return total
+            else:
+                print("❌ Opção inválida!")
+                continue
+            
+            if not itens:
+                # Registros excluídos desde a primeira página
+                print("📭 Nenhum registro nesta página!")
+                return total